@@ -1,10 +1,10 @@
 """Main admin bot handler for managing the forwarding system."""
 
 import asyncio
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional
 from datetime import datetime
 
-from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, filters
+from telegram.ext import Application, CallbackQueryHandler, MessageHandler, filters
 from telegram import Update
 from telegram.ext import ContextTypes
 from loguru import logger
@@ -22,18 +22,20 @@ from utils.encryption import EncryptionManager
 class AdminHandler:
     """Main admin bot handler."""
     
-    def __init__(self, bot_token: str, database: Database, session_manager: SessionManager, admin_user_ids: List[int], advanced_session_manager: Optional[AdvancedSessionManager] = None, encryption_key: str = ""):
+    def __init__(self, bot_token: str, database: Database, session_manager: SessionManager, admin_user_ids: List[int], advanced_session_manager: Optional[AdvancedSessionManager] = None, encryption_key: str = "", batch_replies: bool = False):
         self.bot_token = bot_token
         self.database = database
         self.session_manager = session_manager
         self.advanced_session_manager = advanced_session_manager
         self.admin_user_ids = set(admin_user_ids)
+        self.batch_replies = batch_replies
         self.encryption_manager = EncryptionManager(encryption_key)
         self.application: Optional[Application] = None
         self.unified_commands: Optional[UnifiedAdminCommands] = None
         self.session_commands: Optional[UnifiedSessionCommands] = None
         self.message_filter: Optional[MessageFilter] = None
         self.alert_system: Optional[AlertSystem] = None
+        self._command_table: Dict[str, Callable] = {}
         self.running = False
     
     async def start(self):
@@ -54,13 +56,15 @@ class AdminHandler:
             
             # Initialize unified command system - replaces all separate command handlers
             self.unified_commands = UnifiedAdminCommands(
-                self.database, self.encryption_manager, self.message_filter, self.advanced_session_manager
+                self.database, self.encryption_manager, self.message_filter, self.advanced_session_manager,
+                batch_replies=self.batch_replies
             )
             
             # Keep session commands for OTP handling
             self.session_commands = None
             if self.advanced_session_manager:
                 self.session_commands = UnifiedSessionCommands(self.database, self.advanced_session_manager)
+                self.session_commands.on_sessions_changed = self.unified_commands.invalidate_sessions_cache
             
             # Create application
             self.application = Application.builder().token(self.bot_token).build()
@@ -108,6 +112,9 @@ class AdminHandler:
         if self.alert_system:
             await self.alert_system.stop()
         
+        if self.unified_commands:
+            await self.unified_commands.flush_replies()
+        
         if self.application:
             try:
                 await self.application.updater.stop()
@@ -150,8 +157,13 @@ class AdminHandler:
         if self.session_commands:
             command_handlers["addsession"] = self.session_commands.addsession_command
 
-        for command_name, handler_func in command_handlers.items():
-            self.application.add_handler(CommandHandler(command_name, self._execute_command(handler_func)))
+        # One handler for all commands; dispatch is a dict lookup instead of
+        # PTB testing each CommandHandler in turn. The admin check wraps each
+        # known command, so unknown or foreign commands are ignored for everyone.
+        self._command_table = {
+            name: self._execute_command(handler_func) for name, handler_func in command_handlers.items()
+        }
+        self.application.add_handler(MessageHandler(filters.COMMAND, self._dispatch_command))
 
         if self.session_commands:
             self.application.add_handler(CallbackQueryHandler(self._execute_command(self.session_commands.handle_otp_callback), pattern="^(enter_otp|resend_otp|cancel_otp):"))
@@ -161,6 +173,27 @@ class AdminHandler:
         
         logger.info("Admin bot handlers setup complete")
 
+    async def _dispatch_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Route a /command message to its (admin-checked) handler via the command table."""
+        message = update.message
+        if not message or not message.text:
+            return
+        
+        command_token, *args = message.text.split()
+        command, _, bot_username = command_token[1:].partition('@')
+        
+        # Ignore commands addressed to other bots in group chats
+        if bot_username and bot_username.lower() != (context.bot.username or '').lower():
+            return
+        
+        handler_func = self._command_table.get(command.lower())
+        if not handler_func:
+            return
+        
+        # MessageHandler does not parse arguments like CommandHandler does
+        context.args = args
+        await handler_func(update, context)
+    
     def _execute_command(self, handler_func):
         """Wrap handler function with admin permission check and error handling."""
         async def wrapped_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -2,13 +2,13 @@
 Image handling commands for the admin bot.
 Supports image upload, hash generation, and blocking.
 """
+import asyncio
 import os
 from typing import Optional
 from telegram import Update
 from telegram.ext import ContextTypes
 from loguru import logger
 from utils.image_hash import image_hash_manager
-import requests
 
 class ImageHandler:
     """Handles image-related admin commands."""
@@ -28,16 +28,16 @@ class ImageHandler:
             # Download the image
             file = await context.bot.get_file(photo.file_id)
             
-            # Download image data
-            response = requests.get(file.file_path)
-            if response.status_code != 200:
+            # Download image data through the bot's async HTTP client
+            try:
+                image_data = bytes(await file.download_as_bytearray())
+            except Exception as e:
+                logger.warning(f"Image download failed: {e}")
                 await update.message.reply_text("❌ Failed to download image.")
                 return
             
-            image_data = response.content
-            
-            # Calculate perceptual hash
-            image_hash = image_hash_manager.calculate_image_hash(image_data)
+            # Calculate perceptual hash off the event loop
+            image_hash = await asyncio.to_thread(image_hash_manager.calculate_image_hash, image_data)
             
             if image_hash:
                 await update.message.reply_text(
@@ -0,0 +1,79 @@
+"""Coalesce bursts of admin replies to the same chat into fewer Telegram messages."""
+
+import asyncio
+from typing import Dict, List, Optional, Set, Tuple
+
+from telegram import Bot
+from loguru import logger
+
+# Telegram's maximum message length
+MAX_MESSAGE_LENGTH = 4096
+
+
+class OutboundBatcher:
+    """Buffers replies per chat for a short window and sends them joined."""
+
+    def __init__(self, delay: float = 0.2, max_len: int = MAX_MESSAGE_LENGTH):
+        self.delay = delay
+        self.max_len = max_len
+        self._pending: Dict[Tuple[int, Optional[str]], List[str]] = {}
+        self._handles: Dict[Tuple[int, Optional[str]], asyncio.TimerHandle] = {}
+        self._bots: Dict[Tuple[int, Optional[str]], Bot] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def send(self, bot: Bot, chat_id: int, text: str, parse_mode: Optional[str] = None):
+        """Queue text for chat_id; it is flushed after the batching window."""
+        # Only replies with the same parse mode can share a message
+        key = (chat_id, parse_mode)
+        self._pending.setdefault(key, []).append(text)
+        self._bots[key] = bot
+
+        if key not in self._handles:
+            loop = asyncio.get_running_loop()
+            self._handles[key] = loop.call_later(self.delay, self._schedule_flush, key)
+
+    def _schedule_flush(self, key: Tuple[int, Optional[str]]):
+        task = asyncio.create_task(self._flush(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, key: Tuple[int, Optional[str]]):
+        """Send everything queued for one chat."""
+        self._handles.pop(key, None)
+        texts = self._pending.pop(key, [])
+        bot = self._bots.pop(key, None)
+        if not texts or not bot:
+            return
+
+        chat_id, parse_mode = key
+        for chunk in self._pack(texts):
+            try:
+                await bot.send_message(chat_id, chunk, parse_mode=parse_mode)
+            except Exception as e:
+                logger.error(f"Failed to send batched reply to {chat_id}: {e}")
+
+    def _pack(self, texts: List[str]) -> List[str]:
+        """Join texts with blank lines, starting a new chunk before max_len is exceeded."""
+        chunks: List[str] = []
+        current = ""
+        for text in texts:
+            # Split single oversized texts by characters
+            pieces = [text[i:i + self.max_len] for i in range(0, len(text), self.max_len)] or [""]
+            for piece in pieces:
+                candidate = f"{current}\n\n{piece}" if current else piece
+                if len(candidate) <= self.max_len:
+                    current = candidate
+                else:
+                    chunks.append(current)
+                    current = piece
+        if current:
+            chunks.append(current)
+        return chunks
+
+    async def flush_all(self):
+        """Send all pending replies immediately (call on shutdown)."""
+        for key in list(self._handles):
+            self._handles.pop(key).cancel()
+            await self._flush(key)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
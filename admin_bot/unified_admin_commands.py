@@ -2,672 +2,791 @@
 Unified admin command system - consolidates all admin functionality
 Eliminates duplicates and provides consistent interface
 """
+import asyncio
+import contextlib
+import functools
+import re
+import tempfile
+import time
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional, List, Dict, Any
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from typing import Optional, List, Dict, Any, Tuple, Callable, Awaitable
+from telegram import Message, Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
+from telegram.helpers import escape_markdown
 from loguru import logger
 
 from core.database import Database
 from core.message_filter import MessageFilter
 from utils.encryption import EncryptionManager
+from utils.image_hash import image_hash_manager
+from utils.markdown_entities import compile_markdown
 from admin_bot.bot_management import BotTokenManager
+from admin_bot.outbound_batcher import OutboundBatcher
 from core.advanced_session_manager import AdvancedSessionManager
 
+# Seconds that read-only aggregates (filter stats, bot list) stay cached
+STATS_CACHE_TTL = 10.0
+# Ceiling on how long a rendered listing is reused; covers changes made outside
+# these commands (session health updates, other admin tools)
+RENDER_CACHE_TTL = 5.0
+
+# Repeat calls of a debounced command by the same admin within this window are dropped
+COMMAND_DEBOUNCE_SECONDS = 0.5
+# Bound on remembered (user, command) pairs for debouncing
+MAX_DEBOUNCE_ENTRIES = 1024
+
+# Largest upload accepted for hashing (Telegram caps photos at 10 MB)
+MAX_IMAGE_SIZE = 10 * 1024 * 1024
+# Uploads above this size spill from memory to a temporary file
+IMAGE_SPOOL_SIZE = 2 * 1024 * 1024
+
+# Shape of a Telegram bot token ("<bot_id>:<secret>"), checked before any API call
+BOT_TOKEN_RE = re.compile(r'^\d{6,}:[A-Za-z0-9_-]{30,}$')
+
+SESSION_STATUS_EMOJI = {
+    'healthy': '✅',
+    'not_found': '❌',
+    'error': '⚠️',
+    'deleted': '🗑️',
+    'needs_auth': '⏳'
+}
+
+WELCOME_TEMPLATE = (
+    "🤖 **Telegram ↔ Discord ↔ Telegram Forwarding Bot**\n\n"
+    "**Quick Start:**\n"
+    "• `/addsession` - Add Telegram user session\n"
+    "• `/addbot` - Add bot token for destinations\n"
+    "• `/addpair` - Create forwarding pair (auto-webhook)\n"
+    "• `/status` - System status\n"
+    "• `/help` - Complete guide\n\n"
+
+    "**Bot Management:**\n"
+    "• `/listbots` - Show saved bot tokens\n"
+    "• `/addbot <name> <token>` - Add named bot\n"
+    "• `/removebot <name>` - Remove bot\n\n"
+
+    "**Filtering:**\n"
+    "• `/blockword <word>` - Block word globally\n"
+    "• `/blockimage <hash>` - Block image by hash\n"
+    "• `/showfilters` - View filter settings\n\n"
+
+    "Admin ID: `{user_id}`"
+)
+
+HELP_TEXT = (
+    "📖 **Complete Command Reference**\n\n"
+
+    "**🔧 PAIR MANAGEMENT**\n"
+    "• `/addpair` - Create new forwarding pair (auto-creates Discord webhook)\n"
+    "• `/listpairs` - Show all pairs\n"
+    "• `/removepair <id>` - Remove pair\n"
+    "• `/status` - System status\n\n"
+
+    "**👥 SESSION MANAGEMENT**\n"
+    "• `/addsession <name> <phone>` - Add session\n"
+    "• `/sessions` - List all sessions\n"
+    "• `/changesession <pair_id> <session>` - Change pair session\n\n"
+
+    "**🤖 BOT TOKEN MANAGEMENT**\n"
+    "• `/addbot <name> <token>` - Add named bot token\n"
+    "• `/listbots` - Show all saved bots\n"
+    "• `/removebot <name>` - Remove bot token\n\n"
+
+    "**🛡️ FILTERING SYSTEM**\n"
+    "• `/blockword <word>` - Block word globally\n"
+    "• `/unblockword <word>` - Unblock word\n"
+    "• `/blockimage <hash>` - Block image by hash\n"
+    "• `/showfilters` - View all filters\n"
+    "• `/blockimages` / `/allowimages` - Toggle image filtering\n\n"
+
+    "**📊 MONITORING**\n"
+    "• `/health` - System health check\n"
+    "• `/logs` - Recent error logs\n\n"
+
+    "**💡 Quick Setup:**\n"
+    "1. `/addsession mysession +1234567890`\n"
+    "2. `/addbot mybot 123456:ABC...`\n"
+    "3. `/addpair` (follow wizard)\n"
+    "4. `/status` to verify"
+)
+
+ADDBOT_USAGE = (
+    "**Add Bot Token**\n\n"
+    "Usage: `/addbot <name> <token>`\n\n"
+    "**Example:**\n"
+    "`/addbot MyBot 5555555555:AAA...`\n\n"
+    "The bot will be validated and saved for use in forwarding pairs."
+)
+
+ADDPAIR_INTRO = (
+    "🚀 **Create New Forwarding Pair**\n\n"
+    "I'll guide you through creating a forwarding pair step by step.\n\n"
+    "**Step 1/6:** Enter a unique name for this forwarding pair:"
+)
+
+TESTBOT_USAGE = (
+    "**Test Bot Permissions**\n\n"
+    "Usage: `/testbot <bot_name> <chat_id>`\n\n"
+    "**Example:**\n"
+    "`/testbot MyBot -1001234567890`\n\n"
+    "This will test if the bot can send messages to the specified chat."
+)
+
+# Static Markdown replies parsed once into text + entities
+HELP_TEXT_PLAIN, HELP_ENTITIES = compile_markdown(HELP_TEXT)
+ADDBOT_USAGE_PLAIN, ADDBOT_USAGE_ENTITIES = compile_markdown(ADDBOT_USAGE)
+ADDPAIR_INTRO_PLAIN, ADDPAIR_INTRO_ENTITIES = compile_markdown(ADDPAIR_INTRO)
+TESTBOT_USAGE_PLAIN, TESTBOT_USAGE_ENTITIES = compile_markdown(TESTBOT_USAGE)
+
+LISTBOTS_FOOTER = (
+    "**Commands:**\n"
+    "• `/addbot <name> <token>` - Add new bot\n"
+    "• `/removebot <name>` - Remove bot\n"
+    "• `/addpair` - Use bots in forwarding pairs"
+)
+
+SHOWFILTERS_TEMPLATE = (
+    "🛡️ **Filter Settings**\n\n"
+    "**Blocked Words:** {words} words\n"
+    "**Blocked Images:** {images} hashes\n\n"
+    "**Global Settings:**\n"
+    "• Images: {images_state}\n"
+    "• Headers: {headers_state}\n"
+    "• Mentions: {mentions_state}\n\n"
+    "**Commands:**\n"
+    "• `/blockword <word>` - Block word\n"
+    "• `/blockimage <hash>` - Block image\n"
+    "• `/blockimages` / `/allowimages` - Toggle images"
+)
+
+SESSIONS_FOOTER = (
+    "Commands:\n"
+    "• /addsession <name> <phone> - Add new session\n"
+    "• /changesession <pair_id> <session> - Change pair session"
+)
+
+LISTPAIRS_FOOTER = (
+    "**Commands:**\n"
+    "• `/addpair` - Create new pair\n"
+    "• `/removepair <id>` - Remove pair\n"
+    "• `/status` - System overview"
+)
+
+STATUS_FOOTER = (
+    "**Quick Actions:**\n"
+    "• `/sessions` - View session details\n"
+    "• `/listpairs` - View pair details\n"
+    "• `/listbots` - View bot tokens"
+)
+
+
+def _format_timestamp(value: Any) -> str:
+    """Format a datetime for display; the database layer already parses timestamps."""
+    if hasattr(value, 'strftime'):
+        return value.strftime('%Y-%m-%d %H:%M')
+    # Fallback to raw string display
+    return str(value)[:16]
+
+
+def _command_argument(text: Optional[str]) -> str:
+    """Return everything after the command, whatever whitespace separates them."""
+    parts = (text or "").split(None, 1)
+    return parts[1].strip() if len(parts) > 1 else ""
+
+
+def _admin_handler(func=None, *, error_reply: str = "❌ Error", debounce: bool = False):
+    """
+    Wrap an admin command handler with the shared guard and error reply.
+    
+    Skips updates without a message, logs any exception and reports it back
+    to the admin as "<error_reply>: <exception>". The message is resolved once
+    and passed to the handler as ``msg``. With debounce=True, repeats of the
+    command by the same user within COMMAND_DEBOUNCE_SECONDS are ignored.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+            msg = update.message
+            if msg is None:
+                return
+            if debounce and update.effective_user and self._is_debounced(update.effective_user.id, handler.__name__):
+                logger.debug("Debounced {} for user {}", handler.__name__, update.effective_user.id)
+                return
+            try:
+                return await handler(self, update, context, msg)
+            except Exception as e:
+                logger.opt(exception=True).error("Error in {}: {}", handler.__name__, e)
+                with contextlib.suppress(Exception):
+                    await msg.reply_text(f"{error_reply}: {e}")
+        return wrapper
+    
+    if func is not None:
+        return decorator(func)
+    return decorator
+
 
 class UnifiedAdminCommands:
     """Unified admin command system with clean architecture."""
     
     def __init__(self, database: Database, encryption_manager: EncryptionManager, 
-                 message_filter: MessageFilter, advanced_session_manager: AdvancedSessionManager):
+                 message_filter: MessageFilter, advanced_session_manager: AdvancedSessionManager,
+                 batch_replies: bool = False):
         self.database = database
         self.encryption_manager = encryption_manager
         self.message_filter = message_filter
         self.advanced_session_manager = advanced_session_manager
         self.bot_manager = BotTokenManager(database, encryption_manager)
+        self._stats_cache: Dict[str, Tuple[float, Any]] = {}
+        # Coalesce read-only replies per chat (useful for scripted admin tooling)
+        self.batch_replies = batch_replies
+        self._outbound = OutboundBatcher()
+        self._last_call: "OrderedDict[Tuple[int, str], float]" = OrderedDict()
+    
+    def _is_debounced(self, user_id: int, command: str) -> bool:
+        """Record a command call and report whether it repeats one within the debounce window."""
+        key = (user_id, command)
+        now = time.monotonic()
+        last = self._last_call.get(key)
+        if last is not None and now - last < COMMAND_DEBOUNCE_SECONDS:
+            return True
+        
+        self._last_call[key] = now
+        self._last_call.move_to_end(key)
+        while len(self._last_call) > MAX_DEBOUNCE_ENTRIES:
+            self._last_call.popitem(last=False)
+        return False
+    
+    async def _reply(self, msg: Message, text: str, parse_mode: Optional[str] = None):
+        """Reply to a message, going through the outbound batcher when enabled.
+        
+        Only for one-shot command output; interactive flows (pair wizard, /testbot)
+        reply directly so prompts are never delayed.
+        """
+        if self.batch_replies:
+            await self._outbound.send(msg.get_bot(), msg.chat_id, text, parse_mode)
+        else:
+            await msg.reply_text(text, parse_mode=parse_mode)
+    
+    async def flush_replies(self):
+        """Send any batched replies immediately."""
+        await self._outbound.flush_all()
+    
+    async def _cached(self, key: str, fetch: Callable[[], Awaitable[Any]], ttl: float = STATS_CACHE_TTL) -> Any:
+        """Return a cached aggregate, refetching it once older than ttl seconds."""
+        now = time.monotonic()
+        entry = self._stats_cache.get(key)
+        if entry and now - entry[0] < ttl:
+            return entry[1]
+        
+        value = await fetch()
+        self._stats_cache[key] = (now, value)
+        return value
+    
+    def _invalidate_caches(self):
+        """Drop cached aggregates and rendered listings after a write command."""
+        self._stats_cache.clear()
+    
+    def invalidate_sessions_cache(self):
+        """Drop the rendered /sessions listing after a session is added or removed."""
+        self._stats_cache.pop('rendered_sessions', None)
     
     # =============================================================================
     # CORE COMMANDS
     # =============================================================================
     
-    async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @_admin_handler
+    async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, msg: Message):
         """Handle /start command."""
-        if not update.effective_user or not update.message:
+        user = update.effective_user
+        if not user:
             return
         
-        user_id = update.effective_user.id
-        
-        welcome_message = (
-            "🤖 **Telegram ↔ Discord ↔ Telegram Forwarding Bot**\n\n"
-            "**Quick Start:**\n"
-            "• `/addsession` - Add Telegram user session\n"
-            "• `/addbot` - Add bot token for destinations\n"
-            "• `/addpair` - Create forwarding pair (auto-webhook)\n"
-            "• `/status` - System status\n"
-            "• `/help` - Complete guide\n\n"
-            
-            "**Bot Management:**\n"
-            "• `/listbots` - Show saved bot tokens\n"
-            "• `/addbot <name> <token>` - Add named bot\n"
-            "• `/removebot <name>` - Remove bot\n\n"
-            
-            "**Filtering:**\n"
-            "• `/blockword <word>` - Block word globally\n"
-            "• `/blockimage <hash>` - Block image by hash\n"
-            "• `/showfilters` - View filter settings\n\n"
-            
-            f"Admin ID: `{user_id}`"
-        )
-        
-        await update.message.reply_text(welcome_message, parse_mode='Markdown')
+        user_id = user.id
+        await self._reply(msg, WELCOME_TEMPLATE.format(user_id=user_id), parse_mode='Markdown')
     
-    async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @_admin_handler
+    async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, msg: Message):
         """Show comprehensive help."""
-        help_text = (
-            "📖 **Complete Command Reference**\n\n"
-            
-            "**🔧 PAIR MANAGEMENT**\n"
-            "• `/addpair` - Create new forwarding pair (auto-creates Discord webhook)\n"
-            "• `/listpairs` - Show all pairs\n"
-            "• `/removepair <id>` - Remove pair\n"
-            "• `/status` - System status\n\n"
-            
-            "**👥 SESSION MANAGEMENT**\n"
-            "• `/addsession <name> <phone>` - Add session\n"
-            "• `/sessions` - List all sessions\n"
-            "• `/changesession <pair_id> <session>` - Change pair session\n\n"
-            
-            "**🤖 BOT TOKEN MANAGEMENT**\n"
-            "• `/addbot <name> <token>` - Add named bot token\n"
-            "• `/listbots` - Show all saved bots\n"
-            "• `/removebot <name>` - Remove bot token\n\n"
-            
-            "**🛡️ FILTERING SYSTEM**\n"
-            "• `/blockword <word>` - Block word globally\n"
-            "• `/unblockword <word>` - Unblock word\n"
-            "• `/blockimage <hash>` - Block image by hash\n"
-            "• `/showfilters` - View all filters\n"
-            "• `/blockimages` / `/allowimages` - Toggle image filtering\n\n"
-            
-            "**📊 MONITORING**\n"
-            "• `/health` - System health check\n"
-            "• `/logs` - Recent error logs\n\n"
-            
-            "**💡 Quick Setup:**\n"
-            "1. `/addsession mysession +1234567890`\n"
-            "2. `/addbot mybot 123456:ABC...`\n"
-            "3. `/addpair` (follow wizard)\n"
-            "4. `/status` to verify"
-        )
-        
-        await update.message.reply_text(help_text, parse_mode='Markdown')
+        await msg.reply_text(HELP_TEXT_PLAIN, entities=HELP_ENTITIES)
     
     # =============================================================================
     # BOT TOKEN MANAGEMENT
     # =============================================================================
     
-    async def addbot_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @_admin_handler
+    async def addbot_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, msg: Message):
         """Add a named bot token."""
-        if not update.message:
+        args = context.args or []
+        if len(args) < 2:
+            await msg.reply_text(
+                ADDBOT_USAGE_PLAIN, entities=ADDBOT_USAGE_ENTITIES
+            )
             return
-            
-        try:
-            if len(context.args) < 2:
-                await update.message.reply_text(
-                    "**Add Bot Token**\n\n"
-                    "Usage: `/addbot <name> <token>`\n\n"
-                    "**Example:**\n"
-                    "`/addbot MyBot 5555555555:AAA...`\n\n"
-                    "The bot will be validated and saved for use in forwarding pairs.",
-                    parse_mode='Markdown'
-                )
-                return
-            
-            bot_name = context.args[0]
-            bot_token = context.args[1]
-            
-            # Add bot token with validation
-            result = await self.bot_manager.add_named_bot_token(bot_name, bot_token)
-            
-            if result['success']:
-                await update.message.reply_text(
-                    f"✅ **Bot Added Successfully**\n\n"
-                    f"**Name:** {bot_name}\n"
-                    f"**Bot:** @{result['bot_info'].get('username', 'Unknown')}\n"
-                    f"**Title:** {result['bot_info'].get('first_name', 'Unknown')}\n\n"
-                    "You can now use this bot when creating forwarding pairs with `/addpair`.",
-                    parse_mode='Markdown'
-                )
-            else:
-                await update.message.reply_text(
-                    f"❌ **Failed to add bot**\n\n"
-                    f"Error: {result['error']}\n\n"
-                    "Please check the token and try again."
-                )
-                
-        except Exception as e:
-            logger.error(f"Error in addbot command: {e}")
-            await update.message.reply_text(f"❌ Error: {e}")
+        
+        bot_name, bot_token = args[0], args[1]
+        
+        # Reject malformed tokens locally before a Telegram round trip
+        if not BOT_TOKEN_RE.match(bot_token):
+            await self._reply(msg,
+                "❌ **Invalid token format**\n\n"
+                "Bot tokens look like `123456789:AAH...` (get one from @BotFather).",
+                parse_mode='Markdown'
+            )
+            return
+        
+        # Add bot token with validation
+        result = await self.bot_manager.add_named_bot_token(bot_name, bot_token)
+        
+        if result['success']:
+            self._invalidate_caches()
+            await self._reply(msg,
+                f"✅ **Bot Added Successfully**\n\n"
+                f"**Name:** {escape_markdown(bot_name)}\n"
+                f"**Bot:** @{escape_markdown(result['bot_info'].get('username', 'Unknown'))}\n"
+                f"**Title:** {escape_markdown(result['bot_info'].get('first_name', 'Unknown'))}\n\n"
+                "You can now use this bot when creating forwarding pairs with `/addpair`.",
+                parse_mode='Markdown'
+            )
+        else:
+            await self._reply(msg,
+                f"❌ **Failed to add bot**\n\n"
+                f"Error: {result['error']}\n\n"
+                "Please check the token and try again."
+            )
     
-    async def listbots_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @_admin_handler
+    async def listbots_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, msg: Message):
         """List all saved bot tokens."""
-        if not update.message:
+        rendered = await self._cached('rendered_bots', self._render_bots, ttl=RENDER_CACHE_TTL)
+        
+        if rendered is None:
+            await self._reply(msg,
+                "📭 **No Bot Tokens**\n\n"
+                "Use `/addbot <name> <token>` to add bot tokens.\n\n"
+                "**Example:**\n"
+                "`/addbot MyBot 123456:ABC...`"
+            )
             return
-            
-        try:
-            bots = await self.bot_manager.get_available_bots()
-            
-            if not bots:
-                await update.message.reply_text(
-                    "📭 **No Bot Tokens**\n\n"
-                    "Use `/addbot <name> <token>` to add bot tokens.\n\n"
-                    "**Example:**\n"
-                    "`/addbot MyBot 123456:ABC...`"
-                )
-                return
-            
-            message = "🤖 **Saved Bot Tokens**\n\n"
-            
-            for i, bot in enumerate(bots, 1):
-                message += f"**{i}. {bot['name']}**\n"
-                message += f"🤖 @{bot['username']} ({bot['first_name']})\n"
-                message += f"📅 Added: {bot['added_at'].strftime('%Y-%m-%d %H:%M')}\n\n"
-            
-            message += "**Commands:**\n"
-            message += "• `/addbot <name> <token>` - Add new bot\n"
-            message += "• `/removebot <name>` - Remove bot\n"
-            message += "• `/addpair` - Use bots in forwarding pairs"
-            
-            await update.message.reply_text(message, parse_mode='Markdown')
-            
-        except Exception as e:
-            logger.error(f"Error in listbots command: {e}")
-            await update.message.reply_text(f"❌ Error: {e}")
+        
+        await self._reply(msg, rendered, parse_mode='Markdown')
     
-    async def removebot_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def _render_bots(self) -> Optional[str]:
+        """Render the /listbots reply, or None when no bots are saved."""
+        bots = await self._cached('available_bots', self.bot_manager.get_available_bots)
+        if not bots:
+            return None
+        
+        parts = ["🤖 **Saved Bot Tokens**\n\n"]
+        
+        for i, bot in enumerate(bots, 1):
+            parts.append(f"**{i}. {escape_markdown(bot['name'])}**\n")
+            parts.append(f"🤖 @{escape_markdown(bot['username'])} ({escape_markdown(bot['first_name'])})\n")
+            parts.append(f"📅 Added: {bot['added_at'].strftime('%Y-%m-%d %H:%M')}\n\n")
+        
+        parts.append(LISTBOTS_FOOTER)
+        return "".join(parts)
+    
+    @_admin_handler
+    async def removebot_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, msg: Message):
         """Remove a named bot token."""
-        if not update.message:
+        if not context.args:
+            await self._reply(msg,
+                "**Remove Bot Token**\n\n"
+                "Usage: `/removebot <name>`\n\n"
+                "Use `/listbots` to see available bot names."
+            )
             return
-            
-        try:
-            if not context.args:
-                await update.message.reply_text(
-                    "**Remove Bot Token**\n\n"
-                    "Usage: `/removebot <name>`\n\n"
-                    "Use `/listbots` to see available bot names."
-                )
-                return
-            
-            bot_name = context.args[0]
-            success = await self.bot_manager.remove_bot_token(bot_name)
-            
-            if success:
-                await update.message.reply_text(
-                    f"✅ **Bot Removed**\n\n"
-                    f"Bot token '{bot_name}' has been removed from the system."
-                )
-            else:
-                await update.message.reply_text(
-                    f"❌ **Bot Not Found**\n\n"
-                    f"No bot token named '{bot_name}' exists.\n"
-                    f"Use `/listbots` to see available bots."
-                )
-                
-        except Exception as e:
-            logger.error(f"Error in removebot command: {e}")
-            await update.message.reply_text(f"❌ Error: {e}")
+        
+        bot_name = context.args[0]
+        success = await self.bot_manager.remove_bot_token(bot_name)
+        
+        if success:
+            self._invalidate_caches()
+            await self._reply(msg,
+                f"✅ **Bot Removed**\n\n"
+                f"Bot token '{bot_name}' has been removed from the system."
+            )
+        else:
+            await self._reply(msg,
+                f"❌ **Bot Not Found**\n\n"
+                f"No bot token named '{bot_name}' exists.\n"
+                f"Use `/listbots` to see available bots."
+            )
     
     # =============================================================================
     # FILTERING SYSTEM
     # =============================================================================
     
-    async def blockword_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @_admin_handler
+    async def blockword_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, msg: Message):
         """Block word globally."""
-        if not update.message:
+        # The argument text is already in the message; skip re-joining tokens
+        word = _command_argument(msg.text)
+        if not word:
+            await self._reply(msg,
+                "**Block Word Globally**\n\n"
+                "Usage: `/blockword <word or phrase>`\n\n"
+                "**Examples:**\n"
+                "• `/blockword spam`\n"
+                "• `/blockword unwanted phrase`\n\n"
+                "Blocked words will be filtered from all forwarded messages."
+            )
             return
-            
-        try:
-            if not context.args:
-                await update.message.reply_text(
-                    "**Block Word Globally**\n\n"
-                    "Usage: `/blockword <word or phrase>`\n\n"
-                    "**Examples:**\n"
-                    "• `/blockword spam`\n"
-                    "• `/blockword unwanted phrase`\n\n"
-                    "Blocked words will be filtered from all forwarded messages."
-                )
-                return
-            
-            word = ' '.join(context.args)
-            success = await self.message_filter.add_global_blocked_word(word)
-            
-            if success:
-                await update.message.reply_text(
-                    f"✅ **Word Blocked**\n\n"
-                    f"Added '{word}' to global blocked words.\n"
-                    f"Messages containing this word will be filtered."
-                )
-            else:
-                await update.message.reply_text(
-                    f"❌ Failed to block word '{word}'"
-                )
-                
-        except Exception as e:
-            logger.error(f"Error in blockword command: {e}")
-            await update.message.reply_text(f"❌ Error: {e}")
+        
+        success = await self.message_filter.add_global_blocked_word(word)
+        
+        if success:
+            self._invalidate_caches()
+            await self._reply(msg,
+                f"✅ **Word Blocked**\n\n"
+                f"Added '{word}' to global blocked words.\n"
+                f"Messages containing this word will be filtered."
+            )
+        else:
+            await self._reply(msg,
+                f"❌ Failed to block word '{word}'"
+            )
     
-    async def unblockword_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @_admin_handler
+    async def unblockword_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, msg: Message):
         """Unblock word globally."""
-        if not update.message:
+        word = _command_argument(msg.text)
+        if not word:
+            await self._reply(msg,
+                "**Unblock Word**\n\n"
+                "Usage: `/unblockword <word>`\n\n"
+                "Remove a word from the global blocked list."
+            )
             return
-            
-        try:
-            if not context.args:
-                await update.message.reply_text(
-                    "**Unblock Word**\n\n"
-                    "Usage: `/unblockword <word>`\n\n"
-                    "Remove a word from the global blocked list."
-                )
-                return
-            
-            word = ' '.join(context.args)
-            success = await self.message_filter.remove_global_blocked_word(word)
-            
-            if success:
-                await update.message.reply_text(f"✅ Removed '{word}' from blocked words")
-            else:
-                await update.message.reply_text(f"❌ Failed to remove '{word}'")
-                
-        except Exception as e:
-            logger.error(f"Error in unblockword command: {e}")
-            await update.message.reply_text(f"❌ Error: {e}")
+        
+        success = await self.message_filter.remove_global_blocked_word(word)
+        
+        if success:
+            self._invalidate_caches()
+            await self._reply(msg, f"✅ Removed '{word}' from blocked words")
+        else:
+            await self._reply(msg, f"❌ Failed to remove '{word}'")
     
-    async def blockimage_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @_admin_handler
+    async def blockimage_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, msg: Message):
         """Block image by perceptual hash."""
-        if not update.message:
+        if not context.args:
+            await self._reply(msg,
+                "📸 **Block Image by Hash**\n\n"
+                "Usage: `/blockimage <hash>`\n\n"
+                "**To get image hash:**\n"
+                "Send any image to the bot and it will show the hash.\n\n"
+                "**Example:**\n"
+                "`/blockimage a1b2c3d4e5f6`"
+            )
             return
-            
-        try:
-            if not context.args:
-                await update.message.reply_text(
-                    "📸 **Block Image by Hash**\n\n"
-                    "Usage: `/blockimage <hash>`\n\n"
-                    "**To get image hash:**\n"
-                    "Send any image to the bot and it will show the hash.\n\n"
-                    "**Example:**\n"
-                    "`/blockimage a1b2c3d4e5f6`"
-                )
-                return
-            
-            image_hash = context.args[0]
-            
-            # Import image hash manager
-            from utils.image_hash import image_hash_manager
-            success = await image_hash_manager.block_image_hash(image_hash)
-            
-            if success:
-                await update.message.reply_text(
-                    f"✅ **Image Blocked**\n\n"
-                    f"Hash: `{image_hash}`\n\n"
-                    "Similar images will now be filtered from all forwarded messages.",
-                    parse_mode='Markdown'
-                )
-            else:
-                await update.message.reply_text("❌ Failed to block image hash")
-                
-        except Exception as e:
-            logger.error(f"Error in blockimage command: {e}")
-            await update.message.reply_text(f"❌ Error: {e}")
+        
+        image_hash = context.args[0]
+        
+        success = await image_hash_manager.block_image_hash(image_hash)
+        
+        if success:
+            self._invalidate_caches()
+            await self._reply(msg,
+                f"✅ **Image Blocked**\n\n"
+                f"Hash: `{image_hash}`\n\n"
+                "Similar images will now be filtered from all forwarded messages.",
+                parse_mode='Markdown'
+            )
+        else:
+            await self._reply(msg, "❌ Failed to block image hash")
     
-    async def showfilters_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @_admin_handler
+    async def showfilters_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, msg: Message):
         """Show current filter settings."""
-        if not update.message:
-            return
-            
-        try:
-            stats = await self.message_filter.get_filter_stats()
-            
-            message = "🛡️ **Filter Settings**\n\n"
-            
-            # Global blocked words
-            message += f"**Blocked Words:** {stats['global_blocked_words']} words\n"
-            
-            # Image filtering
-            from utils.image_hash import image_hash_manager
-            image_stats = await image_hash_manager.get_blocked_hashes_stats()
-            message += f"**Blocked Images:** {image_stats['total_blocked_hashes']} hashes\n\n"
-            
-            # Global settings
-            message += "**Global Settings:**\n"
-            global_settings = stats.get('global_settings', {})
-            message += f"• Images: {'Blocked' if global_settings.get('filter_images', False) else 'Allowed'}\n"
-            message += f"• Headers: {'Stripped' if global_settings.get('strip_headers', False) else 'Kept'}\n"
-            message += f"• Mentions: {'Stripped' if global_settings.get('strip_mentions', False) else 'Kept'}\n\n"
-            
-            message += "**Commands:**\n"
-            message += "• `/blockword <word>` - Block word\n"
-            message += "• `/blockimage <hash>` - Block image\n"
-            message += "• `/blockimages` / `/allowimages` - Toggle images"
-            
-            await update.message.reply_text(message, parse_mode='Markdown')
-            
-        except Exception as e:
-            logger.error(f"Error in showfilters command: {e}")
-            await update.message.reply_text(f"❌ Error: {e}")
+        stats, image_stats = await asyncio.gather(
+            self._cached('filter_stats', self.message_filter.get_filter_stats),
+            self._cached('image_stats', image_hash_manager.get_blocked_hashes_stats)
+        )
+        
+        global_settings = stats.get('global_settings', {})
+        message = SHOWFILTERS_TEMPLATE.format(
+            words=stats['global_blocked_words'],
+            images=image_stats['total_blocked_hashes'],
+            images_state='Blocked' if global_settings.get('filter_images', False) else 'Allowed',
+            headers_state='Stripped' if global_settings.get('strip_headers', False) else 'Kept',
+            mentions_state='Stripped' if global_settings.get('strip_mentions', False) else 'Kept'
+        )
+        
+        await self._reply(msg, message, parse_mode='Markdown')
     
-    async def blockimages_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @_admin_handler
+    async def blockimages_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, msg: Message):
         """Block all image messages globally."""
-        if not update.message:
-            return
-            
-        try:
-            success = await self.message_filter.update_global_settings({'filter_images': True})
-            if success:
-                await update.message.reply_text("✅ **All images are now blocked globally**")
-            else:
-                await update.message.reply_text("❌ Failed to update image filtering")
-        except Exception as e:
-            await update.message.reply_text(f"❌ Error: {e}")
+        success = await self.message_filter.update_global_settings({'filter_images': True})
+        if success:
+            self._invalidate_caches()
+            await self._reply(msg, "✅ **All images are now blocked globally**")
+        else:
+            await self._reply(msg, "❌ Failed to update image filtering")
     
-    async def allowimages_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @_admin_handler
+    async def allowimages_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, msg: Message):
         """Allow all image messages globally."""
-        if not update.message:
-            return
-            
-        try:
-            success = await self.message_filter.update_global_settings({'filter_images': False})
-            if success:
-                await update.message.reply_text("✅ **All images are now allowed globally**")
-            else:
-                await update.message.reply_text("❌ Failed to update image filtering")
-        except Exception as e:
-            await update.message.reply_text(f"❌ Error: {e}")
+        success = await self.message_filter.update_global_settings({'filter_images': False})
+        if success:
+            self._invalidate_caches()
+            await self._reply(msg, "✅ **All images are now allowed globally**")
+        else:
+            await self._reply(msg, "❌ Failed to update image filtering")
     
     # =============================================================================
     # SESSION MANAGEMENT
     # =============================================================================
     
-    async def sessions_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @_admin_handler
+    async def sessions_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, msg: Message):
         """List all sessions with health status."""
-        if not update.message:
+        rendered = await self._cached('rendered_sessions', self._render_sessions, ttl=RENDER_CACHE_TTL)
+        
+        if rendered is None:
+            await self._reply(msg,
+                "📭 No Sessions Available\n\n"
+                "Use /addsession <name> <phone> to add a Telegram user session.\n\n"
+                "Example:\n"
+                "/addsession mysession +1234567890"
+            )
             return
+        
+        await self._reply(msg, rendered, parse_mode='Markdown')
+    
+    async def _render_sessions(self) -> Optional[str]:
+        """Render the /sessions reply, or None when there are no sessions."""
+        sessions = await self.database.get_all_sessions()
+        if not sessions:
+            return None
+        
+        parts = ["👥 Telegram Sessions\n\n"]
+        
+        for session in sessions:
+            status_emoji = SESSION_STATUS_EMOJI.get(session.health_status, '❓')
             
-        try:
-            sessions = await self.database.get_all_sessions()
-            
-            if not sessions:
-                await update.message.reply_text(
-                    "📭 No Sessions Available\n\n"
-                    "Use /addsession <name> <phone> to add a Telegram user session.\n\n"
-                    "Example:\n"
-                    "/addsession mysession +1234567890"
-                )
-                return
-            
-            message = "👥 Telegram Sessions\n\n"
-            
-            for session in sessions:
-                status_emoji = {
-                    'healthy': '✅',
-                    'not_found': '❌',
-                    'error': '⚠️',
-                    'deleted': '🗑️',
-                    'needs_auth': '⏳'
-                }.get(session.health_status, '❓')
-                
-                # Escape special markdown characters in session name and phone
-                session_name = session.name.replace('_', '\\_').replace('*', '\\*')
-                phone = (session.phone_number or 'Unknown').replace('_', '\\_')
-                
-                message += f"*{session_name}*\n"
-                message += f"{status_emoji} Status: {session.health_status}\n"
-                message += f"📱 Phone: {phone}\n"
-                message += f"👤 Pairs: {session.pair_count}\n"
-                
-                if session.last_verified:
-                    try:
-                        if isinstance(session.last_verified, str):
-                            # Simple parsing without complex ISO handling
-                            from datetime import datetime
-                            # Handle different datetime formats safely
-                            date_str = session.last_verified.split('.')[0]  # Remove microseconds
-                            if 'T' in date_str:
-                                last_verified = datetime.fromisoformat(date_str)
-                            else:
-                                last_verified = datetime.strptime(date_str, '%Y-%m-%d %H:%M:%S')
-                        else:
-                            last_verified = session.last_verified
-                        message += f"🕒 Last verified: {last_verified.strftime('%Y-%m-%d %H:%M')}\n"
-                    except Exception:
-                        # Fallback to raw string display
-                        safe_date = str(session.last_verified)[:16]  # Limit length
-                        message += f"🕒 Last verified: {safe_date}\n"
-                
-                message += "\n"
+            # Escape special markdown characters in session name and phone
+            session_name = escape_markdown(session.name)
+            phone = escape_markdown(session.phone_number or 'Unknown')
             
-            message += "Commands:\n"
-            message += "• /addsession <name> <phone> - Add new session\n"
-            message += "• /changesession <pair_id> <session> - Change pair session"
+            parts.append(f"*{session_name}*\n")
+            parts.append(f"{status_emoji} Status: {session.health_status}\n")
+            parts.append(f"📱 Phone: {phone}\n")
+            parts.append(f"👤 Pairs: {session.pair_count}\n")
             
-            await update.message.reply_text(message, parse_mode='Markdown')
+            if session.last_verified:
+                parts.append(f"🕒 Last verified: {_format_timestamp(session.last_verified)}\n")
             
-        except Exception as e:
-            logger.error(f"Error in sessions command: {e}")
-            await update.message.reply_text(f"❌ Error: {e}")
+            parts.append("\n")
+        
+        parts.append(SESSIONS_FOOTER)
+        return "".join(parts)
     
     # =============================================================================
     # PAIR MANAGEMENT
     # =============================================================================
     
-    async def addpair_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @_admin_handler(error_reply="❌ Error starting pair creation")
+    async def addpair_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, msg: Message):
         """Interactive pair creation command."""
-        if not update.message:
-            return
-            
-        try:
-            # Start interactive pair creation wizard
-            user_data = context.user_data
-            user_data.clear()
-            user_data['creating_pair'] = True
-            user_data['step'] = 'name'
-            
-            await update.message.reply_text(
-                "🚀 **Create New Forwarding Pair**\n\n"
-                "I'll guide you through creating a forwarding pair step by step.\n\n"
-                "**Step 1/6:** Enter a unique name for this forwarding pair:",
-                parse_mode='Markdown'
-            )
-            
-        except Exception as e:
-            logger.error(f"Error in addpair command: {e}")
-            await update.message.reply_text(f"❌ Error starting pair creation: {e}")
+        # Start interactive pair creation wizard
+        user_data = context.user_data
+        user_data.clear()
+        user_data['creating_pair'] = True
+        user_data['step'] = 'name'
+        
+        await msg.reply_text(
+            ADDPAIR_INTRO_PLAIN, entities=ADDPAIR_INTRO_ENTITIES
+        )
     
-    async def removepair_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @_admin_handler(error_reply="❌ Error removing pair")
+    async def removepair_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, msg: Message):
         """Remove a forwarding pair."""
-        if not update.message:
+        if not context.args:
+            await self._reply(msg,
+                "**Remove Forwarding Pair**\n\n"
+                "Usage: `/removepair <pair_id>`\n\n"
+                "Use `/listpairs` to see available pair IDs.\n\n"
+                "**Example:**\n"
+                "`/removepair 5`"
+            )
             return
-            
+        
         try:
-            if not context.args:
-                await update.message.reply_text(
-                    "**Remove Forwarding Pair**\n\n"
-                    "Usage: `/removepair <pair_id>`\n\n"
-                    "Use `/listpairs` to see available pair IDs.\n\n"
-                    "**Example:**\n"
-                    "`/removepair 5`"
-                )
-                return
-            
             pair_id = int(context.args[0])
-            
-            # Get pair details first
-            pair = await self.database.get_pair_by_id(pair_id)
-            if not pair:
-                await update.message.reply_text(
-                    f"❌ **Pair Not Found**\n\n"
-                    f"No forwarding pair with ID {pair_id} exists.\n"
-                    f"Use `/listpairs` to see available pairs."
-                )
-                return
-            
-            # Remove the pair
-            success = await self.database.remove_pair(pair_id)
-            
-            if success:
-                await update.message.reply_text(
-                    f"✅ **Pair Removed**\n\n"
-                    f"Forwarding pair '{pair.name}' (ID: {pair_id}) has been deleted.\n"
-                    f"All associated data has been cleaned up."
-                )
-            else:
-                await update.message.reply_text(
-                    f"❌ **Failed to Remove Pair**\n\n"
-                    f"Could not delete pair {pair_id}. Please try again."
-                )
-                
         except ValueError:
-            await update.message.reply_text("❌ Invalid pair ID. Please provide a number.")
-        except Exception as e:
-            logger.error(f"Error in removepair command: {e}")
-            await update.message.reply_text(f"❌ Error removing pair: {e}")
+            await self._reply(msg, "❌ Invalid pair ID. Please provide a number.")
+            return
+        
+        # Get pair details first
+        pair = await self.database.get_pair_by_id(pair_id)
+        if not pair:
+            await self._reply(msg,
+                f"❌ **Pair Not Found**\n\n"
+                f"No forwarding pair with ID {pair_id} exists.\n"
+                f"Use `/listpairs` to see available pairs."
+            )
+            return
+        
+        # Remove the pair
+        success = await self.database.remove_pair(pair_id)
+        
+        if success:
+            self._invalidate_caches()
+            await self._reply(msg,
+                f"✅ **Pair Removed**\n\n"
+                f"Forwarding pair '{pair.name}' (ID: {pair_id}) has been deleted.\n"
+                f"All associated data has been cleaned up."
+            )
+        else:
+            await self._reply(msg,
+                f"❌ **Failed to Remove Pair**\n\n"
+                f"Could not delete pair {pair_id}. Please try again."
+            )
 
-    async def listpairs_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @_admin_handler(debounce=True)
+    async def listpairs_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, msg: Message):
         """List all forwarding pairs."""
-        if not update.message:
+        rendered = await self._cached('rendered_pairs', self._render_pairs, ttl=RENDER_CACHE_TTL)
+        
+        if rendered is None:
+            await self._reply(msg,
+                "📭 **No Forwarding Pairs**\n\n"
+                "Use `/addpair` to create your first forwarding pair.\n\n"
+                "You'll need:\n"
+                "• A Telegram session (`/addsession`)\n"
+                "• A bot token (`/addbot`)\n"
+                "• Source chat ID and Discord channel ID\n"
+                "• Webhook will be created automatically"
+            )
             return
-            
-        try:
-            pairs = await self.database.get_all_pairs()
-            
-            if not pairs:
-                await update.message.reply_text(
-                    "📭 **No Forwarding Pairs**\n\n"
-                    "Use `/addpair` to create your first forwarding pair.\n\n"
-                    "You'll need:\n"
-                    "• A Telegram session (`/addsession`)\n"
-                    "• A bot token (`/addbot`)\n"
-                    "• Source chat ID and Discord channel ID\n"
-                    "• Webhook will be created automatically"
-                )
-                return
-            
-            message = "🔗 **Forwarding Pairs**\n\n"
-            
-            for pair in pairs:
-                status = "🟢 Active" if pair.is_active else "🔴 Disabled"
-                message += f"**{pair.id}. {pair.name}**\n"
-                message += f"{status}\n"
-                message += f"📤 Source: `{pair.telegram_source_chat_id}`\n"
-                message += f"📥 Destination: `{pair.telegram_dest_chat_id}`\n"
-                message += f"👤 Session: {pair.session_name or 'None'}\n"
-                
-                if pair.discord_channel_id:
-                    message += f"💬 Discord: `{pair.discord_channel_id}`\n"
-                
-                message += "\n"
-            
-            message += "**Commands:**\n"
-            message += "• `/addpair` - Create new pair\n"
-            message += "• `/removepair <id>` - Remove pair\n"
-            message += "• `/status` - System overview"
-            
-            await update.message.reply_text(message, parse_mode='Markdown')
-            
-        except Exception as e:
-            logger.error(f"Error in listpairs command: {e}")
-            await update.message.reply_text(f"❌ Error: {e}")
+        
+        await self._reply(msg, rendered, parse_mode='Markdown')
+    
+    async def _render_pairs(self) -> Optional[str]:
+        """Render the /listpairs reply, or None when there are no pairs."""
+        pairs = await self.database.get_all_pairs()
+        if not pairs:
+            return None
+        
+        parts = ["🔗 **Forwarding Pairs**\n\n"]
+        
+        for pair in pairs:
+            status = "🟢 Active" if pair.is_active else "🔴 Disabled"
+            parts.append(f"**{pair.id}. {escape_markdown(pair.name)}**\n")
+            parts.append(f"{status}\n")
+            parts.append(f"📤 Source: `{pair.telegram_source_chat_id}`\n")
+            parts.append(f"📥 Destination: `{pair.telegram_dest_chat_id}`\n")
+            parts.append(f"👤 Session: {escape_markdown(pair.session_name or 'None')}\n")
+            
+            if pair.discord_channel_id:
+                parts.append(f"💬 Discord: `{pair.discord_channel_id}`\n")
+            
+            parts.append("\n")
+        
+        parts.append(LISTPAIRS_FOOTER)
+        return "".join(parts)
     
-    async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @_admin_handler(debounce=True)
+    async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, msg: Message):
         """Show system status."""
-        if not update.message:
-            return
-            
-        try:
-            # Get basic stats
-            pairs = await self.database.get_all_pairs() or []
-            sessions = await self.database.get_all_sessions() or []
-            
-            active_pairs = len([p for p in pairs if p.is_active])
-            healthy_sessions = len([s for s in sessions if s.health_status == 'healthy'])
-            
-            # Get filter stats
-            filter_stats = await self.message_filter.get_filter_stats()
-            
-            message = "📊 **System Status**\n\n"
-            
-            message += "**Overview:**\n"
-            message += f"• Forwarding Pairs: {active_pairs}/{len(pairs)} active\n"
-            message += f"• Telegram Sessions: {healthy_sessions}/{len(sessions)} healthy\n"
-            message += f"• Blocked Words: {filter_stats['global_blocked_words']}\n\n"
-            
-            # Bot tokens
-            bots = await self.bot_manager.get_available_bots()
-            message += f"• Saved Bot Tokens: {len(bots)}\n\n"
-            
-            message += "**System Health:**\n"
+        # Fetch independent stats concurrently
+        results = await asyncio.gather(
+            self.database.get_all_pairs(),
+            self.database.get_all_sessions(),
+            self._cached('filter_stats', self.message_filter.get_filter_stats),
+            self._cached('available_bots', self.bot_manager.get_available_bots),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning("Status fetch failed: {}", result)
+        pairs_failed, sessions_failed = (isinstance(result, Exception) for result in results[:2])
+        pairs, sessions, filter_stats, bots = (
+            None if isinstance(result, Exception) else result for result in results
+        )
+        pairs = pairs or []
+        sessions = sessions or []
+        filter_stats = filter_stats or {}
+        bots = bots or []
+        
+        # Unknown counts show as "?" rather than a misleading 0
+        active_pairs = "?" if pairs_failed else sum(1 for p in pairs if p.is_active)
+        total_pairs = "?" if pairs_failed else len(pairs)
+        healthy_sessions = "?" if sessions_failed else sum(1 for s in sessions if s.health_status == 'healthy')
+        total_sessions = "?" if sessions_failed else len(sessions)
+        
+        message = "📊 **System Status**\n\n"
+        
+        message += "**Overview:**\n"
+        message += f"• Forwarding Pairs: {active_pairs}/{total_pairs} active\n"
+        message += f"• Telegram Sessions: {healthy_sessions}/{total_sessions} healthy\n"
+        message += f"• Blocked Words: {filter_stats.get('global_blocked_words', 0)}\n\n"
+        
+        # Bot tokens
+        message += f"• Saved Bot Tokens: {len(bots)}\n\n"
+        
+        message += "**System Health:**\n"
+        if pairs_failed or sessions_failed:
+            message += "❌ Database: Error\n"
+        else:
             message += "✅ Database: Connected\n"
-            message += "✅ Message Filter: Active\n"
-            message += "✅ Admin Bot: Running\n\n"
-            
-            message += f"**Uptime:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-            
-            message += "**Quick Actions:**\n"
-            message += "• `/sessions` - View session details\n"
-            message += "• `/listpairs` - View pair details\n"
-            message += "• `/listbots` - View bot tokens"
-            
-            await update.message.reply_text(message, parse_mode='Markdown')
-            
-        except Exception as e:
-            logger.error(f"Error in status command: {e}")
-            await update.message.reply_text(f"❌ Error: {e}")
+        message += "✅ Message Filter: Active\n"
+        message += "✅ Admin Bot: Running\n\n"
+        
+        message += f"**Uptime:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+        
+        message += STATUS_FOOTER
+        
+        await self._reply(msg, message, parse_mode='Markdown')
     
     # =============================================================================
     # IMAGE HANDLING
     # =============================================================================
     
-    async def handle_image_upload(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @_admin_handler(error_reply="❌ Error processing image")
+    async def handle_image_upload(self, update: Update, context: ContextTypes.DEFAULT_TYPE, msg: Message):
         """Handle image uploads for hash generation."""
-        if not update.message or not update.message.photo:
+        if not msg.photo:
             return
         
-        try:
-            # Get the largest photo
-            photo = update.message.photo[-1]
-            
-            # Download the image
-            file = await context.bot.get_file(photo.file_id)
-            
-            # Download image data
-            import requests
-            response = requests.get(file.file_path)
-            if response.status_code != 200:
-                await update.message.reply_text("❌ Failed to download image")
+        # Get the largest photo
+        photo = msg.photo[-1]
+        if photo.file_size and photo.file_size > MAX_IMAGE_SIZE:
+            await self._reply(msg, "❌ Image is too large to hash")
+            return
+        
+        # Download the image
+        file = await context.bot.get_file(photo.file_id)
+        
+        with tempfile.SpooledTemporaryFile(max_size=IMAGE_SPOOL_SIZE) as image_file:
+            # Write straight into the spooled file through the bot's async HTTP client
+            try:
+                await file.download_to_memory(out=image_file)
+            except Exception as e:
+                logger.warning("Image download failed: {}", e)
+                await self._reply(msg, "❌ Failed to download image")
                 return
+            image_file.seek(0)
             
-            image_data = response.content
-            
-            # Calculate perceptual hash
-            from utils.image_hash import image_hash_manager
-            image_hash = image_hash_manager.calculate_image_hash(image_data)
-            
-            if image_hash:
-                await update.message.reply_text(
-                    f"📸 **Image Hash Generated**\n\n"
-                    f"**Hash:** `{image_hash}`\n\n"
-                    f"**To block this image:**\n"
-                    f"`/blockimage {image_hash}`\n\n"
-                    f"This hash identifies similar images using perceptual analysis.",
-                    parse_mode='Markdown'
-                )
-            else:
-                await update.message.reply_text(
-                    "❌ Failed to generate image hash. Make sure imagehash library is available."
-                )
-                
-        except Exception as e:
-            logger.error(f"Error handling image upload: {e}")
-            await update.message.reply_text(f"❌ Error processing image: {e}")
+            # Calculate perceptual hash off the event loop (PIL decode is CPU-bound)
+            image_hash = await asyncio.to_thread(image_hash_manager.calculate_image_hash_stream, image_file)
+        
+        if image_hash:
+            await self._reply(msg,
+                f"📸 **Image Hash Generated**\n\n"
+                f"**Hash:** `{image_hash}`\n\n"
+                f"**To block this image:**\n"
+                f"`/blockimage {image_hash}`\n\n"
+                f"This hash identifies similar images using perceptual analysis.",
+                parse_mode='Markdown'
+            )
+        else:
+            await self._reply(msg,
+                "❌ Failed to generate image hash. Make sure imagehash library is available."
+            )
     
     # =============================================================================
     # PAIR CREATION WIZARD
@@ -681,13 +800,14 @@ class UnifiedAdminCommands:
             return False
         
         step = user_data.get('step')
-        text = update.message.text.strip()
+        msg = update.message
+        text = msg.text.strip()
         
         try:
             if step == 'name':
                 user_data['name'] = text
                 user_data['step'] = 'source_chat'
-                await update.message.reply_text(
+                await msg.reply_text(
                     "**Step 2/6:** Enter the source Telegram chat ID (where messages come from):\n\n"
                     "💡 Forward a message from the chat and use /chatinfo to get the ID.\n"
                     "💡 For channels, use the channel username or ID.",
@@ -699,11 +819,11 @@ class UnifiedAdminCommands:
                 try:
                     user_data['source_chat'] = int(text)
                 except ValueError:
-                    await update.message.reply_text("❌ Please enter a valid chat ID (numbers only)")
+                    await msg.reply_text("❌ Please enter a valid chat ID (numbers only)")
                     return True
                 
                 user_data['step'] = 'discord_channel'
-                await update.message.reply_text(
+                await msg.reply_text(
                     "**Step 3/6:** Enter the Discord channel ID:\n\n"
                     "💡 Right-click on the Discord channel → Copy Channel ID\n"
                     "💡 Enable Developer Mode in Discord settings if needed\n"
@@ -717,11 +837,11 @@ class UnifiedAdminCommands:
                     discord_channel_id = int(text)
                     user_data['discord_channel_id'] = discord_channel_id
                 except ValueError:
-                    await update.message.reply_text("❌ Please enter a valid Discord channel ID (numbers only)")
+                    await msg.reply_text("❌ Please enter a valid Discord channel ID (numbers only)")
                     return True
                 
                 user_data['step'] = 'dest_chat'
-                await update.message.reply_text(
+                await msg.reply_text(
                     "**Step 4/6:** Enter the destination Telegram chat ID (where messages go):\n\n"
                     "💡 This is where forwarded messages will be posted.\n"
                     "💡 Make sure the bot has posting permissions.",
@@ -733,13 +853,13 @@ class UnifiedAdminCommands:
                 try:
                     user_data['dest_chat'] = int(text)
                 except ValueError:
-                    await update.message.reply_text("❌ Please enter a valid chat ID (numbers only)")
+                    await msg.reply_text("❌ Please enter a valid chat ID (numbers only)")
                     return True
                 
                 # Show available sessions
                 sessions = await self.database.get_all_sessions()
                 if not sessions:
-                    await update.message.reply_text(
+                    await msg.reply_text(
                         "❌ **No Sessions Available**\n\n"
                         "You need to add a Telegram session first.\n"
                         "Use `/addsession` to add a session, then try creating the pair again."
@@ -749,7 +869,7 @@ class UnifiedAdminCommands:
                 
                 session_list = "\n".join([f"• {s.name}" for s in sessions])
                 user_data['step'] = 'session'
-                await update.message.reply_text(
+                await msg.reply_text(
                     f"**Step 5/6:** Choose a Telegram session:\n\n"
                     f"**Available sessions:**\n{session_list}\n\n"
                     f"Enter the session name:",
@@ -763,7 +883,7 @@ class UnifiedAdminCommands:
                 valid_sessions = [s.name for s in sessions]
                 
                 if text not in valid_sessions:
-                    await update.message.reply_text(
+                    await msg.reply_text(
                         f"❌ Invalid session name. Available sessions:\n"
                         f"{', '.join(valid_sessions)}"
                     )
@@ -774,7 +894,7 @@ class UnifiedAdminCommands:
                 # Show available bots
                 bots = await self.bot_manager.get_available_bots()
                 if not bots:
-                    await update.message.reply_text(
+                    await msg.reply_text(
                         "❌ **No Bot Tokens Available**\n\n"
                         "You need to add a bot token first.\n"
                         "Use `/addbot` to add a bot token, then try creating the pair again."
@@ -784,7 +904,7 @@ class UnifiedAdminCommands:
                 
                 bot_list = "\n".join([f"• {b['name']} (@{b['username']})" for b in bots])
                 user_data['step'] = 'bot'
-                await update.message.reply_text(
+                await msg.reply_text(
                     f"**Step 6/6:** Choose a bot token for posting:\n\n"
                     f"**Available bots:**\n{bot_list}\n\n"
                     f"Enter the bot name:",
@@ -804,7 +924,7 @@ class UnifiedAdminCommands:
                 
                 if not selected_bot:
                     bot_names = [b['name'] for b in bots]
-                    await update.message.reply_text(
+                    await msg.reply_text(
                         f"❌ Invalid bot name. Available bots:\n"
                         f"{', '.join(bot_names)}"
                     )
@@ -815,8 +935,8 @@ class UnifiedAdminCommands:
                 return True
                 
         except Exception as e:
-            logger.error(f"Error in pair creation wizard: {e}")
-            await update.message.reply_text(f"❌ Error: {e}")
+            logger.error("Error in pair creation wizard: {}", e)
+            await msg.reply_text(f"❌ Error: {e}")
             user_data.clear()
             
         return False
@@ -824,12 +944,13 @@ class UnifiedAdminCommands:
     async def _create_pair_from_wizard(self, update: Update, context: ContextTypes.DEFAULT_TYPE, selected_bot: Dict[str, Any]):
         """Create the forwarding pair from wizard data."""
         user_data = context.user_data
+        msg = update.message
         
         try:
             # Get bot token by name (the selected_bot dict doesn't contain token for security)
             bot_token = await self.bot_manager.get_bot_token_by_name(selected_bot['name'])
             if not bot_token:
-                await update.message.reply_text(
+                await msg.reply_text(
                     f"❌ **Bot Token Error**\n\n"
                     f"Could not retrieve token for bot '{selected_bot['name']}'.\n"
                     "Please try adding the bot again with `/addbot`."
@@ -844,7 +965,7 @@ class UnifiedAdminCommands:
             # Validate chat permissions
             chat_validation = await BotTokenValidator.validate_chat_permissions(bot_token, dest_chat)
             if not chat_validation['valid']:
-                await update.message.reply_text(
+                await msg.reply_text(
                     f"❌ **Bot Permission Error**\n\n"
                     f"The bot cannot post to chat {dest_chat}.\n\n"
                     f"**Error:** {chat_validation['error']}\n\n"
@@ -856,7 +977,7 @@ class UnifiedAdminCommands:
             # Send test message
             test_result = await BotTokenValidator.send_test_message(bot_token, dest_chat)
             if not test_result['valid']:
-                await update.message.reply_text(
+                await msg.reply_text(
                     f"⚠️ **Warning: Test Message Failed**\n\n"
                     f"The bot has permissions but test message failed:\n"
                     f"{test_result['error']}\n\n"
@@ -873,7 +994,7 @@ class UnifiedAdminCommands:
             )
             
             if not webhook_url:
-                await update.message.reply_text(
+                await msg.reply_text(
                     "❌ **Failed to create Discord webhook**\n\n"
                     "Please check that:\n"
                     "• The Discord bot has permission to manage webhooks\n"
@@ -903,16 +1024,17 @@ class UnifiedAdminCommands:
             pair_id = await self.database.add_pair(pair)
             
             if pair_id:
+                self._invalidate_caches()
                 success_message = (
                     "🎉 **Forwarding Pair Created Successfully!**\n\n"
                     f"**Pair ID:** {pair_id}\n"
-                    f"**Name:** {user_data['name']}\n"
+                    f"**Name:** {escape_markdown(user_data['name'])}\n"
                     f"**Source:** `{user_data['source_chat']}`\n"
                     f"**Discord Channel:** `{user_data['discord_channel_id']}`\n"
                     f"**Webhook:** Created automatically\n"
                     f"**Destination:** `{user_data['dest_chat']}`\n"
-                    f"**Session:** {user_data['session']}\n"
-                    f"**Bot:** {selected_bot['name']} (@{selected_bot['username']})\n\n"
+                    f"**Session:** {escape_markdown(user_data['session'])}\n"
+                    f"**Bot:** {escape_markdown(selected_bot['name'])} (@{escape_markdown(selected_bot['username'])})\n\n"
                 )
                 
                 if test_result['valid']:
@@ -920,13 +1042,13 @@ class UnifiedAdminCommands:
                 
                 success_message += "The pair is now active and ready for forwarding."
                 
-                await update.message.reply_text(success_message, parse_mode='Markdown')
+                await msg.reply_text(success_message, parse_mode='Markdown')
             else:
-                await update.message.reply_text("❌ Failed to create forwarding pair in database.")
+                await msg.reply_text("❌ Failed to create forwarding pair in database.")
             
         except Exception as e:
-            logger.error(f"Error creating pair from wizard: {e}")
-            await update.message.reply_text(f"❌ Error creating pair: {e}")
+            logger.error("Error creating pair from wizard: {}", e)
+            await msg.reply_text(f"❌ Error creating pair: {e}")
         finally:
             user_data.clear()
     
@@ -944,7 +1066,7 @@ class UnifiedAdminCommands:
             return f"TG_Channel_{abs(chat_id)}"
             
         except Exception as e:
-            logger.error(f"Error getting channel name for {chat_id}: {e}")
+            logger.error("Error getting channel name for {}: {}", chat_id, e)
             return None
     
     async def _create_discord_webhook(self, channel_id: int, webhook_name: str) -> Optional[str]:
@@ -976,7 +1098,7 @@ class UnifiedAdminCommands:
                 try:
                     channel = client.get_channel(channel_id)
                     if not channel:
-                        logger.error(f"Discord channel {channel_id} not found")
+                        logger.error("Discord channel {} not found", channel_id)
                         await client.close()
                         return
                     
@@ -985,17 +1107,17 @@ class UnifiedAdminCommands:
                     for webhook in existing_webhooks:
                         if webhook.name == webhook_name:
                             webhook_url = webhook.url
-                            logger.info(f"Using existing webhook: {webhook_name}")
+                            logger.info("Using existing webhook: {}", webhook_name)
                             await client.close()
                             return
                     
                     # Create new webhook
                     webhook = await channel.create_webhook(name=webhook_name)
                     webhook_url = webhook.url
-                    logger.info(f"Created Discord webhook: {webhook_name} in channel {channel_id}")
+                    logger.info("Created Discord webhook: {} in channel {}", webhook_name, channel_id)
                     
                 except Exception as e:
-                    logger.error(f"Error creating Discord webhook: {e}")
+                    logger.error("Error creating Discord webhook: {}", e)
                 finally:
                     await client.close()
             
@@ -1004,95 +1126,83 @@ class UnifiedAdminCommands:
             return webhook_url
             
         except Exception as e:
-            logger.error(f"Error in Discord webhook creation: {e}")
+            logger.error("Error in Discord webhook creation: {}", e)
             return None
 
-    async def testbot_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @_admin_handler(error_reply="❌ Error testing bot permissions")
+    async def testbot_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, msg: Message):
         """Test bot permissions in a specific chat."""
-        if not update.message:
+        if len(context.args) < 2:
+            await msg.reply_text(
+                TESTBOT_USAGE_PLAIN, entities=TESTBOT_USAGE_ENTITIES
+            )
             return
             
+        bot_name = context.args[0]
         try:
-            if len(context.args) < 2:
-                await update.message.reply_text(
-                    "**Test Bot Permissions**\n\n"
-                    "Usage: `/testbot <bot_name> <chat_id>`\n\n" 
-                    "**Example:**\n"
-                    "`/testbot MyBot -1001234567890`\n\n"
-                    "This will test if the bot can send messages to the specified chat.",
-                    parse_mode='Markdown'
-                )
-                return
-                
-            bot_name = context.args[0]
-            try:
-                chat_id = int(context.args[1])
-            except ValueError:
-                await update.message.reply_text("❌ Invalid chat ID format. Use numbers like -1001234567890")
-                return
-            
-            # Get bot token
-            bot_token = await self.bot_manager.get_bot_token_by_name(bot_name)
-            if not bot_token:
-                available_bots = await self.bot_manager.get_available_bots()
-                bot_names = [b['name'] for b in available_bots]
-                await update.message.reply_text(
-                    f"❌ Bot '{bot_name}' not found.\n\n"
-                    f"Available bots: {', '.join(bot_names) if bot_names else 'None'}"
-                )
-                return
-            
-            await update.message.reply_text(f"🔍 Testing bot '{bot_name}' permissions for chat {chat_id}...")
-            
-            # Import validation class
-            from core.bot_token_manager import BotTokenValidator
-            
-            # Test bot token validity
-            token_validation = await BotTokenValidator.validate_bot_token(bot_token)
-            if not token_validation['valid']:
-                await update.message.reply_text(
-                    f"❌ **Bot Token Invalid**\n\n"
-                    f"Error: {token_validation['error']}"
-                )
-                return
-            
-            # Test chat permissions
-            chat_validation = await BotTokenValidator.validate_chat_permissions(bot_token, chat_id)
-            if not chat_validation['valid']:
-                await update.message.reply_text(
-                    f"❌ **Bot Permission Error**\n\n"
-                    f"Error: {chat_validation['error']}\n\n"
-                    "**Common Solutions:**\n"
-                    "• Add bot to the destination chat\n"
-                    "• Give bot 'Send Messages' permission\n"
-                    "• For channels: Give 'Post Messages' permission\n"
-                    "• Make sure chat ID is correct"
-                )
-                return
-            
-            # Test sending message
-            test_result = await BotTokenValidator.send_test_message(bot_token, chat_id)
-            
-            if test_result['valid']:
-                await update.message.reply_text(
-                    f"✅ **Bot Permission Test PASSED**\n\n"
-                    f"**Bot:** @{token_validation['username']}\n"
-                    f"**Chat:** {chat_id}\n"
-                    f"**Status:** {chat_validation['status']}\n"
-                    f"**Send Messages:** {chat_validation['can_send_messages']}\n"
-                    f"**Send Media:** {chat_validation['can_send_media']}\n"
-                    f"**Edit Messages:** {chat_validation['can_edit_messages']}\n"
-                    f"**Delete Messages:** {chat_validation['can_delete_messages']}\n\n"
-                    "The bot is ready for forwarding!"
-                )
-            else:
-                await update.message.reply_text(
-                    f"⚠️ **Permission Test Warning**\n\n"
-                    f"Bot has basic permissions but test message failed:\n"
-                    f"{test_result['error']}\n\n"
-                    "Please check the destination chat for any restrictions."
-                )
-            
-        except Exception as e:
-            logger.error(f"Error in testbot command: {e}")
-            await update.message.reply_text(f"❌ Error testing bot permissions: {e}")
\ No newline at end of file
+            chat_id = int(context.args[1])
+        except ValueError:
+            await msg.reply_text("❌ Invalid chat ID format. Use numbers like -1001234567890")
+            return
+        
+        # Get bot token
+        bot_token = await self.bot_manager.get_bot_token_by_name(bot_name)
+        if not bot_token:
+            available_bots = await self.bot_manager.get_available_bots()
+            bot_names = [b['name'] for b in available_bots]
+            await msg.reply_text(
+                f"❌ Bot '{bot_name}' not found.\n\n"
+                f"Available bots: {', '.join(bot_names) if bot_names else 'None'}"
+            )
+            return
+        
+        await msg.reply_text(f"🔍 Testing bot '{bot_name}' permissions for chat {chat_id}...")
+        
+        # Import validation class
+        from core.bot_token_manager import BotTokenValidator
+        
+        # Test bot token validity
+        token_validation = await BotTokenValidator.validate_bot_token(bot_token)
+        if not token_validation['valid']:
+            await msg.reply_text(
+                f"❌ **Bot Token Invalid**\n\n"
+                f"Error: {token_validation['error']}"
+            )
+            return
+        
+        # Test chat permissions
+        chat_validation = await BotTokenValidator.validate_chat_permissions(bot_token, chat_id)
+        if not chat_validation['valid']:
+            await msg.reply_text(
+                f"❌ **Bot Permission Error**\n\n"
+                f"Error: {chat_validation['error']}\n\n"
+                "**Common Solutions:**\n"
+                "• Add bot to the destination chat\n"
+                "• Give bot 'Send Messages' permission\n"
+                "• For channels: Give 'Post Messages' permission\n"
+                "• Make sure chat ID is correct"
+            )
+            return
+        
+        # Test sending message
+        test_result = await BotTokenValidator.send_test_message(bot_token, chat_id)
+        
+        if test_result['valid']:
+            await msg.reply_text(
+                f"✅ **Bot Permission Test PASSED**\n\n"
+                f"**Bot:** @{token_validation['username']}\n"
+                f"**Chat:** {chat_id}\n"
+                f"**Status:** {chat_validation['status']}\n"
+                f"**Send Messages:** {chat_validation['can_send_messages']}\n"
+                f"**Send Media:** {chat_validation['can_send_media']}\n"
+                f"**Edit Messages:** {chat_validation['can_edit_messages']}\n"
+                f"**Delete Messages:** {chat_validation['can_delete_messages']}\n\n"
+                "The bot is ready for forwarding!"
+            )
+        else:
+            await msg.reply_text(
+                f"⚠️ **Permission Test Warning**\n\n"
+                f"Bot has basic permissions but test message failed:\n"
+                f"{test_result['error']}\n\n"
+                "Please check the destination chat for any restrictions."
+            )
\ No newline at end of file
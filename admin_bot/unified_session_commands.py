@@ -1,15 +1,131 @@
 """Unified session management with a single /addsession command."""
 
 import asyncio
-from typing import Dict, Any
-from datetime import datetime, timedelta
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+import heapq
+import html
+import itertools
+import re
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from telegram import Message, Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest, TelegramError
 from telegram.ext import ContextTypes
 from loguru import logger
 
 from core.database import Database
 from core.advanced_session_manager import AdvancedSessionManager
 
+# Unverified sessions are discarded after this many seconds
+VERIFICATION_TTL = 600
+# Upper bound on verifications held at once; the oldest is dropped beyond it
+MAX_PENDING_VERIFICATIONS = 10_000
+
+# Suffix making verification IDs unique within this process
+_verification_seq = itertools.count()
+
+# Session names are letters, digits, underscores and hyphens
+SESSION_NAME_RE = re.compile(r'^[A-Za-z0-9_-]+$')
+# International format: '+' followed by at least 7 digits
+PHONE_NUMBER_RE = re.compile(r'^\+\d{7,}$')
+# Login codes are 4-8 digits
+OTP_CODE_RE = re.compile(r'^\d{4,8}$')
+
+ADDSESSION_HELP_TEXT = (
+    "📱 <b>Add Session - Complete Guide</b>\n\n"
+    "<b>Step 1: Add your session</b>\n"
+    "<code>/addsession &lt;session_name&gt; &lt;phone_number&gt;</code>\n\n"
+    "<b>Example:</b>\n"
+    "<code>/addsession my_session +1234567890</code>\n\n"
+    "<b>What happens next:</b>\n"
+    "1. Bot registers your session\n"
+    "2. Sends OTP to your phone\n"
+    "3. You enter the code when prompted\n"
+    "4. Session is ready to use!\n\n"
+    "<b>Requirements:</b>\n"
+    "• Use country code with phone (+1, +44, etc.)\n"
+    "• Session name: letters, numbers, underscores only\n"
+    "• Have your phone ready for OTP\n\n"
+    "<b>Tips:</b>\n"
+    "• Choose a simple session name\n"
+    "• Keep your phone accessible\n"
+    "• OTP usually arrives within 30 seconds"
+)
+
+MISSING_ARGS_TEXT = (
+    "❌ <b>Missing information</b>\n\n"
+    "Usage: <code>/addsession &lt;session_name&gt; &lt;phone_number&gt;</code>\n"
+    "Example: <code>/addsession my_session +1234567890</code>"
+)
+
+INVALID_NAME_TEXT = (
+    "❌ <b>Invalid session name</b>\n\n"
+    "Session name can only contain:\n"
+    "• Letters (a-z, A-Z)\n"
+    "• Numbers (0-9)\n"
+    "• Underscores (_)\n"
+    "• Hyphens (-)\n\n"
+    "Example: <code>my_session</code> or <code>user-1</code>"
+)
+
+INVALID_PHONE_TEXT = (
+    "❌ <b>Invalid phone number</b>\n\n"
+    "Phone number must:\n"
+    "• Start with country code (+1, +44, etc.)\n"
+    "• Be at least 8 digits long\n\n"
+    "Examples:\n"
+    "• <code>+1234567890</code> (US)\n"
+    "• <code>+447123456789</code> (UK)\n"
+    "• <code>+91987654321</code> (India)"
+)
+
+TOO_MANY_PENDING_TEXT = (
+    "❌ <b>Too many pending sessions</b>\n\n"
+    "You have too many sessions waiting for verification.\n"
+    "Please complete or cancel existing verifications first."
+)
+
+SYSTEM_ERROR_TEXT = (
+    "❌ <b>System error</b>\n\n"
+    "An unexpected error occurred. Please try again."
+)
+
+OTP_SENT_TEMPLATE = (
+    "📱 <b>OTP sent to {phone_number}</b>\n\n"
+    "✅ Session '{session_name}' registered\n"
+    "📨 Verification code sent to your phone\n"
+    "⏰ Code expires in 5 minutes\n\n"
+    "<b>Next step:</b> Click 'Enter OTP Code' below and provide the verification code you received."
+)
+
+VERIFICATION_EXPIRED_TEXT = (
+    "❌ <b>Verification expired</b>\n\n"
+    "This verification session has expired or been completed.\n"
+    "Please use <code>/addsession</code> to start over."
+)
+
+INVALID_CODE_FORMAT_TEXT = (
+    "❌ <b>Invalid code format</b>\n\n"
+    "Verification codes are usually 4-6 digits.\n"
+    "Please check and try again."
+)
+
+VERIFICATION_ERROR_TEXT = (
+    "❌ <b>Verification error</b>\n\n"
+    "An error occurred during verification.\n"
+    "Please try <code>/addsession</code> again."
+)
+
+
+def _otp_keyboard(verification_id: str, *, with_enter: bool = True) -> InlineKeyboardMarkup:
+    """Build the Enter/Resend/Cancel keyboard attached to OTP prompts."""
+    rows = [
+        [InlineKeyboardButton("🔄 Resend OTP", callback_data=f"resend_otp:{verification_id}")],
+        [InlineKeyboardButton("❌ Cancel", callback_data=f"cancel_otp:{verification_id}")]
+    ]
+    if with_enter:
+        rows.insert(0, [InlineKeyboardButton("🔢 Enter OTP Code", callback_data=f"enter_otp:{verification_id}")])
+    return InlineKeyboardMarkup(rows)
+
 
 class UnifiedSessionCommands:
     """Unified session management with single command for adding sessions."""
@@ -19,6 +135,28 @@ class UnifiedSessionCommands:
         self.advanced_session_manager = advanced_session_manager
         # Store pending OTP verifications
         self.pending_verifications = {}
+        # Secondary indexes so per-user lookups don't scan every verification.
+        # Per-user IDs are kept as dict keys (values unused) so they stay in
+        # creation order and the fallback lookup picks the oldest deterministically
+        self._by_user: Dict[int, Dict[str, None]] = {}
+        self._waiting_by_user: Dict[int, str] = {}
+        # Names with a row in the sessions table, loaded on first use. Only
+        # names in here need a database lookup before registering; the
+        # manager re-checks on register, so a missed name is still caught.
+        self._known_sessions: Optional[Set[str]] = None
+        # (expires_at, verification_id) min-heap drained by a single background
+        # task started on demand; entries whose verification already ended are skipped
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._sweeper_task: Optional[asyncio.Task] = None
+        # Fire-and-forget tasks, referenced until done so they aren't collected
+        self._background_tasks: Set[asyncio.Task] = set()
+        # Called after a session is added, verified or deleted
+        self.on_sessions_changed: Optional[Callable[[], None]] = None
+    
+    def _sessions_changed(self):
+        """Notify the listener that the sessions table changed."""
+        if self.on_sessions_changed:
+            self.on_sessions_changed()
     
     async def addsession_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /addsession command with automatic OTP verification."""
@@ -27,37 +165,12 @@ class UnifiedSessionCommands:
             
             # Show help if no arguments provided
             if not args:
-                help_text = (
-                    "📱 **Add Session - Complete Guide**\n\n"
-                    "**Step 1: Add your session**\n"
-                    "`/addsession <session_name> <phone_number>`\n\n"
-                    "**Example:**\n"
-                    "`/addsession my_session +1234567890`\n\n"
-                    "**What happens next:**\n"
-                    "1. Bot registers your session\n"
-                    "2. Sends OTP to your phone\n"
-                    "3. You enter the code when prompted\n"
-                    "4. Session is ready to use!\n\n"
-                    "**Requirements:**\n"
-                    "• Use country code with phone (+1, +44, etc.)\n"
-                    "• Session name: letters, numbers, underscores only\n"
-                    "• Have your phone ready for OTP\n\n"
-                    "**Tips:**\n"
-                    "• Choose a simple session name\n"
-                    "• Keep your phone accessible\n"
-                    "• OTP usually arrives within 30 seconds"
-                )
-                await update.message.reply_text(help_text, parse_mode='Markdown')
+                await update.message.reply_text(ADDSESSION_HELP_TEXT, parse_mode='HTML')
                 return
             
             # Parse arguments
             if len(args) < 2:
-                await update.message.reply_text(
-                    "❌ **Missing information**\n\n"
-                    "Usage: `/addsession <session_name> <phone_number>`\n"
-                    "Example: `/addsession my_session +1234567890`",
-                    parse_mode='Markdown'
-                )
+                await update.message.reply_text(MISSING_ARGS_TEXT, parse_mode='HTML')
                 return
             
             session_name = args[0].strip()
@@ -65,176 +178,128 @@ class UnifiedSessionCommands:
             user_id = update.effective_user.id if update.effective_user else 0
             
             # Validate session name
-            if not session_name or not session_name.replace('_', '').replace('-', '').isalnum():
-                await update.message.reply_text(
-                    "❌ **Invalid session name**\n\n"
-                    "Session name can only contain:\n"
-                    "• Letters (a-z, A-Z)\n"
-                    "• Numbers (0-9)\n"
-                    "• Underscores (_)\n"
-                    "• Hyphens (-)\n\n"
-                    "Example: `my_session` or `user-1`"
-                )
+            if not SESSION_NAME_RE.match(session_name):
+                await update.message.reply_text(INVALID_NAME_TEXT, parse_mode='HTML')
                 return
             
             # Validate phone number
-            if not phone_number.startswith('+') or len(phone_number) < 8:
-                await update.message.reply_text(
-                    "❌ **Invalid phone number**\n\n"
-                    "Phone number must:\n"
-                    "• Start with country code (+1, +44, etc.)\n"
-                    "• Be at least 8 digits long\n\n"
-                    "Examples:\n"
-                    "• `+1234567890` (US)\n"
-                    "• `+447123456789` (UK)\n"
-                    "• `+91987654321` (India)"
-                )
+            if not PHONE_NUMBER_RE.match(phone_number):
+                await update.message.reply_text(INVALID_PHONE_TEXT, parse_mode='HTML')
                 return
             
             # Check if session already exists
-            existing_session = await self.database.get_session_info(session_name)
-            if existing_session:
+            if self._known_sessions is None:
+                self._known_sessions = set(await self.database.get_session_names())
+            if session_name in self._known_sessions and await self.database.get_session_info(session_name):
                 await update.message.reply_text(
-                    f"❌ **Session already exists**\n\n"
+                    f"❌ <b>Session already exists</b>\n\n"
                     f"Session '{session_name}' is already registered.\n"
-                    f"Choose a different name or delete the existing session first."
+                    f"Choose a different name or delete the existing session first.",
+                    parse_mode='HTML'
                 )
                 return
             
             # Check if user has too many pending verifications
-            user_pending = [k for k, v in self.pending_verifications.items() 
-                           if v.get('user_id') == user_id]
-            if len(user_pending) >= 3:
-                await update.message.reply_text(
-                    "❌ **Too many pending sessions**\n\n"
-                    "You have too many sessions waiting for verification.\n"
-                    "Please complete or cancel existing verifications first."
-                )
+            if len(self._by_user.get(user_id, ())) >= 3:
+                await update.message.reply_text(TOO_MANY_PENDING_TEXT, parse_mode='HTML')
                 return
             
             # Start the session creation process
             progress_message = await update.message.reply_text(
-                f"🔄 **Setting up session '{session_name}'**\n\n"
+                f"🔄 <b>Setting up session '{session_name}'</b>\n\n"
                 f"📱 Phone: {phone_number}\n"
-                f"⏳ Registering session...",
-                parse_mode='Markdown'
+                f"⏳ Registering session and sending OTP...",
+                parse_mode='HTML'
             )
             
+            # Set while a session is registered but not yet tracked as a pending
+            # verification; if setup fails in that window, the finally below
+            # removes it since neither the manager nor the sweeper will
+            untracked_session = False
+            
             try:
-                # Register the session with default settings
-                success = await self.advanced_session_manager.register_session(
+                # Register the session with default settings and request the OTP;
+                # the manager rolls the registration back if this fails
+                auth_result = await self.advanced_session_manager.register_and_start_auth(
                     session_name, 
                     phone_number, 
                     priority=5,  # Default priority
                     max_pairs=30  # Default capacity
                 )
                 
-                if not success:
-                    await progress_message.edit_text(
-                        f"❌ **Session registration failed**\n\n"
-                        f"Could not register session '{session_name}'.\n"
-                        f"Please try again or contact support if the issue persists."
-                    )
-                    return
-                
-                # Update progress
-                await progress_message.edit_text(
-                    f"✅ **Session registered successfully**\n\n"
-                    f"📱 Phone: {phone_number}\n"
-                    f"🔄 Sending OTP to your phone...",
-                    parse_mode='Markdown'
-                )
-                
-                # Initiate authentication to send OTP
-                auth_result = await self.advanced_session_manager.authenticate_session(
-                    session_name, phone_number, None
-                )
+                if auth_result.get("success") or auth_result.get("needs_otp"):
+                    self._known_sessions.add(session_name)
+                    self._sessions_changed()
+                untracked_session = bool(auth_result.get("needs_otp"))
                 
                 if auth_result.get("success"):
                     # Session authenticated immediately (rare case)
                     await progress_message.edit_text(
-                        f"🎉 **Session '{session_name}' is ready!**\n\n"
+                        f"🎉 <b>Session '{session_name}' is ready!</b>\n\n"
                         f"✅ Authentication completed automatically\n"
                         f"🚀 You can now use this session for forwarding pairs\n\n"
-                        f"Use `/sessionstatus {session_name}` to check details"
+                        f"Use <code>/sessionstatus {session_name}</code> to check details",
+                        parse_mode='HTML'
                     )
                     return
                 
                 elif auth_result.get("needs_otp"):
                     # Store pending verification with timeout
-                    verification_id = f"{session_name}_{user_id}_{int(datetime.now().timestamp())}"
+                    await self._evict_oldest_verifications()
+                    verification_id = f"{session_name}_{user_id}_{next(_verification_seq)}"
+                    reply_markup = _otp_keyboard(verification_id)
                     self.pending_verifications[verification_id] = {
                         'session_name': session_name,
                         'phone_number': phone_number,
                         'phone_code_hash': auth_result.get("phone_code_hash"),
                         'user_id': user_id,
-                        'created_at': datetime.now(),
+                        'created_at': time.monotonic(),
                         'attempts': 0,
-                        'max_attempts': 3
+                        'max_attempts': 3,
+                        # Keyboard shown on every prompt that offers code entry
+                        'reply_markup': reply_markup
                     }
+                    self._by_user.setdefault(user_id, {})[verification_id] = None
+                    self._schedule_expiry(verification_id)
+                    untracked_session = False
                     
-                    # Debug logging
-                    logger.info(f"Created verification ID: {verification_id}")
-                    logger.info(f"Total pending verifications: {len(self.pending_verifications)}")
-                    
-                    # Create inline keyboard for OTP entry
-                    keyboard = [
-                        [InlineKeyboardButton("🔢 Enter OTP Code", callback_data=f"enter_otp:{verification_id}")],
-                        [InlineKeyboardButton("🔄 Resend OTP", callback_data=f"resend_otp:{verification_id}")],
-                        [InlineKeyboardButton("❌ Cancel", callback_data=f"cancel_otp:{verification_id}")]
-                    ]
-                    reply_markup = InlineKeyboardMarkup(keyboard)
+                    logger.info(f"Created verification {verification_id} ({len(self.pending_verifications)} pending)")
                     
                     await progress_message.edit_text(
-                        f"📱 **OTP sent to {phone_number}**\n\n"
-                        f"✅ Session '{session_name}' registered\n"
-                        f"📨 Verification code sent to your phone\n"
-                        f"⏰ Code expires in 5 minutes\n\n"
-                        f"**Next step:** Click 'Enter OTP Code' below and provide the verification code you received.",
+                        OTP_SENT_TEMPLATE.format(session_name=session_name, phone_number=phone_number),
                         reply_markup=reply_markup,
-                        parse_mode='Markdown'
+                        parse_mode='HTML'
                     )
-                    
-                    # Set up automatic cleanup after 10 minutes
-                    asyncio.create_task(self._cleanup_expired_verification(verification_id, 600))
                 
                 else:
                     # Authentication failed
-                    error_msg = auth_result.get("error", "Unknown authentication error")
+                    error_msg = html.escape(auth_result.get("error", "Unknown authentication error"))
                     await progress_message.edit_text(
-                        f"❌ **Authentication failed**\n\n"
+                        f"❌ <b>Authentication failed</b>\n\n"
                         f"Session: {session_name}\n"
                         f"Phone: {phone_number}\n"
                         f"Error: {error_msg}\n\n"
-                        f"Please check your phone number and try again."
+                        f"Please check your phone number and try again.",
+                        parse_mode='HTML'
                     )
-                    
-                    # Clean up failed session
-                    try:
-                        await self.advanced_session_manager.delete_session(session_name, force=True)
-                    except:
-                        pass
                 
             except Exception as e:
                 logger.error(f"Error during session setup: {e}")
                 await progress_message.edit_text(
-                    f"❌ **Setup error**\n\n"
+                    f"❌ <b>Setup error</b>\n\n"
                     f"An error occurred while setting up session '{session_name}'.\n"
-                    f"Please try again in a few moments."
+                    f"Please try again in a few moments.",
+                    parse_mode='HTML'
                 )
-                
-                # Clean up failed session
-                try:
+            
+            finally:
+                if untracked_session:
                     await self.advanced_session_manager.delete_session(session_name, force=True)
-                except:
-                    pass
+                    self._sessions_changed()
                 
         except Exception as e:
             logger.error(f"Error in addsession_command: {e}")
-            await update.message.reply_text(
-                "❌ **System error**\n\n"
-                "An unexpected error occurred. Please try again."
-            )
+            await update.message.reply_text(SYSTEM_ERROR_TEXT, parse_mode='HTML')
     
     async def handle_otp_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle OTP-related callback queries."""
@@ -250,19 +315,13 @@ class UnifiedSessionCommands:
                 return
                 
             action, verification_id = callback_data.split(':', 1)
-            
-            # Debug logging
-            logger.info(f"OTP callback received: action={action}, verification_id={verification_id}")
-            logger.info(f"Pending verifications: {list(self.pending_verifications.keys())}")
+            message = query.message
+            logger.debug("OTP callback received: action={}, verification_id={}", action, verification_id)
             
             if verification_id not in self.pending_verifications:
                 logger.warning(f"Verification ID {verification_id} not found in pending verifications")
-                if query.message:
-                    await query.edit_message_text(
-                        "❌ **Verification expired**\n\n"
-                        "This verification session has expired or been completed.\n"
-                        "Please use `/addsession` to start over."
-                    )
+                if message:
+                    await query.edit_message_text(VERIFICATION_EXPIRED_TEXT, parse_mode='HTML')
                 return
             
             verification_info = self.pending_verifications[verification_id]
@@ -271,84 +330,85 @@ class UnifiedSessionCommands:
             user_id = verification_info['user_id']
             
             # Check if user is authorized
-            if query.from_user and query.from_user.id != user_id:
+            from_user = query.from_user
+            if from_user and from_user.id != user_id:
                 await query.answer("❌ This verification is not for you", show_alert=True)
                 return
             
             if action == "enter_otp":
                 # Prompt user to send the OTP code
-                keyboard = [
-                    [InlineKeyboardButton("🔄 Resend OTP", callback_data=f"resend_otp:{verification_id}")],
-                    [InlineKeyboardButton("❌ Cancel", callback_data=f"cancel_otp:{verification_id}")]
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
+                reply_markup = _otp_keyboard(verification_id, with_enter=False)
                 
-                if query.message:
+                if message:
                     await query.edit_message_text(
-                        f"🔢 **Enter your verification code**\n\n"
+                        f"🔢 <b>Enter your verification code</b>\n\n"
                         f"Session: {session_name}\n"
                         f"Phone: {phone_number}\n\n"
-                        f"**Send your OTP code as a reply to this message**\n"
-                        f"Example: Just type `12345` and send\n\n"
+                        f"<b>Send your OTP code as a reply to this message</b>\n"
+                        f"Example: Just type <code>12345</code> and send\n\n"
                         f"⏰ Waiting for your code...\n"
                         f"Attempts remaining: {verification_info['max_attempts'] - verification_info['attempts']}",
                         reply_markup=reply_markup,
-                        parse_mode='Markdown'
+                        parse_mode='HTML'
                     )
                     
                     # Mark this verification as waiting for OTP input
                     verification_info['waiting_for_otp'] = True
-                    verification_info['message_id'] = query.message.message_id
+                    verification_info['message_id'] = message.message_id
+                    self._waiting_by_user[user_id] = verification_id
             
             elif action == "resend_otp":
-                # Resend OTP
-                if query.message:
-                    await query.edit_message_text(
-                        f"🔄 **Resending OTP**\n\n"
+                # Resend OTP; the notice edit and the code request go out together
+                # instead of the request waiting for the edit's round-trip
+                pending = [self.advanced_session_manager.authenticate_session(
+                    session_name, phone_number, None
+                )]
+                if message:
+                    pending.append(query.edit_message_text(
+                        f"🔄 <b>Resending OTP</b>\n\n"
                         f"Session: {session_name}\n"
                         f"Phone: {phone_number}\n\n"
                         f"⏳ Requesting new verification code...",
-                        parse_mode='Markdown'
-                    )
-                
-                # Attempt to resend OTP
-                auth_result = await self.advanced_session_manager.authenticate_session(
-                    session_name, phone_number, None
-                )
+                        parse_mode='HTML'
+                    ))
+                # The notice is cosmetic: its failure must not hide the auth result
+                auth_result, *edits = await asyncio.gather(*pending, return_exceptions=True)
+                if isinstance(auth_result, BaseException):
+                    raise auth_result
+                for edit_error in edits:
+                    if isinstance(edit_error, BaseException):
+                        logger.debug(f"Could not show resend notice for {session_name}: {edit_error}")
                 
                 if auth_result.get("needs_otp"):
-                    keyboard = [
-                        [InlineKeyboardButton("🔢 Enter OTP Code", callback_data=f"enter_otp:{verification_id}")],
-                        [InlineKeyboardButton("🔄 Resend OTP", callback_data=f"resend_otp:{verification_id}")],
-                        [InlineKeyboardButton("❌ Cancel", callback_data=f"cancel_otp:{verification_id}")]
-                    ]
-                    reply_markup = InlineKeyboardMarkup(keyboard)
+                    reply_markup = verification_info['reply_markup']
                     
-                    if query.message:
+                    if message:
                         await query.edit_message_text(
-                            f"📱 **New OTP sent**\n\n"
+                            f"📱 <b>New OTP sent</b>\n\n"
                             f"Session: {session_name}\n"
                             f"Phone: {phone_number}\n"
                             f"📨 Fresh verification code sent\n\n"
                             f"Click 'Enter OTP Code' when ready.",
                             reply_markup=reply_markup,
-                            parse_mode='Markdown'
+                            parse_mode='HTML'
                         )
                 else:
-                    if query.message:
+                    if message:
                         await query.edit_message_text(
-                            f"❌ **Could not resend OTP**\n\n"
+                            f"❌ <b>Could not resend OTP</b>\n\n"
                             f"Failed to send new verification code.\n"
-                            f"Please try `/addsession {session_name} {phone_number}` again."
+                            f"Please try <code>/addsession {session_name} {phone_number}</code> again.",
+                            parse_mode='HTML'
                         )
             
             elif action == "cancel_otp":
                 # Cancel the verification
-                if query.message:
+                if message:
                     await query.edit_message_text(
-                        f"❌ **Verification cancelled**\n\n"
+                        f"❌ <b>Verification cancelled</b>\n\n"
                         f"Session setup for '{session_name}' has been cancelled.\n"
-                        f"Use `/addsession` to try again."
+                        f"Use <code>/addsession</code> to try again.",
+                        parse_mode='HTML'
                     )
                 
                 # Clean up
@@ -359,56 +419,51 @@ class UnifiedSessionCommands:
             if query and query.message:
                 try:
                     await query.edit_message_text(
-                        "❌ **Error processing request**\n\n"
-                        "Please try `/addsession` again."
+                        "❌ <b>Error processing request</b>\n\n"
+                        "Please try <code>/addsession</code> again.",
+                        parse_mode='HTML'
                     )
                 except:
                     pass
     
     async def handle_otp_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
         """Handle OTP code sent as message."""
+        # Resolve the effective_* properties once; each walks the update's optional fields
+        user = update.effective_user
+        user_id = user.id if user else 0
+        
+        # Most text messages come from users with nothing pending; settle
+        # those with one dict lookup before touching the message itself
+        if user_id not in self._by_user:
+            return False
+        
+        msg = update.message
+        chat = update.effective_chat
+        if msg is None or chat is None:
+            return False
+        chat_id = chat.id
+        
         try:
-            user_id = update.effective_user.id if update.effective_user else 0
-            message_text = update.message.text.strip() if update.message and update.message.text else ""
-            
-            # Debug logging
-            logger.info(f"OTP message handler called: user_id={user_id}, text={message_text}")
-            logger.info(f"Pending verifications: {list(self.pending_verifications.keys())}")
             
             # Find pending verification for this user that's waiting for OTP
-            verification_info = None
-            verification_id = None
-            
-            for vid, vinfo in self.pending_verifications.items():
-                logger.info(f"Checking verification {vid}: user={vinfo.get('user_id')}, waiting={vinfo.get('waiting_for_otp')}")
-                if (vinfo.get('user_id') == user_id and 
-                    vinfo.get('waiting_for_otp')):
-                    verification_info = vinfo
-                    verification_id = vid
-                    logger.info(f"Found matching verification: {vid}")
-                    break
-            
-            if not verification_info:
+            verification_id = self._waiting_by_user.get(user_id)
+            
+            if verification_id:
+                logger.debug("Found matching verification: {}", verification_id)
+            else:
                 # Check if there's any verification for this user (fallback)
-                for vid, vinfo in self.pending_verifications.items():
-                    if vinfo.get('user_id') == user_id:
-                        verification_info = vinfo
-                        verification_id = vid
-                        logger.info(f"Found verification for user (not marked as waiting): {vid}")
-                        break
-                
-                if not verification_info:
-                    logger.info(f"No verification found for user {user_id}")
+                verification_id = next(iter(self._by_user.get(user_id, ())), None)
+                if not verification_id:
+                    logger.debug("No verification found for user {}", user_id)
                     return False
+                logger.debug("Found verification for user (not marked as waiting): {}", verification_id)
+            
+            verification_info = self.pending_verifications[verification_id]
+            message_text = msg.text.strip() if msg.text else ""
             
             # Validate OTP format (typically 4-8 digits)
-            if not message_text.isdigit() or len(message_text) < 4 or len(message_text) > 8:
-                if update.message:
-                    await update.message.reply_text(
-                        "❌ **Invalid code format**\n\n"
-                        "Verification codes are usually 4-6 digits.\n"
-                        "Please check and try again."
-                    )
+            if not OTP_CODE_RE.match(message_text):
+                await msg.reply_text(INVALID_CODE_FORMAT_TEXT, parse_mode='HTML')
                 return True
             
             session_name = verification_info['session_name']
@@ -417,165 +472,81 @@ class UnifiedSessionCommands:
             # Update attempts
             verification_info['attempts'] += 1
             
-            # Delete the OTP message for security
-            try:
-                if update.message:
-                    await update.message.delete()
-            except:
-                pass
-            
-            progress_message = None
-            try:
-                # Find and update the original message
-                message_id = verification_info.get('message_id')
-                if message_id and update.effective_chat:
-                    await context.bot.edit_message_text(
-                        chat_id=update.effective_chat.id,
-                        message_id=message_id,
-                        text=f"🔄 **Verifying code**\n\n"
-                             f"Session: {session_name}\n"
-                             f"⏳ Checking verification code...",
-                        parse_mode='Markdown'
-                    )
-                    progress_message = "edited"  # Indicate edit was successful
-            except:
-                if update.message:
-                    progress_message = await update.message.reply_text(
-                        f"🔄 **Verifying code**\n\n"
-                        f"Session: {session_name}\n"
-                        f"⏳ Checking verification code...",
-                        parse_mode='Markdown'
-                    )
-            
-            # Attempt authentication with OTP using stored phone_code_hash
-            phone_code_hash = verification_info.get('phone_code_hash')
-            auth_result = await self.advanced_session_manager.authenticate_session(
-                session_name, phone_number, message_text, phone_code_hash
+            # Delete the OTP message for security, without holding up verification
+            self._spawn(self._safe_delete(msg))
+            
+            # Show progress in the original prompt (or a new message if it is gone)
+            # while the code is checked; the edit is feedback only, so neither waits
+            # on the other. Authentication uses the stored phone_code_hash.
+            message_id, auth_result = await asyncio.gather(
+                self._emit(
+                    context, chat_id, verification_info.get('message_id'),
+                    f"🔄 <b>Verifying code</b>\n\n"
+                    f"Session: {session_name}\n"
+                    f"⏳ Checking verification code..."
+                ),
+                self.advanced_session_manager.authenticate_session(
+                    session_name, phone_number, message_text, verification_info.get('phone_code_hash')
+                ),
+                return_exceptions=True
             )
+            if isinstance(auth_result, BaseException):
+                raise auth_result
+            if isinstance(message_id, BaseException):
+                # Progress notice failed; the result below goes out as a new message
+                logger.debug(f"Could not show verification progress for {session_name}: {message_id}")
+                message_id = None
             
             if auth_result.get("success"):
                 # Success!
-                try:
-                    if progress_message == "edited" and update.effective_chat:
-                        await context.bot.edit_message_text(
-                            chat_id=update.effective_chat.id,
-                            message_id=verification_info.get('message_id'),
-                            text=f"🎉 **Session '{session_name}' is ready!**\n\n"
-                                 f"✅ Verification successful\n"
-                                 f"📱 Phone: {phone_number}\n"
-                                 f"🚀 Session is active and ready for use\n\n"
-                                 f"**What's next?**\n"
-                                 f"• Use `/sessionstatus` to check details\n"
-                                 f"• Add forwarding pairs with `/addpair`\n"
-                                 f"• View help with `/help`"
-                        )
-                    elif progress_message and hasattr(progress_message, 'edit_text'):
-                        await progress_message.edit_text(
-                            f"🎉 **Session '{session_name}' is ready!**\n\n"
-                            f"✅ Verification successful\n"
-                            f"📱 Phone: {phone_number}\n"
-                            f"🚀 Session is active and ready for use\n\n"
-                            f"**What's next?**\n"
-                            f"• Use `/sessionstatus` to check details\n"
-                            f"• Add forwarding pairs with `/addpair`\n"
-                            f"• View help with `/help`"
-                        )
-                except:
-                    # Fallback - send new message
-                    if update.effective_chat:
-                        await update.effective_chat.send_message(
-                            f"🎉 **Session '{session_name}' is ready!**\n\n"
-                            f"✅ Verification successful\n"
-                            f"📱 Phone: {phone_number}\n"
-                            f"🚀 Session is active and ready for use\n\n"
-                            f"**What's next?**\n"
-                            f"• Use `/sessionstatus` to check details\n"
-                            f"• Add forwarding pairs with `/addpair`\n"
-                            f"• View help with `/help`"
-                        )
+                self._sessions_changed()
+                await self._emit(
+                    context, chat_id, message_id,
+                    f"🎉 <b>Session '{session_name}' is ready!</b>\n\n"
+                    f"✅ Verification successful\n"
+                    f"📱 Phone: {phone_number}\n"
+                    f"🚀 Session is active and ready for use\n\n"
+                    f"<b>What's next?</b>\n"
+                    f"• Use <code>/sessionstatus</code> to check details\n"
+                    f"• Add forwarding pairs with <code>/addpair</code>\n"
+                    f"• View help with <code>/help</code>"
+                )
                 
                 # Clean up verification
                 await self._cleanup_verification(verification_id)
                 
             else:
                 # Failed verification
-                error_msg = auth_result.get("error", "Invalid verification code")
+                error_msg = html.escape(auth_result.get("error", "Invalid verification code"))
                 remaining_attempts = verification_info['max_attempts'] - verification_info['attempts']
                 
                 if remaining_attempts > 0:
                     # Allow retry
-                    keyboard = [
-                        [InlineKeyboardButton("🔢 Enter OTP Code", callback_data=f"enter_otp:{verification_id}")],
-                        [InlineKeyboardButton("🔄 Resend OTP", callback_data=f"resend_otp:{verification_id}")],
-                        [InlineKeyboardButton("❌ Cancel", callback_data=f"cancel_otp:{verification_id}")]
-                    ]
-                    reply_markup = InlineKeyboardMarkup(keyboard)
+                    reply_markup = verification_info['reply_markup']
                     
-                    try:
-                        if progress_message == "edited" and update.effective_chat:
-                            await context.bot.edit_message_text(
-                                chat_id=update.effective_chat.id,
-                                message_id=verification_info.get('message_id'),
-                                text=f"❌ **Verification failed**\n\n"
-                                     f"Session: {session_name}\n"
-                                     f"Error: {error_msg}\n"
-                                     f"Attempts remaining: {remaining_attempts}\n\n"
-                                     f"Try again with a fresh code or resend OTP.",
-                                reply_markup=reply_markup,
-                                parse_mode='Markdown'
-                            )
-                        elif progress_message and hasattr(progress_message, 'edit_text'):
-                            await progress_message.edit_text(
-                                f"❌ **Verification failed**\n\n"
-                                f"Session: {session_name}\n"
-                                f"Error: {error_msg}\n"
-                                f"Attempts remaining: {remaining_attempts}\n\n"
-                                f"Try again with a fresh code or resend OTP.",
-                                reply_markup=reply_markup,
-                                parse_mode='Markdown'
-                            )
-                    except:
-                        if update.effective_chat:
-                            await update.effective_chat.send_message(
-                                f"❌ **Verification failed**\n\n"
-                                f"Session: {session_name}\n"
-                                f"Error: {error_msg}\n"
-                                f"Attempts remaining: {remaining_attempts}\n\n"
-                                f"Try again with a fresh code or resend OTP.",
-                                reply_markup=reply_markup,
-                                parse_mode='Markdown'
-                            )
+                    await self._emit(
+                        context, chat_id, message_id,
+                        f"❌ <b>Verification failed</b>\n\n"
+                        f"Session: {session_name}\n"
+                        f"Error: {error_msg}\n"
+                        f"Attempts remaining: {remaining_attempts}\n\n"
+                        f"Try again with a fresh code or resend OTP.",
+                        reply_markup=reply_markup
+                    )
                     
                     # Reset waiting state
                     verification_info['waiting_for_otp'] = False
+                    self._waiting_by_user.pop(user_id, None)
                     
                 else:
                     # Max attempts reached
-                    try:
-                        if progress_message == "edited" and update.effective_chat:
-                            await context.bot.edit_message_text(
-                                chat_id=update.effective_chat.id,
-                                message_id=verification_info.get('message_id'),
-                                text=f"❌ **Verification failed - Max attempts reached**\n\n"
-                                     f"Session: {session_name}\n"
-                                     f"Too many failed attempts.\n\n"
-                                     f"Please use `/addsession {session_name} {phone_number}` to start over."
-                            )
-                        elif progress_message and hasattr(progress_message, 'edit_text'):
-                            await progress_message.edit_text(
-                                f"❌ **Verification failed - Max attempts reached**\n\n"
-                                f"Session: {session_name}\n"
-                                f"Too many failed attempts.\n\n"
-                                f"Please use `/addsession {session_name} {phone_number}` to start over."
-                            )
-                    except:
-                        if update.effective_chat:
-                            await update.effective_chat.send_message(
-                                f"❌ **Verification failed - Max attempts reached**\n\n"
-                                f"Session: {session_name}\n"
-                                f"Too many failed attempts.\n\n"
-                                f"Please use `/addsession {session_name} {phone_number}` to start over."
-                            )
+                    await self._emit(
+                        context, chat_id, message_id,
+                        f"❌ <b>Verification failed - Max attempts reached</b>\n\n"
+                        f"Session: {session_name}\n"
+                        f"Too many failed attempts.\n\n"
+                        f"Please use <code>/addsession {session_name} {phone_number}</code> to start over."
+                    )
                     
                     # Clean up
                     await self._cleanup_verification(verification_id)
@@ -584,32 +555,79 @@ class UnifiedSessionCommands:
             
         except Exception as e:
             logger.error(f"Error in handle_otp_message: {e}")
-            if update.message:
-                await update.message.reply_text(
-                    "❌ **Verification error**\n\n"
-                    "An error occurred during verification.\n"
-                    "Please try `/addsession` again."
-                )
+            await msg.reply_text(VERIFICATION_ERROR_TEXT, parse_mode='HTML')
             return True
     
+    async def _emit(self, context: ContextTypes.DEFAULT_TYPE, chat_id: int, message_id: Optional[int],
+                    text: str, reply_markup: Optional[InlineKeyboardMarkup] = None,
+                    parse_mode: Optional[str] = 'HTML') -> Optional[int]:
+        """
+        Edit message_id in place, falling back to sending a new message.
+        
+        Returns:
+            ID of the message now showing the text, for follow-up edits
+        """
+        if message_id:
+            try:
+                await context.bot.edit_message_text(
+                    chat_id=chat_id, message_id=message_id, text=text,
+                    reply_markup=reply_markup, parse_mode=parse_mode
+                )
+                return message_id
+            except BadRequest as e:
+                logger.debug(f"Could not edit message {message_id}, sending new one: {e}")
+        
+        try:
+            message = await context.bot.send_message(
+                chat_id=chat_id, text=text, reply_markup=reply_markup, parse_mode=parse_mode
+            )
+            return message.message_id
+        except TelegramError as e:
+            logger.error(f"Failed to send message to {chat_id}: {e}")
+            return None
+    
     async def _cleanup_verification(self, verification_id: str):
         """Clean up a verification session."""
+        await self._cleanup_verifications_batch([verification_id])
+    
+    async def _cleanup_verifications_batch(self, verification_ids: List[str]):
+        """Clean up several verifications, deleting their unverified sessions concurrently."""
+        session_names = []
+        cleaned = []
         try:
-            verification_info = self.pending_verifications.get(verification_id)
-            if verification_info:
+            # Drop in-memory state first so nothing picks these up while we await
+            for verification_id in verification_ids:
+                verification_info = self.pending_verifications.pop(verification_id, None)
+                if not verification_info:
+                    continue
+                self._unindex_verification(verification_id, verification_info.get('user_id'))
+                cleaned.append(verification_id)
+                
                 # If session was created but not verified, clean it up
                 session_name = verification_info.get('session_name')
                 if session_name:
-                    try:
-                        await self.advanced_session_manager.delete_session(session_name, force=True)
-                    except:
-                        pass
-                
-                # Remove from pending
-                del self.pending_verifications[verification_id]
-                logger.info(f"Cleaned up verification {verification_id}")
+                    session_names.append(session_name)
+            
+            if session_names:
+                await asyncio.gather(
+                    *(self.advanced_session_manager.delete_session(name, force=True) for name in session_names),
+                    return_exceptions=True
+                )
+                self._sessions_changed()
+            if cleaned:
+                logger.info(f"Cleaned up {len(cleaned)} verification(s): {', '.join(cleaned)}")
         except Exception as e:
-            logger.error(f"Error cleaning up verification {verification_id}: {e}")
+            logger.error(f"Error cleaning up verifications {verification_ids}: {e}")
+    
+    def _unindex_verification(self, verification_id: str, user_id: int):
+        """Drop a verification from the per-user indexes."""
+        user_vids = self._by_user.get(user_id)
+        if user_vids is not None:
+            user_vids.pop(verification_id, None)
+            if not user_vids:
+                del self._by_user[user_id]
+        if self._waiting_by_user.get(user_id) == verification_id:
+            del self._waiting_by_user[user_id]
     
     async def handle_text_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle text messages for OTP verification."""
@@ -617,21 +635,13 @@ class UnifiedSessionCommands:
             return
         
         try:
-            user_id = update.effective_user.id if update.effective_user else 0
-            message_text = update.message.text.strip()
-            
-            # Check if this is an OTP code (6 digits)
-            if message_text.isdigit() and len(message_text) == 6:
-                # Find pending verification for this user
-                verification_id = None
-                for vid in list(self.pending_verifications.keys()):
-                    if vid.endswith(f"_{user_id}_"):
-                        verification_id = vid
-                        break
-                
-                if verification_id:
-                    # Process OTP
-                    await self._process_otp_verification(update, context, verification_id, message_text)
+            raw_text = update.message.text
+            
+            # Cheapest checks first: only short all-digit texts can be codes
+            if 4 <= len(raw_text) <= 10 and OTP_CODE_RE.match(raw_text.strip()):
+                user_id = update.effective_user.id if update.effective_user else 0
+                if user_id in self._by_user:
+                    await self.handle_otp_message(update, context)
                     return
             
             # Not an OTP or no pending verification
@@ -643,19 +653,60 @@ class UnifiedSessionCommands:
             logger.error(f"Error handling text message: {e}")
             await update.message.reply_text(f"❌ Error: {e}")
     
-    async def _cleanup_expired_verification(self, verification_id: str, delay: int):
-        """Clean up expired verification after delay."""
-        await asyncio.sleep(delay)
-        if verification_id in self.pending_verifications:
-            logger.info(f"Cleaning up expired verification {verification_id}")
-            await self._cleanup_verification(verification_id)
+    async def _evict_oldest_verifications(self):
+        """Make room for one more verification, dropping the oldest ones over the cap."""
+        excess = len(self.pending_verifications) - MAX_PENDING_VERIFICATIONS + 1
+        if excess > 0:
+            evicted = list(itertools.islice(self.pending_verifications, excess))
+            logger.warning(f"Pending verification limit ({MAX_PENDING_VERIFICATIONS}) reached, evicting {len(evicted)}")
+            await self._cleanup_verifications_batch(evicted)
+    
+    def _spawn(self, coro):
+        """Run coro in the background, keeping a reference until it finishes."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    @staticmethod
+    async def _safe_delete(message: Message):
+        """Delete a message, ignoring failures (e.g. already deleted)."""
+        try:
+            await message.delete()
+        except TelegramError as e:
+            logger.debug("Could not delete message {}: {}", message.message_id, e)
+    
+    def _schedule_expiry(self, verification_id: str):
+        """Queue a verification for cleanup after VERIFICATION_TTL, starting the sweeper if idle."""
+        created_at = self.pending_verifications[verification_id]['created_at']
+        heapq.heappush(self._expiry_heap, (created_at + VERIFICATION_TTL, verification_id))
+        
+        # The TTL is fixed, so a new entry never expires before the current head
+        # and a running sweeper needs no wake-up
+        if self._sweeper_task is None or self._sweeper_task.done():
+            self._sweeper_task = asyncio.create_task(self._sweep_expired_verifications())
+    
+    async def _sweep_expired_verifications(self):
+        """Sleep until the next expiry and clean up due verifications; exits when the heap is empty."""
+        heap = self._expiry_heap
+        while heap:
+            delay = heap[0][0] - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            
+            # Everything due is cleaned up together rather than one await per id
+            now = time.monotonic()
+            expired = []
+            while heap and heap[0][0] <= now:
+                _, verification_id = heapq.heappop(heap)
+                if verification_id in self.pending_verifications:
+                    expired.append(verification_id)
+            if expired:
+                await self._cleanup_verifications_batch(expired)
     
     def get_pending_verifications_count(self, user_id: int) -> int:
         """Get count of pending verifications for a user."""
-        return len([v for v in self.pending_verifications.values() 
-                   if v.get('user_id') == user_id])
+        return len(self._by_user.get(user_id, ()))
     
     def is_waiting_for_otp(self, user_id: int) -> bool:
         """Check if user has any verification waiting for OTP input."""
-        return any(v.get('user_id') == user_id and v.get('waiting_for_otp') 
-                  for v in self.pending_verifications.values())
\ No newline at end of file
+        return user_id in self._waiting_by_user
\ No newline at end of file
@@ -2,95 +2,159 @@
 
 import os
 import pathlib
-from typing import Optional
-from loguru import logger
+import re
+from typing import Any, Dict, Optional, Tuple
+
+
+def _log(level: str, message: str):
+    """Log through loguru, importing it only when there is something to say."""
+    from loguru import logger
+    logger.log(level, message)
+
 
 try:
     from dotenv import load_dotenv
     DOTENV_AVAILABLE = True
 except ImportError:
     DOTENV_AVAILABLE = False
-    logger.warning("python-dotenv not installed, .env files won't be loaded")
+    _log("WARNING", "python-dotenv not installed, .env files won't be loaded")
+
+# Accepted spellings for boolean variables (compared lower-cased)
+_TRUE_VALUES = frozenset(('true', '1', 'yes', 'on'))
+_FALSE_VALUES = frozenset(('false', '0', 'no', 'off'))
+
+# Comma-separated integers (empty items allowed) and the integers within them
+_INT_LIST_RE = re.compile(r'[\s,]*(?:-?\d+\s*(?:,[\s,]*|$))*')
+_INT_RE = re.compile(r'-?\d+')
+
+# Marks a cache miss (falsy values are valid cached results)
+_MISSING = object()
+
+
+def _load_dotenv_once():
+    """Load the .env file into os.environ; runs once, when this module is imported."""
+    if DOTENV_AVAILABLE and pathlib.Path('.env').exists():
+        load_dotenv()
+        _log("INFO", "Loaded environment variables from .env file")
+
+
+_load_dotenv_once()
 
 
 class EnvLoader:
     """Unified environment variable loader."""
     
-    _loaded = False
+    # Parsed values keyed by (key, type, default); the environment is treated
+    # as fixed once loaded, so call invalidate() after changing it
+    _cache: Dict[Tuple, Any] = {}
     
     @classmethod
     def load(cls):
-        """Load environment variables from .env file if available."""
-        if cls._loaded:
-            return
-            
-        if DOTENV_AVAILABLE:
-            env_file = pathlib.Path('.env')
-            if env_file.exists():
-                load_dotenv()
-                logger.info("Loaded environment variables from .env file")
-                cls._loaded = True
-                return
-        
-        logger.info("Using system environment variables")
-        cls._loaded = True
+        """Kept for backward compatibility; .env is loaded when this module is imported."""
+    
+    @classmethod
+    def invalidate(cls):
+        """Forget cached values, e.g. after tests modify os.environ."""
+        cls._cache.clear()
     
     @staticmethod
     def get_str(key: str, default: str = "") -> str:
         """Get string environment variable."""
-        EnvLoader.load()
-        return os.getenv(key, default)
+        cache_key = (key, 'str', default)
+        value = EnvLoader._cache.get(cache_key, _MISSING)
+        if value is _MISSING:
+            value = EnvLoader._cache[cache_key] = os.getenv(key, default)
+        return value
     
     @staticmethod
     def get_int(key: str, default: int = 0) -> int:
         """Get integer environment variable."""
-        EnvLoader.load()
+        cache_key = (key, 'int', default)
+        value = EnvLoader._cache.get(cache_key, _MISSING)
+        if value is not _MISSING:
+            return value
+        
         try:
             value = os.getenv(key)
-            return int(value) if value else default
+            value = int(value) if value else default
         except (ValueError, TypeError):
-            logger.warning(f"Invalid integer value for {key}, using default: {default}")
-            return default
+            _log("WARNING", f"Invalid integer value for {key}, using default: {default}")
+            value = default
+        EnvLoader._cache[cache_key] = value
+        return value
     
     @staticmethod
     def get_bool(key: str, default: bool = False) -> bool:
-        """Get boolean environment variable."""
-        EnvLoader.load()
-        value = os.getenv(key, "").lower()
-        if value in ('true', '1', 'yes', 'on'):
-            return True
-        elif value in ('false', '0', 'no', 'off'):
-            return False
+        """
+        Get boolean environment variable.
+        
+        The value is normalized once; later calls return the cached bool
+        without touching the string again.
+        """
+        cache_key = (key, 'bool', default)
+        result = EnvLoader._cache.get(cache_key, _MISSING)
+        if result is not _MISSING:
+            return result
+        
+        value = os.getenv(key, "").casefold()
+        if value in _TRUE_VALUES:
+            result = True
+        elif value in _FALSE_VALUES:
+            result = False
         else:
-            return default
+            result = default
+        EnvLoader._cache[cache_key] = result
+        return result
     
     @staticmethod
     def get_list(key: str, default: Optional[list] = None, separator: str = ",") -> list:
         """Get list environment variable (comma-separated by default)."""
-        EnvLoader.load()
         if default is None:
             default = []
-            
+        
+        # Lists are cached as tuples and copied out, since callers may mutate them
+        cache_key = (key, 'list', tuple(default), separator)
+        cached = EnvLoader._cache.get(cache_key, _MISSING)
+        if cached is not _MISSING:
+            return list(cached)
+        
         value = os.getenv(key, "")
-        if not value:
-            return default
-            
-        try:
-            return [item.strip() for item in value.split(separator) if item.strip()]
-        except Exception as e:
-            logger.warning(f"Failed to parse list for {key}: {e}")
-            return default
+        result = default
+        if value:
+            try:
+                result = [item.strip() for item in value.split(separator) if item.strip()]
+            except Exception as e:
+                _log("WARNING", f"Failed to parse list for {key}: {e}")
+        
+        EnvLoader._cache[cache_key] = tuple(result)
+        return list(result)
     
     @staticmethod
     def get_int_list(key: str, default: Optional[list] = None, separator: str = ",") -> list:
         """Get list of integers from environment variable."""
-        EnvLoader.load()
         if default is None:
             default = []
-            
-        str_list = EnvLoader.get_list(key, [], separator)
-        try:
-            return [int(item) for item in str_list if item]
-        except ValueError as e:
-            logger.warning(f"Failed to parse integer list for {key}: {e}")
-            return default
\ No newline at end of file
+        
+        cache_key = (key, 'int_list', tuple(default), separator)
+        cached = EnvLoader._cache.get(cache_key, _MISSING)
+        if cached is not _MISSING:
+            return list(cached)
+        
+        if separator == ",":
+            # Validate and extract in one scan each instead of split + strip + int per item
+            value = os.getenv(key, "")
+            if _INT_LIST_RE.fullmatch(value):
+                result = list(map(int, _INT_RE.findall(value)))
+            else:
+                _log("WARNING", f"Failed to parse integer list for {key}: {value!r}")
+                result = default
+        else:
+            str_list = EnvLoader.get_list(key, [], separator)
+            try:
+                result = [int(item) for item in str_list if item]
+            except ValueError as e:
+                _log("WARNING", f"Failed to parse integer list for {key}: {e}")
+                result = default
+        
+        EnvLoader._cache[cache_key] = tuple(result)
+        return list(result)
\ No newline at end of file
@@ -1,13 +1,79 @@
 """Configuration settings for the forwarding bot."""
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass, field
+import copy
+import json
+import os
+import sys
 import yaml
 from loguru import logger
 from .env_loader import EnvLoader
 
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
 
-@dataclass
+# Parsed config files keyed by path, with the (mtime, size) they were read at
+_config_file_cache: Dict[str, Tuple[Tuple[float, int], Dict[str, Any]]] = {}
+
+
+# (attribute, variable, getter, default) for fields read from the environment
+# only when neither the constructor nor the config file set them
+_ENV_FALLBACKS = (
+    ('database_url', 'DATABASE_URL', EnvLoader.get_str, 'sqlite:///forwarding_bot.db'),
+    ('telegram_bot_token', 'TELEGRAM_BOT_TOKEN', EnvLoader.get_str, ''),
+    ('discord_bot_token', 'DISCORD_BOT_TOKEN', EnvLoader.get_str, ''),
+    ('telegram_api_id', 'TELEGRAM_API_ID', EnvLoader.get_str, ''),
+    ('telegram_api_hash', 'TELEGRAM_API_HASH', EnvLoader.get_str, ''),
+    ('encryption_key', 'ENCRYPTION_KEY', EnvLoader.get_str, ''),
+    ('admin_user_ids', 'ADMIN_USER_IDS', EnvLoader.get_int_list, None),
+)
+
+# (attribute, variable, getter) for fields the environment always overrides;
+# the current value is the default when the variable is unset
+_ENV_OVERRIDES = (
+    ('log_level', 'LOG_LEVEL', EnvLoader.get_str),
+    ('log_file', 'LOG_FILE', EnvLoader.get_str),
+    ('max_pairs_per_worker', 'MAX_PAIRS_PER_WORKER', EnvLoader.get_int),
+    ('worker_timeout', 'WORKER_TIMEOUT', EnvLoader.get_int),
+    ('message_rate_limit', 'MESSAGE_RATE_LIMIT', EnvLoader.get_int),
+    ('max_file_size_mb', 'MAX_FILE_SIZE_MB', EnvLoader.get_int),
+    ('enable_media_forwarding', 'ENABLE_MEDIA_FORWARDING', EnvLoader.get_bool),
+    ('enable_sticker_forwarding', 'ENABLE_STICKER_FORWARDING', EnvLoader.get_bool),
+    ('enable_poll_forwarding', 'ENABLE_POLL_FORWARDING', EnvLoader.get_bool),
+    ('batch_admin_replies', 'BATCH_ADMIN_REPLIES', EnvLoader.get_bool),
+)
+
+
+def _yaml_value(value: Any) -> str:
+    """
+    Render one to_dict() value as YAML.
+    
+    Settings are flat (scalars and lists of IDs), so yaml.dump's general
+    emitter isn't needed. Strings are written as JSON, which is valid
+    double-quoted YAML.
+    """
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return '[' + ', '.join(_yaml_value(item) for item in value) + ']'
+    return json.dumps(str(value))
+
+
+# Low-cardinality string fields shared across instances; never list secrets here
+_INTERNED_FIELDS = ('log_level', 'log_file')
+
+# Internal attributes whose assignment must not invalidate the caches
+_CACHE_FIELDS = frozenset(('_dict_cache', '_yaml_cache'))
+
+
+@dataclass(slots=True)
 class Settings:
     """Bot configuration settings."""
     
@@ -45,65 +111,46 @@ class Settings:
     enable_media_forwarding: bool = True
     enable_sticker_forwarding: bool = True
     enable_poll_forwarding: bool = True
+    # Coalesce admin bot replies sent to one chat in quick succession
+    batch_admin_replies: bool = False
     
     # File size limits (MB)
     max_file_size_mb: int = 50
     
+    # Memoized _settings_dict() result and its YAML rendering, reset on any attribute
+    # assignment (in-place edits such as admin_user_ids.append() are not seen)
+    _dict_cache: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    _yaml_cache: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __setattr__(self, name: str, value: Any):
+        object.__setattr__(self, name, value)
+        if name not in _CACHE_FIELDS:
+            object.__setattr__(self, '_dict_cache', None)
+            object.__setattr__(self, '_yaml_cache', None)
+    
     def __post_init__(self):
         """Post-initialization validation and environment variable loading."""
-        # Initialize environment loader
-        EnvLoader.load()
-        
-        # Core API credentials - load from environment if not set
-        if not self.database_url:
-            self.database_url = EnvLoader.get_str('DATABASE_URL', 'sqlite:///forwarding_bot.db')
-        
-        if not self.telegram_bot_token:
-            self.telegram_bot_token = EnvLoader.get_str('TELEGRAM_BOT_TOKEN')
-            
-        if not self.discord_bot_token:
-            self.discord_bot_token = EnvLoader.get_str('DISCORD_BOT_TOKEN')
-            
-        if not self.telegram_api_id:
-            self.telegram_api_id = EnvLoader.get_str('TELEGRAM_API_ID')
-            
-        if not self.telegram_api_hash:
-            self.telegram_api_hash = EnvLoader.get_str('TELEGRAM_API_HASH')
-            
-        if not self.encryption_key:
-            self.encryption_key = EnvLoader.get_str('ENCRYPTION_KEY')
-            
-        # Load admin user IDs from environment
-        if not self.admin_user_ids:
-            self.admin_user_ids = EnvLoader.get_int_list('ADMIN_USER_IDS')
+        # Core API credentials and admin IDs - load from environment if not set
+        for attr, key, getter, default in _ENV_FALLBACKS:
+            if not getattr(self, attr):
+                setattr(self, attr, getter(key, default))
         
-        # Load configuration settings from environment
-        self.log_level = EnvLoader.get_str('LOG_LEVEL', self.log_level)
-        self.log_file = EnvLoader.get_str('LOG_FILE', self.log_file)
+        # Configuration settings, numeric limits and feature toggles - the
+        # environment overrides values from the config file
+        for attr, key, getter in _ENV_OVERRIDES:
+            setattr(self, attr, getter(key, getattr(self, attr)))
         
-        # Load numeric settings
-        self.max_pairs_per_worker = EnvLoader.get_int('MAX_PAIRS_PER_WORKER', self.max_pairs_per_worker)
-        self.worker_timeout = EnvLoader.get_int('WORKER_TIMEOUT', self.worker_timeout)
-        self.message_rate_limit = EnvLoader.get_int('MESSAGE_RATE_LIMIT', self.message_rate_limit)
-        self.max_file_size_mb = EnvLoader.get_int('MAX_FILE_SIZE_MB', self.max_file_size_mb)
-        
-        # Load feature toggles
-        self.enable_media_forwarding = EnvLoader.get_bool('ENABLE_MEDIA_FORWARDING', self.enable_media_forwarding)
-        self.enable_sticker_forwarding = EnvLoader.get_bool('ENABLE_STICKER_FORWARDING', self.enable_sticker_forwarding)
-        self.enable_poll_forwarding = EnvLoader.get_bool('ENABLE_POLL_FORWARDING', self.enable_poll_forwarding)
+        for attr in _INTERNED_FIELDS:
+            value = getattr(self, attr)
+            if isinstance(value, str):
+                setattr(self, attr, sys.intern(value))
     
     @classmethod
     def load_from_file(cls, config_path: str) -> 'Settings':
         """Load settings from YAML configuration file and environment variables."""
         try:
             # First load YAML config as base
-            config_data = {}
-            try:
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    config_data = yaml.safe_load(f) or {}
-                logger.info(f"Loaded YAML config from {config_path}")
-            except FileNotFoundError:
-                logger.info(f"Config file {config_path} not found, using environment variables and defaults")
+            config_data = cls._read_config_file(config_path)
             
             # Create settings instance with config data - post_init will load env vars
             settings = cls(**config_data)
@@ -115,6 +162,28 @@ class Settings:
             # Fallback to environment only
             return cls()
     
+    @staticmethod
+    def _read_config_file(config_path: str) -> Dict[str, Any]:
+        """Parse a YAML config file, reusing the last parse while the file is unchanged."""
+        try:
+            stat = os.stat(config_path)
+        except FileNotFoundError:
+            logger.info(f"Config file {config_path} not found, using environment variables and defaults")
+            return {}
+        
+        signature = (stat.st_mtime, stat.st_size)
+        cached = _config_file_cache.get(config_path)
+        if cached and cached[0] == signature:
+            return copy.deepcopy(cached[1])
+        
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config_data = yaml.load(f, Loader=YamlLoader) or {}
+        logger.info(f"Loaded YAML config from {config_path}")
+        
+        # Hand out copies so settings never share lists (e.g. admin_user_ids) with the cache
+        _config_file_cache[config_path] = (signature, config_data)
+        return copy.deepcopy(config_data)
+    
     def validate(self) -> List[str]:
         """Validate settings and return list of errors."""
         errors = []
@@ -146,14 +215,21 @@ class Settings:
         return errors
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert settings to dictionary."""
-        return {
+        """Convert settings to dictionary (a copy, so callers can't edit the cache)."""
+        return copy.deepcopy(self._settings_dict())
+    
+    def _settings_dict(self) -> Dict[str, Any]:
+        """Shared to_dict() result, cached until a setting changes; must not be mutated."""
+        if self._dict_cache is not None:
+            return self._dict_cache
+        
+        self._dict_cache = {
             'database_url': self.database_url,
             'telegram_bot_token': '***' if self.telegram_bot_token else '',
             'discord_bot_token': '***' if self.discord_bot_token else '',
             'telegram_api_id': '***' if self.telegram_api_id else '',
             'telegram_api_hash': '***' if self.telegram_api_hash else '',
-            'admin_user_ids': self.admin_user_ids,
+            'admin_user_ids': list(self.admin_user_ids),
             'max_pairs_per_worker': self.max_pairs_per_worker,
             'worker_timeout': self.worker_timeout,
             'log_level': self.log_level,
@@ -162,15 +238,20 @@ class Settings:
             'enable_media_forwarding': self.enable_media_forwarding,
             'enable_sticker_forwarding': self.enable_sticker_forwarding,
             'enable_poll_forwarding': self.enable_poll_forwarding,
+            'batch_admin_replies': self.batch_admin_replies,
             'max_file_size_mb': self.max_file_size_mb
         }
+        return self._dict_cache
     
     def save_to_file(self, config_path: str) -> bool:
         """Save current settings to YAML file."""
         try:
-            config_data = self.to_dict()
+            if self._yaml_cache is None:
+                self._yaml_cache = "".join(
+                    f"{key}: {_yaml_value(value)}\n" for key, value in self._settings_dict().items()
+                )
             with open(config_path, 'w', encoding='utf-8') as f:
-                yaml.dump(config_data, f, default_flow_style=False, indent=2)
+                f.write(self._yaml_cache)
             logger.info(f"Settings saved to {config_path}")
             return True
         except Exception as e:
@@ -1,11 +1,15 @@
 """Advanced session manager with multi-session support and worker segregation."""
 
 import asyncio
+import heapq
+import itertools
 import os
 import json
-import uuid
-from typing import Dict, List, Optional, Any, Set
-from datetime import datetime, timedelta
+import random
+import time
+from array import array
+from typing import Callable, Dict, List, Optional, Any, Set, Tuple
+from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass, asdict
 from loguru import logger
 from cryptography.fernet import Fernet
@@ -14,12 +18,17 @@ from core.database import Database, SessionInfo, ForwardingPair
 from core.session_manager import SessionManager
 
 
-@dataclass
+def _utcnow() -> datetime:
+    """Current UTC time as a naive datetime, matching what the database columns store."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@dataclass(slots=True)
 class WorkerGroup:
     """Worker group for session segregation."""
     worker_id: str
     session_name: str
-    pair_ids: List[int]
+    pair_ids: array  # array('q') of pair IDs, packed instead of a list of int objects
     max_pairs: int = 30
     is_active: bool = True
     created_at: Optional[datetime] = None
@@ -27,10 +36,10 @@ class WorkerGroup:
     
     def __post_init__(self):
         if self.created_at is None:
-            self.created_at = datetime.utcnow()
+            self.created_at = _utcnow()
 
 
-@dataclass
+@dataclass(slots=True)
 class SessionHealthCheck:
     """Session health check result."""
     session_name: str
@@ -39,6 +48,7 @@ class SessionHealthCheck:
     last_verified: datetime
     error_message: Optional[str] = None
     pair_access_status: Optional[Dict[int, bool]] = None
+    next_check_at: Optional[float] = None  # time.monotonic() deadline for the next check
     
     def __post_init__(self):
         if self.pair_access_status is None:
@@ -52,19 +62,39 @@ class AdvancedSessionManager:
         self.database = database
         self.base_session_manager = base_session_manager
         self.worker_groups: Dict[str, WorkerGroup] = {}
+        # Worker ids per session, insertion-ordered; maintained by _add_worker_group/_drop_worker_group
+        self._workers_by_session: Dict[str, Dict[str, None]] = {}
+        # Owning worker id per pair; a pair moved to a newer group is owned by that group
+        self._pair_to_worker: Dict[int, str] = {}
+        # Worker ids only need to be unique within this process
+        self._worker_seq = itertools.count(1)
         self.session_health_cache: Dict[str, SessionHealthCheck] = {}
         self.running = False
+        # Called with the session name when a session is found unhealthy (e.g. AlertSystem.notify_session_down)
+        self.on_session_down: Optional[Callable[[str], None]] = None
         
-        # Background tasks
-        self._health_task: Optional[asyncio.Task] = None
-        self._cleanup_task: Optional[asyncio.Task] = None
-        self._worker_task: Optional[asyncio.Task] = None
+        # Background task running the periodic jobs
+        self._scheduler_task: Optional[asyncio.Task] = None
         
         # Configuration
         self.max_pairs_per_session = 30
         self.health_check_interval = 300  # 5 minutes
+        self.health_check_jitter = 0.2  # spread each session's next check over interval +/- 20%
+        self.health_check_tick = 60  # how often the monitor looks for due sessions
+        self.health_check_concurrency = 16  # health checks allowed in flight at once
         self.session_timeout = 3600  # 1 hour for expired sessions
         
+        # get_session_status results keyed by session name, as (expires_at, status);
+        # the expiry is set on insert only and entries are dropped when the session changes
+        self._status_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self.status_cache_ttl = self.health_check_interval / 2
+        # Short-lived get_all_sessions() result as (fetched_at, sessions), shared by
+        # jobs and calls landing within sessions_snapshot_ttl seconds of each other
+        self._sessions_cache: Optional[Tuple[float, List[SessionInfo]]] = None
+        self.sessions_snapshot_ttl = 1.0
+        # asdict() of each cached health check, reused while the same object is cached
+        self._health_dicts: Dict[str, Tuple[SessionHealthCheck, Dict[str, Any]]] = {}
+        
     async def start(self):
         """Start the advanced session manager."""
         if self.running:
@@ -78,10 +108,8 @@ class AdvancedSessionManager:
             # Initialize session data from database
             await self._initialize_sessions()
             
-            # Start background tasks without awaiting them
-            self._health_task = asyncio.create_task(self._health_monitor_loop())
-            self._cleanup_task = asyncio.create_task(self._cleanup_loop())
-            self._worker_task = asyncio.create_task(self._worker_manager_loop())
+            # Start background jobs without awaiting them
+            self._scheduler_task = asyncio.create_task(self._scheduler_loop())
             
             logger.info("Advanced session manager started successfully")
             
@@ -93,7 +121,7 @@ class AdvancedSessionManager:
     async def get_session_statistics(self) -> Dict[str, Any]:
         """Get comprehensive session statistics."""
         try:
-            sessions = await self.database.get_all_sessions()
+            sessions = await self._sessions_snapshot()
             
             stats = {
                 'total_sessions': len(sessions),
@@ -144,7 +172,7 @@ class AdvancedSessionManager:
         self.running = False
         
         # Cancel background tasks
-        tasks_to_cancel = [self._health_task, self._cleanup_task, self._worker_task]
+        tasks_to_cancel = [self._scheduler_task]
         for task in tasks_to_cancel:
             if task and not task.done():
                 task.cancel()
@@ -172,25 +200,12 @@ class AdvancedSessionManager:
                 return False
             
             # Create session info
-            session_info = SessionInfo(
-                name=session_name,
-                phone_number=phone_number,
-                is_active=False,
-                health_status="registered",
-                pair_count=0,
-                max_pairs=max_pairs,
-                priority=priority,
-                metadata_info={
-                    "registration_time": datetime.utcnow().isoformat(),
-                    "auto_created": False,
-                    "registration_source": "manual",
-                    "authentication_pending": True
-                }
-            )
+            session_info = self._new_session_info(session_name, phone_number, priority, max_pairs)
             
             # Add to database
             session_id = await self.database.add_session_info(session_info)
             session_info.id = session_id
+            self._invalidate_sessions_snapshot()
             
             # Note: Session structure will be created during authentication
             
@@ -210,56 +225,134 @@ class AdvancedSessionManager:
                 logger.error(f"Session {session_name} not found in database")
                 return {"success": False, "error": "Session not found", "needs_otp": False}
             
-            # Use base session manager for authentication
-            auth_result = await self.base_session_manager.authenticate_session(
-                session_name, phone_number, verification_code, phone_code_hash
-            )
-            
-            if auth_result.get("success"):
-                # Update session health after successful authentication
-                await self.database.update_session_health(
-                    session_name, 
-                    "healthy", 
-                    datetime.utcnow()
-                )
-                
-                # Update metadata
-                session_info.metadata_info = session_info.metadata_info or {}
-                session_info.metadata_info["last_auth_time"] = datetime.utcnow().isoformat()
-                session_info.metadata_info["auth_success"] = True
-                session_info.metadata_info["authentication_pending"] = False
-                
-                # Mark session as active
-                session_info.is_active = True
-                
-                logger.info(f"Successfully authenticated session: {session_name}")
-                return {"success": True, "needs_otp": False}
-            
-            elif auth_result.get("needs_code"):
-                # OTP verification needed
-                logger.info(f"OTP verification required for session: {session_name}")
-                return {
-                    "success": False, 
-                    "needs_otp": True, 
-                    "phone_code_hash": auth_result.get("phone_code_hash"),
-                    "message": "Please check your phone for verification code"
-                }
-            
-            else:
-                # Authentication failed
-                await self.database.update_session_health(
-                    session_name, 
-                    "auth_failed", 
-                    datetime.utcnow()
-                )
-                
-                logger.error(f"Authentication failed for session: {session_name}")
-                return {"success": False, "needs_otp": False, "error": auth_result.get("error", "Authentication failed")}
+            return await self._authenticate_registered(session_info, phone_number, verification_code, phone_code_hash)
             
         except Exception as e:
             logger.error(f"Failed to authenticate session {session_name}: {e}")
             return {"success": False, "error": str(e), "needs_otp": False}
     
+    async def register_and_start_auth(self, session_name: str, phone_number: str, priority: int = 1, max_pairs: int = 30) -> Dict[str, Any]:
+        """
+        Register a session and request its login code in one call.
+        
+        The registration is rolled back if authentication cannot be started,
+        so callers never see a half-created session.
+        
+        Returns:
+            Dict with success, needs_otp, phone_code_hash and error keys
+        """
+        session_info = None
+        try:
+            existing_session = await self.database.get_session_info(session_name)
+            if existing_session:
+                logger.warning(f"Session {session_name} already exists")
+                return {"success": False, "needs_otp": False, "error": f"Session '{session_name}' already exists"}
+            
+            session_info = self._new_session_info(session_name, phone_number, priority, max_pairs)
+            session_info.id = await self.database.add_session_info(session_info)
+            self._invalidate_sessions_snapshot()
+            logger.info(f"Successfully registered session: {session_name} (ID: {session_info.id})")
+            
+            auth_result = await self._authenticate_registered(session_info, phone_number)
+            
+        except Exception as e:
+            logger.error(f"Failed to register and authenticate session {session_name}: {e}")
+            auth_result = {"success": False, "error": str(e), "needs_otp": False}
+        
+        if session_info is not None and not auth_result.get("success") and not auth_result.get("needs_otp"):
+            await self.delete_session(session_name, force=True)
+        
+        return auth_result
+    
+    def _new_session_info(self, session_name: str, phone_number: str, priority: int, max_pairs: int) -> SessionInfo:
+        """Build the SessionInfo row for a newly registered session."""
+        return SessionInfo(
+            name=session_name,
+            phone_number=phone_number,
+            is_active=False,
+            health_status="registered",
+            pair_count=0,
+            max_pairs=max_pairs,
+            priority=priority,
+            metadata_info={
+                "registration_time": _utcnow().isoformat(),
+                "auto_created": False,
+                "registration_source": "manual",
+                "authentication_pending": True
+            }
+        )
+    
+    async def _authenticate_registered(self, session_info: SessionInfo, phone_number: str, verification_code: Optional[str] = None, phone_code_hash: Optional[str] = None) -> Dict[str, Any]:
+        """Run Telegram authentication for a session already present in the database."""
+        session_name = session_info.name
+        
+        # Use base session manager for authentication
+        auth_result = await self.base_session_manager.authenticate_session(
+            session_name, phone_number, verification_code, phone_code_hash
+        )
+        now = _utcnow()
+        if not auth_result.get("needs_code"):
+            # Both outcomes below rewrite the session's health
+            self._invalidate_sessions_snapshot()
+        
+        if auth_result.get("success"):
+            # Update session health after successful authentication
+            await self.database.update_session_health(
+                session_name, 
+                "healthy", 
+                now
+            )
+            
+            # Freshly verified; the monitor can skip it until its next scheduled check
+            self._record_health_check(SessionHealthCheck(
+                session_name=session_name,
+                is_healthy=True,
+                status="healthy",
+                last_verified=now
+            ))
+            self._invalidate_session_status(session_name)
+            
+            # Update metadata
+            session_info.metadata_info = session_info.metadata_info or {}
+            session_info.metadata_info["last_auth_time"] = now.isoformat()
+            session_info.metadata_info["auth_success"] = True
+            session_info.metadata_info["authentication_pending"] = False
+            
+            # Mark session as active
+            session_info.is_active = True
+            
+            logger.info(f"Successfully authenticated session: {session_name}")
+            return {"success": True, "needs_otp": False}
+        
+        elif auth_result.get("needs_code"):
+            # OTP verification needed
+            logger.info(f"OTP verification required for session: {session_name}")
+            return {
+                "success": False, 
+                "needs_otp": True, 
+                "phone_code_hash": auth_result.get("phone_code_hash"),
+                "message": "Please check your phone for verification code"
+            }
+        
+        else:
+            # Authentication failed
+            await self.database.update_session_health(
+                session_name, 
+                "auth_failed", 
+                now
+            )
+            self._record_health_check(SessionHealthCheck(
+                session_name=session_name,
+                is_healthy=False,
+                status="auth_failed",
+                last_verified=now,
+                error_message=auth_result.get("error", "Authentication failed")
+            ))
+            self._invalidate_session_status(session_name)
+            
+            logger.error(f"Authentication failed for session: {session_name}")
+            return {"success": False, "needs_otp": False, "error": auth_result.get("error", "Authentication failed")}
+    
     async def delete_session(self, session_name: str, force: bool = False) -> bool:
         """Delete a session with safety checks."""
         try:
@@ -279,10 +372,12 @@ class AdvancedSessionManager:
             await self.base_session_manager.delete_session(session_name)
             
             # Update database
-            await self.database.update_session_health(session_name, "deleted", datetime.utcnow())
+            await self.database.update_session_health(session_name, "deleted", _utcnow())
             
             # Remove from worker groups
             await self._remove_session_from_workers(session_name)
+            self.invalidate_session_health(session_name)
+            self._invalidate_sessions_snapshot()
             
             logger.info(f"Successfully deleted session: {session_name}")
             return True
@@ -329,8 +424,10 @@ class AdvancedSessionManager:
             success = await self.database.bulk_reassign_session(pair_ids, new_session_name, new_session.id)
             
             if success:
-                # Update session pair counts
-                await self._update_all_session_counts()
+                # Pairs may have come from any session; their pair counts were
+                # refreshed in the same transaction as the reassignment
+                self._invalidate_session_status()
+                self._invalidate_sessions_snapshot()
                 
                 # Reorganize worker groups
                 await self._reorganize_workers_for_session(new_session_name)
@@ -350,35 +447,55 @@ class AdvancedSessionManager:
             return result
     
     async def get_session_status(self, session_name: str) -> Dict[str, Any]:
-        """Get comprehensive session status."""
+        """
+        Get comprehensive session status.
+        
+        Results are cached for status_cache_ttl seconds. Each call returns a
+        shallow copy, so nested values are shared and must not be mutated.
+        """
+        cached = self._status_cache.get(session_name)
+        if cached and cached[0] > time.monotonic():
+            return dict(cached[1])
+        
         try:
             session_info = await self.database.get_session_info(session_name)
             if not session_info:
                 return {"error": "Session not found"}
             
             pairs = await self.database.get_pairs_by_session(session_name)
-            health_check = self.session_health_cache.get(session_name)
             
             worker_info = None
-            for worker_id, worker_group in self.worker_groups.items():
-                if worker_group.session_name == session_name:
-                    worker_info = {
-                        "worker_id": worker_id,
-                        "is_active": worker_group.is_active,
-                        "pair_count": len(worker_group.pair_ids),
-                        "last_health_check": worker_group.last_health_check.isoformat() if worker_group.last_health_check else None
-                    }
-                    break
+            worker_id = next(iter(self._workers_by_session.get(session_name, ())), None)
+            if worker_id is not None:
+                worker_group = self.worker_groups[worker_id]
+                worker_info = {
+                    "worker_id": worker_id,
+                    "is_active": worker_group.is_active,
+                    "pair_count": len(worker_group.pair_ids),
+                    "last_health_check": worker_group.last_health_check.isoformat() if worker_group.last_health_check else None
+                }
             
-            return {
+            status = {
                 "session_info": asdict(session_info),
                 "pair_count": len(pairs),
-                "pairs": [asdict(pair) for pair in pairs],
-                "health_status": asdict(health_check) if health_check else None,
+                # Summary fields only; asdict() would deep-copy every pair
+                "pairs": [
+                    {
+                        "id": pair.id,
+                        "name": pair.name,
+                        "is_active": pair.is_active,
+                        "health_status": pair.health_status,
+                        "worker_id": pair.worker_id
+                    }
+                    for pair in pairs
+                ],
+                "health_status": self._health_check_dict(session_name),
                 "worker_info": worker_info,
                 "capacity_usage": f"{len(pairs)}/{session_info.max_pairs}",
                 "utilization_percent": round((len(pairs) / session_info.max_pairs) * 100, 2)
             }
+            self._status_cache[session_name] = (time.monotonic() + self.status_cache_ttl, status)
+            return dict(status)
             
         except Exception as e:
             logger.error(f"Failed to get session status for {session_name}: {e}")
@@ -387,46 +504,87 @@ class AdvancedSessionManager:
     async def get_optimal_session_for_assignment(self) -> Optional[str]:
         """Find the best session for assigning new pairs."""
         try:
-            sessions = await self.database.get_all_sessions()
-            
-            # Filter healthy, active sessions with capacity
-            available_sessions = []
-            for session in sessions:
-                if (session.is_active and 
-                    session.health_status == "healthy" and 
-                    session.pair_count < session.max_pairs):
-                    available_sessions.append(session)
-            
-            if not available_sessions:
-                return None
-            
-            # Sort by priority (highest first), then by lowest utilization
-            available_sessions.sort(
-                key=lambda s: (-s.priority, s.pair_count / s.max_pairs)
+            sessions = await self._sessions_snapshot()
+            
+            # Healthy, active sessions with capacity; highest priority first,
+            # then lowest utilization (ties keep the database order)
+            best = min(
+                (
+                    session for session in sessions
+                    if session.is_active
+                    and session.health_status == "healthy"
+                    and session.pair_count < session.max_pairs
+                ),
+                key=lambda s: (-s.priority, s.pair_count / s.max_pairs),
+                default=None
             )
             
-            return available_sessions[0].name
+            return best.name if best else None
             
         except Exception as e:
             logger.error(f"Failed to find optimal session: {e}")
             return None
     
+    def invalidate_session_health(self, session_name: str):
+        """Forget a session's cached health so the monitor re-checks it on its next tick."""
+        self.session_health_cache.pop(session_name, None)
+        self._health_dicts.pop(session_name, None)
+        self._invalidate_session_status(session_name)
+    
+    def _health_check_dict(self, session_name: str) -> Optional[Dict[str, Any]]:
+        """asdict() of the cached health check, converted once per recorded check."""
+        health_check = self.session_health_cache.get(session_name)
+        if health_check is None:
+            return None
+        
+        cached = self._health_dicts.get(session_name)
+        if cached is None or cached[0] is not health_check:
+            # Checks are replaced, not edited, once recorded, so identity marks a new version
+            cached = self._health_dicts[session_name] = (health_check, asdict(health_check))
+        return cached[1]
+    
+    async def _sessions_snapshot(self) -> List[SessionInfo]:
+        """get_all_sessions(), reusing a result fetched within sessions_snapshot_ttl seconds."""
+        cached = self._sessions_cache
+        if cached and time.monotonic() - cached[0] < self.sessions_snapshot_ttl:
+            return list(cached[1])
+        
+        sessions = await self.database.get_all_sessions()
+        self._sessions_cache = (time.monotonic(), sessions)
+        return list(sessions)
+    
+    def _invalidate_sessions_snapshot(self):
+        """Force the next _sessions_snapshot() to read the database."""
+        self._sessions_cache = None
+    
+    def _invalidate_session_status(self, session_name: Optional[str] = None):
+        """Drop the cached status for one session, or for all sessions when no name is given."""
+        if session_name is None:
+            self._status_cache.clear()
+        else:
+            self._status_cache.pop(session_name, None)
+    
     # Private methods for internal operations
     
     async def _initialize_sessions(self):
         """Initialize session data from database."""
         try:
-            sessions = await self.database.get_all_sessions()
+            sessions = await self._sessions_snapshot()
             logger.info(f"Initializing {len(sessions)} sessions")
             
+            # One query for every session's pairs instead of one per session
+            pairs_by_session = await self.database.get_pairs_grouped_by_session()
+            
             for session in sessions:
                 if session.is_active:
+                    pairs = pairs_by_session.get(session.name, [])
+                    
                     # Create worker group if needed
-                    await self._ensure_worker_group_for_session(session.name)
+                    await self._ensure_worker_group_for_session(session.name, pairs)
                     
                     # Schedule initial health check
-                    health_check = await self._perform_health_check(session.name)
-                    self.session_health_cache[session.name] = health_check
+                    health_check = await self._perform_health_check(session.name, pairs)
+                    self._record_health_check(health_check)
             
             logger.info("Session initialization completed")
             
@@ -434,85 +592,134 @@ class AdvancedSessionManager:
             logger.error(f"Failed to initialize sessions: {e}")
             raise
     
-    async def _health_monitor_loop(self):
-        """Background health monitoring loop."""
+    async def _scheduler_loop(self):
+        """
+        Run the periodic jobs (health checks, worker management, cleanup) from one task.
+        
+        Jobs are kept in a heap by next due time. Jobs that come due together
+        share one get_all_sessions() result, and a failed job is retried after
+        its retry delay instead of its interval.
+        """
+        now = time.monotonic()
+        # (next_due, order, interval, retry_delay, job); order breaks ties
+        jobs = [
+            (now + self.health_check_tick, 0, self.health_check_tick, 60, self._health_monitor_tick),
+            (now + 180, 1, 180, 120, self._worker_manager_tick),  # every 3 minutes
+            (now + 3600, 2, 3600, 300, self._cleanup_tick),  # every hour
+        ]
+        heapq.heapify(jobs)
+        
         while self.running:
-            try:
-                await asyncio.sleep(self.health_check_interval)
-                if not self.running:
-                    break
-                
-                sessions = await self.database.get_all_sessions()
-                
-                for session in sessions:
-                    if session.is_active:
-                        health_check = await self._perform_health_check(session.name)
-                        self.session_health_cache[session.name] = health_check
-                        
-                        # Update database
-                        await self.database.update_session_health(
-                            session.name,
-                            health_check.status,
-                            health_check.last_verified
-                        )
-                        
-                        # Handle unhealthy sessions
-                        if not health_check.is_healthy:
-                            await self._handle_unhealthy_session(session.name, health_check)
-                
-                logger.debug("Health monitoring cycle completed")
-                
-            except Exception as e:
-                logger.error(f"Error in health monitor loop: {e}")
-                await asyncio.sleep(60)  # Wait before retrying
+            delay = jobs[0][0] - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if not self.running:
+                break
+            
+            now = time.monotonic()
+            due = []
+            while jobs and jobs[0][0] <= now:
+                due.append(heapq.heappop(jobs))
+            
+            sessions = await self._sessions_snapshot()
+            
+            for _, order, interval, retry_delay, job in due:
+                try:
+                    await job(sessions)
+                    next_due = time.monotonic() + interval
+                except Exception as e:
+                    logger.error(f"Error in {job.__name__}: {e}")
+                    next_due = time.monotonic() + retry_delay
+                heapq.heappush(jobs, (next_due, order, interval, retry_delay, job))
     
-    async def _cleanup_loop(self):
-        """Background cleanup loop."""
-        while self.running:
-            try:
-                await asyncio.sleep(3600)  # Run every hour
-                if not self.running:
-                    break
-                
-                # Clean up expired sessions
-                await self._cleanup_expired_sessions()
-                
-                # Update session pair counts
-                await self._update_all_session_counts()
-                
-                # Clean up inactive worker groups
-                await self._cleanup_inactive_workers()
-                
-                logger.debug("Cleanup cycle completed")
-                
-            except Exception as e:
-                logger.error(f"Error in cleanup loop: {e}")
-                await asyncio.sleep(300)  # Wait before retrying
+    async def _health_monitor_tick(self, sessions: List[SessionInfo]):
+        """Health-check the active sessions that are due."""
+        # Only sessions whose jittered deadline has passed (or that were
+        # never checked) are due, so checks don't all land on one tick
+        now = time.monotonic()
+        sessions = [
+            session for session in sessions
+            if session.is_active and self._health_check_due(session.name, now)
+        ]
+        if not sessions:
+            return
+        
+        pairs_by_session = await self.database.get_pairs_grouped_by_session()
+        
+        # Checks are I/O bound, so run them concurrently up to the limit
+        semaphore = asyncio.Semaphore(self.health_check_concurrency)
+        
+        async def check(session_name: str) -> SessionHealthCheck:
+            async with semaphore:
+                return await self._perform_health_check(session_name, pairs_by_session.get(session_name, []))
+        
+        health_checks = await asyncio.gather(*(check(session.name) for session in sessions))
+        
+        health_updates = []
+        unhealthy = []
+        for session, health_check in zip(sessions, health_checks):
+            self._record_health_check(health_check)
+            health_updates.append((session.name, health_check.status, health_check.last_verified))
+            
+            if not health_check.is_healthy:
+                unhealthy.append(health_check)
+        
+        # Update database once per cycle
+        await self.database.bulk_update_session_health(health_updates)
+        self._invalidate_session_status()
+        self._invalidate_sessions_snapshot()
+        
+        # Handle unhealthy sessions
+        for health_check in unhealthy:
+            await self._handle_unhealthy_session(health_check.session_name, health_check)
+        
+        logger.debug("Health monitoring cycle completed")
     
-    async def _worker_manager_loop(self):
-        """Background worker management loop."""
-        while self.running:
-            try:
-                await asyncio.sleep(180)  # Run every 3 minutes
-                if not self.running:
-                    break
-                
-                # Check worker group health
-                for worker_id, worker_group in list(self.worker_groups.items()):
-                    if worker_group.is_active:
-                        await self._check_worker_group_health(worker_group)
-                
-                # Rebalance workers if needed
-                await self._rebalance_worker_groups()
-                
-                logger.debug("Worker management cycle completed")
-                
-            except Exception as e:
-                logger.error(f"Error in worker manager loop: {e}")
-                await asyncio.sleep(120)  # Wait before retrying
+    def _health_check_due(self, session_name: str, now: float) -> bool:
+        """Whether a session's next scheduled health check has come."""
+        health_check = self.session_health_cache.get(session_name)
+        return health_check is None or health_check.next_check_at is None or health_check.next_check_at <= now
+    
+    def _record_health_check(self, health_check: SessionHealthCheck):
+        """Cache a health check result and schedule the session's next check with jitter."""
+        jitter = random.uniform(1 - self.health_check_jitter, 1 + self.health_check_jitter)
+        health_check.next_check_at = time.monotonic() + self.health_check_interval * jitter
+        self.session_health_cache[health_check.session_name] = health_check
+    
+    async def _cleanup_tick(self, sessions: List[SessionInfo]):
+        """Periodic cleanup of expired sessions, pair counts and inactive workers."""
+        # Clean up expired sessions
+        await self._cleanup_expired_sessions()
+        
+        # Update session pair counts
+        await self._update_all_session_counts(sessions)
+        
+        # Clean up inactive worker groups
+        await self._cleanup_inactive_workers()
+        
+        logger.debug("Cleanup cycle completed")
+    
+    async def _worker_manager_tick(self, sessions: List[SessionInfo]):
+        """Periodic worker group health check and rebalancing."""
+        # Check worker group health, loading every group's pairs in one query
+        active_groups = [wg for wg in self.worker_groups.values() if wg.is_active]
+        pair_ids = [pair_id for wg in active_groups for pair_id in wg.pair_ids if self._pair_to_worker.get(pair_id) == wg.worker_id]
+        pairs_by_id = {pair.id: pair for pair in await self.database.get_pairs_by_ids(pair_ids)}
+        for worker_group in active_groups:
+            await self._check_worker_group_health(worker_group, pairs_by_id)
+        
+        # Rebalance workers if needed
+        await self._rebalance_worker_groups()
+        
+        logger.debug("Worker management cycle completed")
     
-    async def _perform_health_check(self, session_name: str) -> SessionHealthCheck:
-        """Perform comprehensive health check on a session."""
+    async def _perform_health_check(self, session_name: str, pairs: Optional[List[ForwardingPair]] = None) -> SessionHealthCheck:
+        """
+        Perform comprehensive health check on a session.
+        
+        Pass the session's pairs when they were already fetched (e.g. by
+        get_pairs_grouped_by_session) to skip the per-session query.
+        """
         try:
             # Basic session existence check
             session_data = await self.base_session_manager.get_session(session_name)
@@ -521,7 +728,7 @@ class AdvancedSessionManager:
                     session_name=session_name,
                     is_healthy=False,
                     status="not_found",
-                    last_verified=datetime.utcnow(),
+                    last_verified=_utcnow(),
                     error_message="Session data not found"
                 )
             
@@ -534,7 +741,8 @@ class AdvancedSessionManager:
             error_message = None
             
             # Check pair access (simplified)
-            pairs = await self.database.get_pairs_by_session(session_name)
+            if pairs is None:
+                pairs = await self.database.get_pairs_by_session(session_name)
             pair_access_status = {}
             for pair in pairs:
                 # Simulate access check
@@ -544,7 +752,7 @@ class AdvancedSessionManager:
                 session_name=session_name,
                 is_healthy=is_healthy,
                 status=status,
-                last_verified=datetime.utcnow(),
+                last_verified=_utcnow(),
                 error_message=error_message,
                 pair_access_status=pair_access_status
             )
@@ -555,34 +763,36 @@ class AdvancedSessionManager:
                 session_name=session_name,
                 is_healthy=False,
                 status="error",
-                last_verified=datetime.utcnow(),
+                last_verified=_utcnow(),
                 error_message=str(e)
             )
     
-    async def _ensure_worker_group_for_session(self, session_name: str) -> str:
-        """Ensure there's a worker group for the session."""
+    async def _ensure_worker_group_for_session(self, session_name: str, pairs: Optional[List[ForwardingPair]] = None) -> str:
+        """Ensure there's a worker group for the session, using prefetched pairs if given."""
         # Check if session already has a worker group
-        for worker_id, worker_group in self.worker_groups.items():
-            if worker_group.session_name == session_name and worker_group.is_active:
+        for worker_id in self._workers_by_session.get(session_name, ()):
+            if self.worker_groups[worker_id].is_active:
                 return worker_id
         
         # Create new worker group
-        worker_id = f"worker_{session_name}_{uuid.uuid4().hex[:8]}"
-        pairs = await self.database.get_pairs_by_session(session_name)
+        worker_id = f"worker_{session_name}_{next(self._worker_seq)}"
+        if pairs is None:
+            pairs = await self.database.get_pairs_by_session(session_name)
         
         worker_group = WorkerGroup(
             worker_id=worker_id,
             session_name=session_name,
-            pair_ids=[pair.id for pair in pairs],
+            pair_ids=array('q', [pair.id for pair in pairs]),
             max_pairs=min(self.max_pairs_per_session, 30)
         )
         
-        self.worker_groups[worker_id] = worker_group
+        self._add_worker_group(worker_group)
+        self._invalidate_session_status(session_name)
         
         # Update database with worker assignment
         for pair in pairs:
             pair.worker_id = worker_id
-            await self.database.update_pair(pair)
+        await self.database.bulk_update_pair_assignments(pairs)
         
         logger.info(f"Created worker group {worker_id} for session {session_name} with {len(pairs)} pairs")
         return worker_id
@@ -597,9 +807,8 @@ class AdvancedSessionManager:
             worker_groups_needed = (len(pairs) + self.max_pairs_per_session - 1) // self.max_pairs_per_session
             
             # Remove old worker groups for this session
-            old_workers = [wid for wid, wg in self.worker_groups.items() if wg.session_name == session_name]
-            for worker_id in old_workers:
-                del self.worker_groups[worker_id]
+            for worker_id in list(self._workers_by_session.get(session_name, ())):
+                self._drop_worker_group(worker_id)
             
             # Create new worker groups
             for i in range(worker_groups_needed):
@@ -607,32 +816,37 @@ class AdvancedSessionManager:
                 end_idx = min(start_idx + self.max_pairs_per_session, len(pairs))
                 group_pairs = pairs[start_idx:end_idx]
                 
-                worker_id = f"worker_{session_name}_{i}_{uuid.uuid4().hex[:8]}"
+                worker_id = f"worker_{session_name}_{i}_{next(self._worker_seq)}"
                 worker_group = WorkerGroup(
                     worker_id=worker_id,
                     session_name=session_name,
-                    pair_ids=[pair.id for pair in group_pairs],
+                    pair_ids=array('q', [pair.id for pair in group_pairs]),
                     max_pairs=self.max_pairs_per_session
                 )
                 
-                self.worker_groups[worker_id] = worker_group
+                self._add_worker_group(worker_group)
                 
                 # Update pairs with new worker assignment
                 for pair in group_pairs:
                     pair.worker_id = worker_id
-                    await self.database.update_pair(pair)
             
+            # Every group's assignments are written together
+            await self.database.bulk_update_pair_assignments(pairs)
+            
+            self._invalidate_session_status(session_name)
             logger.info(f"Reorganized {worker_groups_needed} worker groups for session {session_name}")
             
         except Exception as e:
             logger.error(f"Failed to reorganize workers for session {session_name}: {e}")
     
-    async def _update_all_session_counts(self):
-        """Update pair counts for all sessions."""
+    async def _update_all_session_counts(self, sessions: Optional[List[SessionInfo]] = None):
+        """Update pair counts for all sessions, using an already fetched session list if given."""
         try:
-            sessions = await self.database.get_all_sessions()
+            if sessions is None:
+                sessions = await self._sessions_snapshot()
             for session in sessions:
                 await self.database.update_session_pair_count(session.name)
+            self._invalidate_sessions_snapshot()
             
         except Exception as e:
             logger.error(f"Failed to update session counts: {e}")
@@ -647,15 +861,15 @@ class AdvancedSessionManager:
                 if optimal_session:
                     pair.session_name = optimal_session
                     pair.health_status = "reassigning"
-                    await self.database.update_pair(pair)
                     logger.info(f"Emergency reassigned pair {pair.id} to session {optimal_session}")
                 else:
                     # Disable pair if no sessions available
                     pair.is_active = False
                     pair.health_status = "orphaned"
-                    await self.database.update_pair(pair)
                     logger.warning(f"Disabled orphaned pair {pair.id} - no sessions available")
             
+            await self.database.bulk_update_pair_assignments(pairs)
+            
         except Exception as e:
             logger.error(f"Failed to emergency reassign pairs: {e}")
     
@@ -663,6 +877,10 @@ class AdvancedSessionManager:
         """Handle an unhealthy session."""
         try:
             logger.warning(f"Handling unhealthy session {session_name}: {health_check.error_message}")
+            # Re-check on the next monitor tick instead of waiting out the full interval
+            self.invalidate_session_health(session_name)
+            if self.on_session_down:
+                self.on_session_down(session_name)
             
             # Get pairs for this session
             pairs = await self.database.get_pairs_by_session(session_name)
@@ -674,7 +892,7 @@ class AdvancedSessionManager:
                 # Disable pairs temporarily
                 for pair in pairs:
                     pair.health_status = f"session_{health_check.status}"
-                    await self.database.update_pair(pair)
+                await self.database.bulk_update_pair_assignments(pairs)
             
             # Additional recovery logic could be implemented here
             
@@ -684,16 +902,13 @@ class AdvancedSessionManager:
     async def _cleanup_expired_sessions(self):
         """Clean up expired and inactive sessions."""
         try:
-            cutoff_time = datetime.utcnow() - timedelta(seconds=self.session_timeout)
-            sessions = await self.database.get_all_sessions()
+            cutoff_time = _utcnow() - timedelta(seconds=self.session_timeout)
             
-            for session in sessions:
-                if (session.last_verified and 
-                    session.last_verified < cutoff_time and 
-                    session.health_status in ["unhealthy", "error"]):
-                    
-                    logger.info(f"Cleaning up expired session: {session.name}")
-                    await self.database.update_session_health(session.name, "expired", datetime.utcnow())
+            # Filtered and updated in the database rather than per session here
+            for session_name in await self.database.expire_stale_sessions(cutoff_time, ["unhealthy", "error"]):
+                logger.info(f"Cleaning up expired session: {session_name}")
+                self._invalidate_session_status(session_name)
+                self._invalidate_sessions_snapshot()
             
         except Exception as e:
             logger.error(f"Failed to cleanup expired sessions: {e}")
@@ -707,28 +922,35 @@ class AdvancedSessionManager:
             ]
             
             for worker_id in inactive_workers:
-                del self.worker_groups[worker_id]
+                self._drop_worker_group(worker_id)
                 logger.debug(f"Cleaned up inactive worker: {worker_id}")
             
         except Exception as e:
             logger.error(f"Failed to cleanup inactive workers: {e}")
     
-    async def _check_worker_group_health(self, worker_group: WorkerGroup):
-        """Check health of a specific worker group."""
+    async def _check_worker_group_health(self, worker_group: WorkerGroup, pairs_by_id: Optional[Dict[int, ForwardingPair]] = None):
+        """Check health of a specific worker group, using prefetched pairs keyed by ID if given."""
         try:
             # Update last health check
-            worker_group.last_health_check = datetime.utcnow()
+            worker_group.last_health_check = _utcnow()
+            
+            # Pairs since taken over by another group are dropped without a lookup
+            owned = [pid for pid in worker_group.pair_ids if self._pair_to_worker.get(pid) == worker_group.worker_id]
+            
+            if pairs_by_id is None:
+                pairs_by_id = {pair.id: pair for pair in await self.database.get_pairs_by_ids(owned)}
             
             # Verify all pairs still exist and are active
-            valid_pairs = []
-            for pair_id in worker_group.pair_ids:
-                pair = await self.database.get_pair(pair_id)
+            valid_pairs = array('q')
+            for pair_id in owned:
+                pair = pairs_by_id.get(pair_id)
                 if pair and pair.is_active and pair.session_name == worker_group.session_name:
                     valid_pairs.append(pair_id)
             
             # Update worker group if pairs have changed
             if len(valid_pairs) != len(worker_group.pair_ids):
                 logger.info(f"Updating worker group {worker_group.worker_id}: {len(worker_group.pair_ids)} -> {len(valid_pairs)} pairs")
+                self._unmap_pairs(worker_group.worker_id, set(worker_group.pair_ids).difference(valid_pairs))
                 worker_group.pair_ids = valid_pairs
             
         except Exception as e:
@@ -737,16 +959,9 @@ class AdvancedSessionManager:
     async def _rebalance_worker_groups(self):
         """Rebalance worker groups for optimal distribution."""
         try:
-            # Group workers by session
-            session_workers = {}
-            for worker_id, worker_group in self.worker_groups.items():
-                if worker_group.is_active:
-                    if worker_group.session_name not in session_workers:
-                        session_workers[worker_group.session_name] = []
-                    session_workers[worker_group.session_name].append(worker_group)
-            
-            # Check if any sessions need rebalancing
-            for session_name, workers in session_workers.items():
+            # Check if any sessions need rebalancing; snapshot since reorganizing edits the index
+            for session_name, worker_ids in list(self._workers_by_session.items()):
+                workers = [self.worker_groups[wid] for wid in worker_ids if self.worker_groups[wid].is_active]
                 total_pairs = sum(len(w.pair_ids) for w in workers)
                 
                 # If we have too many small worker groups, consolidate
@@ -757,16 +972,38 @@ class AdvancedSessionManager:
         except Exception as e:
             logger.error(f"Failed to rebalance worker groups: {e}")
     
+    def _add_worker_group(self, worker_group: WorkerGroup):
+        """Register a worker group and index it by session."""
+        self.worker_groups[worker_group.worker_id] = worker_group
+        self._workers_by_session.setdefault(worker_group.session_name, {})[worker_group.worker_id] = None
+        for pair_id in worker_group.pair_ids:
+            self._pair_to_worker[pair_id] = worker_group.worker_id
+    
+    def _drop_worker_group(self, worker_id: str):
+        """Remove a worker group and its session index entry."""
+        worker_group = self.worker_groups.pop(worker_id)
+        self._unmap_pairs(worker_id, worker_group.pair_ids)
+        session_workers = self._workers_by_session.get(worker_group.session_name)
+        if session_workers is not None:
+            session_workers.pop(worker_id, None)
+            if not session_workers:
+                del self._workers_by_session[worker_group.session_name]
+    
+    def _unmap_pairs(self, worker_id: str, pair_ids):
+        """Drop pair ownership entries that still point at worker_id."""
+        for pair_id in pair_ids:
+            if self._pair_to_worker.get(pair_id) == worker_id:
+                del self._pair_to_worker[pair_id]
+    
+    def get_worker_for_pair(self, pair_id: int) -> Optional[str]:
+        """Worker group currently holding a pair, if any."""
+        return self._pair_to_worker.get(pair_id)
+    
     async def _remove_session_from_workers(self, session_name: str):
         """Remove a session from all worker groups."""
         try:
-            workers_to_remove = [
-                worker_id for worker_id, worker_group in self.worker_groups.items()
-                if worker_group.session_name == session_name
-            ]
-            
-            for worker_id in workers_to_remove:
-                del self.worker_groups[worker_id]
+            for worker_id in list(self._workers_by_session.get(session_name, ())):
+                self._drop_worker_group(worker_id)
                 logger.debug(f"Removed worker group {worker_id} for deleted session {session_name}")
             
         except Exception as e:
@@ -1,13 +1,32 @@
 """Alert system for error monitoring and admin notifications."""
 
 import asyncio
-from typing import List, Dict, Optional, Any
+import itertools
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Deque, List, Dict, Optional, Any
 from datetime import datetime, timedelta
 from enum import Enum
+import psutil
 from loguru import logger
 
 from core.database import Database
 
+# Number of alerts kept in memory
+MAX_ALERT_HISTORY = 1000
+
+# Event-driven checks still run this often (seconds) in case a notification is missed
+EVENT_SAFETY_NET_INTERVAL = 900
+
+# Message header per alert level
+_LEVEL_HEADER = {
+    'info': 'ℹ️ **INFO ALERT**',
+    'warning': '⚠️ **WARNING ALERT**',
+    'error': '❌ **ERROR ALERT**',
+    'critical': '🚨 **CRITICAL ALERT**',
+}
+
 
 class AlertLevel(Enum):
     """Alert severity levels."""
@@ -17,13 +36,38 @@ class AlertLevel(Enum):
     CRITICAL = "critical"
 
 
+@dataclass(slots=True)
+class AlertRecord:
+    """An alert kept in the in-memory history."""
+    timestamp: float  # epoch seconds
+    level: str
+    title: str
+    message: str
+    source: str
+    data: Dict[str, Any] = field(default_factory=dict)
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """Dict form returned to callers, with the timestamp as a datetime."""
+        return {
+            'timestamp': datetime.fromtimestamp(self.timestamp),
+            'level': self.level,
+            'title': self.title,
+            'message': self.message,
+            'source': self.source,
+            'data': self.data
+        }
+
+
 class AlertSystem:
     """Comprehensive alert system for monitoring and notifications."""
     
     def __init__(self, database: Database, admin_handler=None):
         self.database = database
         self.admin_handler = admin_handler
-        self.alert_history: List[Dict[str, Any]] = []
+        self.alert_history: Deque[AlertRecord] = deque(maxlen=MAX_ALERT_HISTORY)
+        # Per-level and per-source counts of alert_history, kept in step with it
+        self._level_counts: Counter = Counter()
+        self._source_counts: Counter = Counter()
         self.alert_thresholds = {
             'error_rate_threshold': 0.1,  # 10% error rate triggers alert
             'message_failure_threshold': 5,  # 5 consecutive failures
@@ -37,8 +81,18 @@ class AlertSystem:
             AlertLevel.ERROR: timedelta(minutes=5),
             AlertLevel.CRITICAL: timedelta(minutes=1)
         }
-        self.last_alerts: Dict[str, datetime] = {}
+        # Cooldowns as float seconds, compared against time.monotonic()
+        self._cooldown_seconds = {level: period.total_seconds() for level, period in self.alert_cooldowns.items()}
+        self.last_alerts: Dict[str, float] = {}  # alert key -> time.monotonic() of last send
         self.running = False
+        self._monitor_task: Optional[asyncio.Task] = None
+        self.process = psutil.Process()
+        # Set by stop() and by the notify_* hooks to wake the monitor loop
+        self._wakeup = asyncio.Event()
+        self._flow_event = asyncio.Event()
+        self._session_event = asyncio.Event()
+        self._flow_failures = 0  # forwarding failures reported since the last flow alert
+        self._down_sessions: Dict[str, None] = {}  # sessions reported down, in report order
     
     async def start(self):
         """Start the alert monitoring system."""
@@ -48,43 +102,56 @@ class AlertSystem:
         self.running = True
         logger.info("Alert system started")
         
-        # Start monitoring loops
-        asyncio.create_task(self._monitor_system_health())
-        asyncio.create_task(self._monitor_message_flow())
-        asyncio.create_task(self._monitor_session_health())
+        # Start the monitoring scheduler
+        self._wakeup.clear()
+        self._monitor_task = asyncio.create_task(self._monitor_loop())
     
     async def stop(self):
         """Stop the alert system."""
         self.running = False
+        self._wakeup.set()
         logger.info("Alert system stopped")
     
-    async def send_alert(self, level: AlertLevel, title: str, message: str, source: str = "system", data: Optional[Dict] = None):
-        """Send an alert to administrators."""
+    def notify_flow_failure(self):
+        """Report a failed forward; called by the forwarding pipeline."""
+        self._flow_failures += 1
+        self._flow_event.set()
+        self._wakeup.set()
+    
+    def notify_session_down(self, name: str):
+        """Report a session that went offline; called by the session manager."""
+        self._down_sessions[name] = None
+        self._session_event.set()
+        self._wakeup.set()
+    
+    async def send_alert(self, level: AlertLevel, title: str, message: str, source: str = "system", data: Optional[Dict] = None) -> bool:
+        """Send an alert to administrators; returns False if it was suppressed by cooldown or failed."""
         try:
             # Check cooldown
             alert_key = f"{source}:{title}"
-            if self._is_in_cooldown(alert_key, level):
-                return
+            now = time.monotonic()
+            if self._is_in_cooldown(alert_key, level, now):
+                return False
             
-            # Create alert record
-            alert = {
-                'timestamp': datetime.now(),
-                'level': level.value,
-                'title': title,
-                'message': message,
-                'source': source,
-                'data': data or {}
-            }
+            # Create alert record (timestamp as epoch seconds; converted when formatted)
+            alert = AlertRecord(
+                timestamp=time.time(),
+                level=level.value,
+                title=title,
+                message=message,
+                source=source,
+                data=data or {}
+            )
             
-            # Add to history
+            # Add to history (the deque drops the oldest alert when full)
+            if len(self.alert_history) == MAX_ALERT_HISTORY:
+                self._uncount_alert(self.alert_history[0])
             self.alert_history.append(alert)
-            
-            # Keep only last 1000 alerts
-            if len(self.alert_history) > 1000:
-                self.alert_history = self.alert_history[-1000:]
+            self._level_counts[alert.level] += 1
+            self._source_counts[alert.source] += 1
             
             # Update cooldown
-            self.last_alerts[alert_key] = datetime.now()
+            self.last_alerts[alert_key] = now
             
             # Format and send to admins
             formatted_message = self._format_alert_message(alert)
@@ -92,128 +159,194 @@ class AlertSystem:
                 await self.admin_handler.broadcast_message(formatted_message)
             
             logger.warning(f"Alert sent: {level.value.upper()} - {title}")
+            return True
             
         except Exception as e:
             logger.error(f"Failed to send alert: {e}")
+            return False
+    
+    def _uncount_alert(self, alert: AlertRecord):
+        """Remove an alert leaving the history from the running counts."""
+        for counts, key in ((self._level_counts, alert.level), (self._source_counts, alert.source)):
+            counts[key] -= 1
+            if not counts[key]:
+                del counts[key]
     
-    def _is_in_cooldown(self, alert_key: str, level: AlertLevel) -> bool:
-        """Check if alert is in cooldown period."""
-        if alert_key not in self.last_alerts:
+    def _is_in_cooldown(self, alert_key: str, level: AlertLevel, now: float) -> bool:
+        """Check if alert is in cooldown period; now is a time.monotonic() value."""
+        last_alert = self.last_alerts.get(alert_key)
+        if last_alert is None:
             return False
         
-        last_alert = self.last_alerts[alert_key]
-        cooldown_period = self.alert_cooldowns[level]
-        
-        return datetime.now() - last_alert < cooldown_period
+        return now - last_alert < self._cooldown_seconds[level]
     
-    def _format_alert_message(self, alert: Dict[str, Any]) -> str:
+    def _format_alert_message(self, alert: AlertRecord) -> str:
         """Format alert for admin message."""
-        level_emoji = {
-            'info': 'ℹ️',
-            'warning': '⚠️',
-            'error': '❌',
-            'critical': '🚨'
-        }
+        level = alert.level
+        header = _LEVEL_HEADER.get(level) or f"📢 **{level.upper()} ALERT**"
+        timestamp = datetime.fromtimestamp(alert.timestamp).strftime('%H:%M:%S')
         
-        emoji = level_emoji.get(alert['level'], '📢')
-        timestamp = alert['timestamp'].strftime('%H:%M:%S')
-        
-        message = f"{emoji} **{alert['level'].upper()} ALERT**\n\n"
-        message += f"**{alert['title']}**\n"
-        message += f"{alert['message']}\n\n"
-        message += f"🕒 Time: {timestamp}\n"
-        message += f"📍 Source: {alert['source']}"
+        message = (
+            f"{header}\n\n"
+            f"**{alert.title}**\n"
+            f"{alert.message}\n\n"
+            f"🕒 Time: {timestamp}\n"
+            f"📍 Source: {alert.source}"
+        )
         
-        if alert['data']:
-            message += f"\n\n**Details:**\n"
-            for key, value in alert['data'].items():
-                message += f"• {key}: {value}\n"
+        data = alert.data
+        if data:
+            details = "".join([f"• {key}: {value}\n" for key, value in data.items()])
+            message = f"{message}\n\n**Details:**\n{details}"
         
         return message
     
     # Monitoring methods
-    async def _monitor_system_health(self):
-        """Monitor overall system health."""
+    async def _monitor_loop(self):
+        """
+        Run the monitoring checks from one task.
+        
+        Each job is [next_due, interval, check, trigger]; the loop sleeps until
+        the earliest deadline, a notify_* hook or stop(), then runs every check
+        that is due or whose trigger event is set. Event-driven checks only
+        fall back to EVENT_SAFETY_NET_INTERVAL, and notifications arriving
+        before the check runs are handled together. A failing check is
+        retried after a minute.
+        """
+        now = time.monotonic()
+        jobs = [
+            [now, 300, self._check_system_health, None],  # every 5 minutes, first run right away
+            [now + EVENT_SAFETY_NET_INTERVAL, EVENT_SAFETY_NET_INTERVAL,
+             self._check_message_flow, self._flow_event],
+            [now + EVENT_SAFETY_NET_INTERVAL, EVENT_SAFETY_NET_INTERVAL,
+             self._check_session_health, self._session_event],
+        ]
+        
         while self.running:
-            try:
-                # Check memory usage
-                import psutil
-                memory_percent = psutil.virtual_memory().percent
-                
-                if memory_percent > self.alert_thresholds['memory_usage_threshold']:
-                    await self.send_alert(
-                        AlertLevel.WARNING,
-                        "High Memory Usage",
-                        f"System memory usage is at {memory_percent:.1f}%",
-                        "system",
-                        {'memory_percent': memory_percent}
-                    )
-                
-                # Check database connection
+            delay = min(job[0] for job in jobs) - time.monotonic()
+            if delay > 0:
                 try:
-                    pairs = await self.database.get_all_pairs()
-                    if pairs is None:
-                        await self.send_alert(
-                            AlertLevel.ERROR,
-                            "Database Connection Failed",
-                            "Unable to connect to database",
-                            "database"
-                        )
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+            if not self.running:
+                break
+            self._wakeup.clear()
+            
+            now = time.monotonic()
+            for job in jobs:
+                trigger = job[3]
+                if job[0] > now and not (trigger and trigger.is_set()):
+                    continue
+                if trigger:
+                    trigger.clear()
+                try:
+                    await job[2]()
+                    job[0] = time.monotonic() + job[1]
                 except Exception as e:
-                    await self.send_alert(
-                        AlertLevel.ERROR,
-                        "Database Error",
-                        f"Database operation failed: {str(e)}",
-                        "database"
-                    )
-                
-                await asyncio.sleep(300)  # Check every 5 minutes
-                
-            except Exception as e:
-                logger.error(f"Error in system health monitoring: {e}")
-                await asyncio.sleep(60)
+                    logger.error(f"Error in {job[2].__name__}: {e}")
+                    job[0] = time.monotonic() + 60
     
-    async def _monitor_message_flow(self):
-        """Monitor message forwarding flow."""
-        while self.running:
-            try:
-                # This would track message success/failure rates
-                # For now, just a placeholder
-                await asyncio.sleep(120)  # Check every 2 minutes
-                
-            except Exception as e:
-                logger.error(f"Error in message flow monitoring: {e}")
-                await asyncio.sleep(60)
+    async def _check_system_health(self):
+        """Check memory usage and database connectivity."""
+        # Check memory usage
+        memory_percent = psutil.virtual_memory().percent
+        
+        if memory_percent > self.alert_thresholds['memory_usage_threshold']:
+            # Sample this process's own figures in a single read
+            with self.process.oneshot():
+                process_rss_mb = self.process.memory_info().rss / 1024 / 1024
+                process_threads = self.process.num_threads()
+            
+            await self.send_alert(
+                AlertLevel.WARNING,
+                "High Memory Usage",
+                f"System memory usage is at {memory_percent:.1f}%",
+                "system",
+                {
+                    'memory_percent': memory_percent,
+                    'process_rss_mb': round(process_rss_mb, 1),
+                    'process_threads': process_threads
+                }
+            )
+        
+        # Check database connection
+        try:
+            pairs = await self.database.get_all_pairs()
+            if pairs is None:
+                await self.send_alert(
+                    AlertLevel.ERROR,
+                    "Database Connection Failed",
+                    "Unable to connect to database",
+                    "database"
+                )
+        except Exception as e:
+            await self.send_alert(
+                AlertLevel.ERROR,
+                "Database Error",
+                f"Database operation failed: {str(e)}",
+                "database"
+            )
     
-    async def _monitor_session_health(self):
-        """Monitor Telegram session health."""
-        while self.running:
-            try:
-                # Check session connectivity
-                # This would integrate with session manager
-                await asyncio.sleep(180)  # Check every 3 minutes
-                
-            except Exception as e:
-                logger.error(f"Error in session health monitoring: {e}")
-                await asyncio.sleep(60)
+    async def _check_message_flow(self):
+        """Alert once reported forwarding failures reach the threshold."""
+        failures = self._flow_failures
+        if failures < self.alert_thresholds['message_failure_threshold']:
+            return
+        
+        sent = await self.send_alert(
+            AlertLevel.WARNING,
+            "Message Forwarding Failures",
+            f"{failures} messages failed to forward",
+            "forwarder",
+            {'failures': failures}
+        )
+        # Failures reported while sending (or an alert held back by cooldown) carry over
+        if sent:
+            self._flow_failures -= failures
+    
+    async def _check_session_health(self):
+        """Alert on sessions reported down since the last check."""
+        if not self._down_sessions:
+            return
+        
+        sessions = list(self._down_sessions)
+        sent = await self.send_alert(
+            AlertLevel.WARNING,
+            "Session Offline",
+            f"Sessions reported offline: {', '.join(sessions)}",
+            "session_manager",
+            {'sessions': ', '.join(sessions)}
+        )
+        # Keep the sessions for the next check if the alert was held back by cooldown
+        if sent:
+            for name in sessions:
+                self._down_sessions.pop(name, None)
     
     # Alert management methods
     async def get_recent_alerts(self, limit: int = 50, level: Optional[AlertLevel] = None) -> List[Dict[str, Any]]:
-        """Get recent alerts."""
-        alerts = self.alert_history[-limit:]
+        """Get recent alerts, newest first, with datetime timestamps."""
+        alerts = list(itertools.islice(self.alert_history, max(0, len(self.alert_history) - limit), None))
         
         if level:
-            alerts = [a for a in alerts if a['level'] == level.value]
+            alerts = [a for a in alerts if a.level == level.value]
         
-        return sorted(alerts, key=lambda x: x['timestamp'], reverse=True)
+        alerts.sort(key=lambda x: x.timestamp, reverse=True)
+        return [a.as_dict() for a in alerts]
     
     async def clear_alert_history(self, before_date: Optional[datetime] = None):
         """Clear alert history."""
         if before_date:
-            self.alert_history = [a for a in self.alert_history if a['timestamp'] > before_date]
+            before_ts = before_date.timestamp()
+            self.alert_history = deque(
+                (a for a in self.alert_history if a.timestamp > before_ts),
+                maxlen=MAX_ALERT_HISTORY
+            )
         else:
             self.alert_history.clear()
         
+        self._level_counts = Counter(a.level for a in self.alert_history)
+        self._source_counts = Counter(a.source for a in self.alert_history)
         logger.info("Alert history cleared")
     
     async def update_thresholds(self, new_thresholds: Dict[str, Any]):
@@ -222,26 +355,24 @@ class AlertSystem:
         logger.info("Alert thresholds updated")
     
     async def get_alert_stats(self) -> Dict[str, Any]:
-        """Get alert statistics."""
-        if not self.alert_history:
-            return {'total': 0, 'by_level': {}, 'by_source': {}}
+        """
+        Get alert statistics.
         
-        by_level = {}
-        by_source = {}
-        
-        for alert in self.alert_history:
-            level = alert['level']
-            source = alert['source']
-            
-            by_level[level] = by_level.get(level, 0) + 1
-            by_source[source] = by_source.get(source, 0) + 1
+        Level and source counts are maintained as alerts are added; history is
+        in send order, so the 24h count only walks back over recent alerts.
+        """
+        cutoff = time.time() - 24 * 3600
+        recent = 0
+        for alert in reversed(self.alert_history):
+            if alert.timestamp <= cutoff:
+                break
+            recent += 1
         
         return {
             'total': len(self.alert_history),
-            'by_level': by_level,
-            'by_source': by_source,
-            'recent_24h': len([a for a in self.alert_history 
-                             if datetime.now() - a['timestamp'] < timedelta(hours=24)])
+            'by_level': dict(self._level_counts),
+            'by_source': dict(self._source_counts),
+            'recent_24h': recent
         }
 
 
@@ -1,7 +1,10 @@
 """Bot token management and validation for per-pair Telegram bots."""
 
 import asyncio
-from typing import Dict, Optional, Any
+import hashlib
+from typing import Dict, Optional, Any, Tuple
+
+import aiohttp
 from telegram import Bot
 from telegram.error import TelegramError, BadRequest, Forbidden
 from loguru import logger
@@ -10,6 +13,69 @@ from utils.encryption import EncryptionManager
 from core.database import Database, ForwardingPair
 
 
+TELEGRAM_API_URL = "https://api.telegram.org/bot{token}/{method}"
+
+# Seconds to wait for a Bot to close its HTTP connections during cleanup
+BOT_CLOSE_TIMEOUT = 5
+
+# Shared HTTP session for raw Bot API calls; keeps TLS connections alive
+# across validation requests instead of reconnecting per call.
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def _get_session() -> aiohttp.ClientSession:
+    """Return the shared aiohttp session, creating it on first use."""
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(limit=100, keepalive_timeout=60, ttl_dns_cache=300)
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=30)
+        )
+    return _session
+
+
+async def close_http_session():
+    """Close the shared Bot API HTTP session (call on application shutdown)."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+async def _call_bot_api(token: str, method: str, **params) -> Any:
+    """
+    Call a Bot API method over the shared session.
+    
+    Raises the matching telegram.error exception on API failure so callers
+    can keep handling errors the same way as with telegram.Bot.
+    """
+    url = TELEGRAM_API_URL.format(token=token, method=method)
+    async with _get_session().post(url, json=params) as response:
+        data = await response.json(content_type=None)
+    
+    if data.get('ok'):
+        return data.get('result')
+    
+    description = data.get('description', 'Unknown error')
+    error_code = data.get('error_code')
+    if error_code in (401, 403):
+        raise Forbidden(description)
+    if error_code == 400:
+        raise BadRequest(description)
+    raise TelegramError(description)
+
+
+def _token_key(token: str) -> bytes:
+    """Short digest identifying a token, so caches never hold plaintext tokens."""
+    return hashlib.blake2b(token.encode(), digest_size=8).digest()
+
+
+def _bot_id_from_token(token: str) -> int:
+    """Bot tokens are '<bot_id>:<secret>', so the bot ID needs no getMe call."""
+    return int(token.split(':', 1)[0])
+
+
 class BotTokenValidator:
     """Validates and tests bot tokens for forwarding pairs."""
     
@@ -22,23 +88,20 @@ class BotTokenValidator:
             Dict with validation results including bot info and permissions
         """
         try:
-            bot = Bot(token=token)
+            # Test basic bot connectivity over the shared session rather than
+            # a new Bot (and connection pool) per validation
+            me = await _call_bot_api(token, 'getMe')
             
-            # Initialize bot for v21+ compatibility
-            async with bot:
-                # Test basic bot connectivity
-                me = await bot.get_me()
-                
-                return {
-                    'valid': True,
-                    'bot_id': me.id,
-                    'username': me.username,
-                    'first_name': me.first_name,
-                    'can_join_groups': me.can_join_groups,
-                    'can_read_all_group_messages': me.can_read_all_group_messages,
-                    'supports_inline_queries': me.supports_inline_queries,
-                    'error': None
-                }
+            return {
+                'valid': True,
+                'bot_id': me['id'],
+                'username': me.get('username'),
+                'first_name': me.get('first_name'),
+                'can_join_groups': me.get('can_join_groups'),
+                'can_read_all_group_messages': me.get('can_read_all_group_messages'),
+                'supports_inline_queries': me.get('supports_inline_queries'),
+                'error': None
+            }
             
         except Forbidden:
             return {
@@ -70,37 +133,21 @@ class BotTokenValidator:
             Dict with permission validation results
         """
         try:
-            bot = Bot(token=token)
+            # Try to get chat member (bot) info
+            chat_member = await _call_bot_api(
+                token, 'getChatMember', chat_id=chat_id, user_id=_bot_id_from_token(token)
+            )
             
-            # Initialize bot for v21+ compatibility
-            async with bot:
-                # Try to get chat member (bot) info
-                chat_member = await bot.get_chat_member(chat_id, bot.id)
-                
-                # Check bot permissions
-                can_send_messages = True
-                can_send_media = True
-                can_edit_messages = True
-                can_delete_messages = True
-                
-                if hasattr(chat_member, 'can_send_messages'):
-                    can_send_messages = chat_member.can_send_messages
-                if hasattr(chat_member, 'can_send_media_messages'):
-                    can_send_media = chat_member.can_send_media_messages
-                if hasattr(chat_member, 'can_edit_messages'):
-                    can_edit_messages = chat_member.can_edit_messages
-                if hasattr(chat_member, 'can_delete_messages'):
-                    can_delete_messages = chat_member.can_delete_messages
-                
-                return {
-                    'valid': True,
-                    'status': chat_member.status,
-                    'can_send_messages': can_send_messages,
-                    'can_send_media': can_send_media,
-                    'can_edit_messages': can_edit_messages,
-                    'can_delete_messages': can_delete_messages,
-                    'error': None
-                }
+            # Check bot permissions (fields are only present when restricted/admin)
+            return {
+                'valid': True,
+                'status': chat_member.get('status'),
+                'can_send_messages': chat_member.get('can_send_messages', True),
+                'can_send_media': chat_member.get('can_send_media_messages', True),
+                'can_edit_messages': chat_member.get('can_edit_messages', True),
+                'can_delete_messages': chat_member.get('can_delete_messages', True),
+                'error': None
+            }
             
         except BadRequest as e:
             if 'chat not found' in str(e).lower():
@@ -138,27 +185,24 @@ class BotTokenValidator:
             Dict with test results
         """
         try:
-            bot = Bot(token=token)
+            # Send test message
+            test_message = "🤖 Bot token validation successful! This message will be deleted shortly."
+            message = await _call_bot_api(token, 'sendMessage', chat_id=chat_id, text=test_message)
+            message_id = message['message_id']
             
-            # Initialize bot for v21+ compatibility
-            async with bot:
-                # Send test message
-                test_message = "🤖 Bot token validation successful! This message will be deleted shortly."
-                message = await bot.send_message(chat_id, test_message)
-                
-                # Try to delete the test message after a short delay
-                await asyncio.sleep(2)
-                try:
-                    await bot.delete_message(chat_id, message.message_id)
-                except Exception:
-                    # Deletion failed, but sending worked
-                    pass
-                
-                return {
-                    'valid': True,
-                    'message_id': message.message_id,
-                    'error': None
-                }
+            # Try to delete the test message after a short delay
+            await asyncio.sleep(2)
+            try:
+                await _call_bot_api(token, 'deleteMessage', chat_id=chat_id, message_id=message_id)
+            except Exception:
+                # Deletion failed, but sending worked
+                pass
+            
+            return {
+                'valid': True,
+                'message_id': message_id,
+                'error': None
+            }
             
         except Exception as e:
             return {
@@ -173,12 +217,36 @@ class PerPairBotManager:
     def __init__(self, database: Database, encryption_manager: EncryptionManager):
         self.database = database
         self.encryption_manager = encryption_manager
-        self.active_bots: Dict[int, Bot] = {}  # pair_id -> Bot instance
+        # Pairs sharing a token share one Bot (and its connection pool)
+        self.active_bots: Dict[bytes, Bot] = {}  # token key -> Bot instance
+        self._pair_bot_keys: Dict[int, bytes] = {}  # pair_id -> token key
+        self._bot_refcounts: Dict[bytes, int] = {}  # token key -> pairs using the Bot
+        # pair_id -> (ciphertext digest, token key); the plaintext is only held by live Bots
+        self._token_cache: Dict[int, Tuple[bytes, bytes]] = {}
+    
+    def _decrypt_token(self, pair) -> str:
+        """
+        Decrypt a pair's bot token, skipping the decrypt while the ciphertext is
+        unchanged and a Bot for that token is live (the token is read from the Bot).
+        
+        A changed ciphertext (token updated or re-encrypted) replaces the entry.
+        """
+        digest = hashlib.blake2b(pair.telegram_bot_token_encrypted.encode(), digest_size=8).digest()
+        entry = self._token_cache.get(pair.id)
+        if entry is not None and entry[0] == digest:
+            bot = self.active_bots.get(entry[1])
+            if bot is not None:
+                return bot.token
+        
+        token = self.encryption_manager.decrypt(pair.telegram_bot_token_encrypted)
+        self._token_cache[pair.id] = (digest, _token_key(token))
+        return token
         
     async def get_bot_for_pair(self, pair_id: int) -> Optional[Bot]:
         """Get or create a bot instance for a specific pair."""
-        if pair_id in self.active_bots:
-            return self.active_bots[pair_id]
+        key = self._pair_bot_keys.get(pair_id)
+        if key is not None:
+            return self.active_bots[key]
         
         # Load pair from database
         pair = await self.database.get_pair(pair_id)
@@ -188,19 +256,34 @@ class PerPairBotManager:
         
         try:
             # Decrypt bot token
-            decrypted_token = self.encryption_manager.decrypt(pair.telegram_bot_token_encrypted)
+            decrypted_token = self._decrypt_token(pair)
             
-            # Create bot instance
-            bot = Bot(token=decrypted_token)
-            
-            # Test bot connectivity
-            await bot.get_me()
+            key = _token_key(decrypted_token)
+            bot = self.active_bots.get(key)
+            if bot is None:
+                # Create bot instance
+                bot = Bot(token=decrypted_token)
+                
+                # Test bot connectivity
+                await bot.get_me()
+                
+                # Another pair may have created it while we awaited; keep one pool per token
+                shared = self.active_bots.setdefault(key, bot)
+                if shared is bot:
+                    logger.info(f"Created bot instance for pair {pair_id}")
+                else:
+                    try:
+                        await bot.shutdown()
+                    except Exception as e:
+                        logger.warning(f"Error closing duplicate bot for pair {pair_id}: {e}")
+                    bot = shared
             
-            # Cache bot instance
-            self.active_bots[pair_id] = bot
-            logger.info(f"Created bot instance for pair {pair_id}")
+            # Re-check: a concurrent call may have registered this pair already
+            if pair_id not in self._pair_bot_keys:
+                self._pair_bot_keys[pair_id] = key
+                self._bot_refcounts[key] = self._bot_refcounts.get(key, 0) + 1
             
-            return bot
+            return self.active_bots[self._pair_bot_keys[pair_id]]
             
         except Exception as e:
             logger.error(f"Failed to create bot for pair {pair_id}: {e}")
@@ -217,16 +300,18 @@ class PerPairBotManager:
         
         try:
             # Decrypt token
-            decrypted_token = self.encryption_manager.decrypt(pair.telegram_bot_token_encrypted)
-            
-            # Validate token
-            validation_result = await BotTokenValidator.validate_bot_token(decrypted_token)
+            decrypted_token = self._decrypt_token(pair)
             
-            if validation_result['valid']:
-                # Also validate chat permissions
-                chat_validation = await BotTokenValidator.validate_chat_permissions(
+            # Validate token and chat permissions in one round trip; the
+            # permission result is only reported for a valid token
+            validation_result, chat_validation = await asyncio.gather(
+                BotTokenValidator.validate_bot_token(decrypted_token),
+                BotTokenValidator.validate_chat_permissions(
                     decrypted_token, pair.telegram_dest_chat_id
                 )
+            )
+            
+            if validation_result['valid']:
                 validation_result['chat_permissions'] = chat_validation
             
             return validation_result
@@ -238,23 +323,37 @@ class PerPairBotManager:
             }
     
     async def remove_bot_for_pair(self, pair_id: int):
-        """Remove bot instance for a pair."""
-        if pair_id in self.active_bots:
-            try:
-                bot = self.active_bots[pair_id]
-                # Close bot session if possible
+        """Release a pair's bot; the Bot is closed once no other pair uses it."""
+        self._token_cache.pop(pair_id, None)
+        key = self._pair_bot_keys.pop(pair_id, None)
+        if key is None:
+            return
+        
+        remaining = self._bot_refcounts[key] - 1
+        if remaining:
+            self._bot_refcounts[key] = remaining
+            logger.info(f"Released shared bot instance for pair {pair_id}")
+            return
+        
+        del self._bot_refcounts[key]
+        bot = self.active_bots.pop(key)
+        try:
+            # Close bot session if possible, without letting a stuck close hang shutdown
+            async with asyncio.timeout(BOT_CLOSE_TIMEOUT):
                 async with bot:
                     pass
-            except Exception as e:
-                logger.warning(f"Error closing bot for pair {pair_id}: {e}")
-            finally:
-                del self.active_bots[pair_id]
-                logger.info(f"Removed bot instance for pair {pair_id}")
+        except Exception as e:
+            logger.warning(f"Error closing bot for pair {pair_id}: {e}")
+        finally:
+            logger.info(f"Removed bot instance for pair {pair_id}")
     
     async def cleanup_all_bots(self):
         """Clean up all bot instances."""
-        for pair_id in list(self.active_bots.keys()):
-            await self.remove_bot_for_pair(pair_id)
+        # Bots close independently, so overlap their network teardowns
+        await asyncio.gather(
+            *(self.remove_bot_for_pair(pair_id) for pair_id in list(self._pair_bot_keys)),
+            return_exceptions=True
+        )
         
         logger.info("All bot instances cleaned up")
     
@@ -3,20 +3,42 @@
 import asyncio
 import json
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 
 from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, JSON
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.sql import text
+from sqlalchemy.sql import bindparam, text
 from loguru import logger
 
+try:
+    # orjson is several times faster; it parses str as well as bytes
+    import orjson
+    _json_loads = orjson.loads
+    
+    def _json_dumps(value: Any) -> str:
+        return orjson.dumps(value).decode()
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
 Base = declarative_base()
 
 
-@dataclass
+def _parse_datetime(value: Any) -> Optional[datetime]:
+    """Coerce a raw SQL datetime column (str on SQLite) to a datetime once at load."""
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        logger.warning(f"Unparseable datetime value in database: {value!r}")
+        return None
+
+
+@dataclass(slots=True)
 class ForwardingPair:
     """Forwarding pair configuration."""
     id: Optional[int] = None
@@ -44,7 +66,29 @@ class ForwardingPair:
             self.keyword_filters = []
 
 
-@dataclass
+def _session_pair_from_row(row: Any) -> ForwardingPair:
+    """Build a ForwardingPair from a forwarding_pairs row as the session queries load it."""
+    return ForwardingPair(
+        id=row.id,
+        name=row.name,
+        telegram_source_chat_id=int(row.telegram_source_chat_id),
+        discord_channel_id=int(row.discord_channel_id),
+        telegram_dest_chat_id=int(row.telegram_dest_chat_id),
+        session_name=row.session_name,
+        session_id=row.session_id,
+        is_active=bool(row.is_active),
+        keyword_filters=_json_loads(row.keyword_filters) if row.keyword_filters else [],
+        media_enabled=bool(row.media_enabled),
+        worker_id=row.worker_id,
+        health_status=row.health_status,
+        last_message_time=row.last_message_time,
+        message_count=row.message_count,
+        created_at=row.created_at,
+        updated_at=row.updated_at
+    )
+
+
+@dataclass(slots=True)
 class SessionInfo:
     """Enhanced session information for management."""
     id: Optional[int] = None
@@ -62,7 +106,7 @@ class SessionInfo:
     updated_at: Optional[datetime] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class MessageMapping:
     """Message ID mapping for reply threading."""
     id: Optional[int] = None
@@ -146,7 +190,13 @@ class Database:
                 # Convert to aiosqlite for async support
                 self.database_url = self.database_url.replace('sqlite:', 'sqlite+aiosqlite:', 1)
             
-            self.engine = create_async_engine(self.database_url, echo=False)
+            # JSON columns (keyword_filters, metadata_info) go through the same codec
+            self.engine = create_async_engine(
+                self.database_url,
+                echo=False,
+                json_serializer=_json_dumps,
+                json_deserializer=_json_loads
+            )
             self.Session = sessionmaker(bind=self.engine, class_=AsyncSession, expire_on_commit=False)
             
             # Create tables
@@ -230,6 +280,25 @@ class Database:
                 logger.error(f"Failed to get pair {pair_id}: {e}")
                 return None
     
+    async def get_pairs_by_ids(self, pair_ids: List[int]) -> List[ForwardingPair]:
+        """Get several forwarding pairs by ID in one query; missing IDs are skipped."""
+        if not pair_ids:
+            return []
+        
+        async with self.Session() as session:
+            try:
+                result = await session.execute(
+                    text("SELECT * FROM forwarding_pairs WHERE id IN :pair_ids").bindparams(
+                        bindparam("pair_ids", expanding=True)
+                    ),
+                    {"pair_ids": list(pair_ids)}
+                )
+                return [_session_pair_from_row(row) for row in result]
+                
+            except Exception as e:
+                logger.error(f"Failed to get pairs {pair_ids}: {e}")
+                return []
+    
     async def get_all_pairs(self) -> List[ForwardingPair]:
         """Get all forwarding pairs."""
         async with self.Session() as session:
@@ -248,7 +317,7 @@ class Database:
                         discord_webhook_url=row.discord_webhook_url or "",
                         session_name=row.session_name,
                         is_active=bool(row.is_active),
-                        keyword_filters=json.loads(row.keyword_filters) if row.keyword_filters else [],
+                        keyword_filters=_json_loads(row.keyword_filters) if row.keyword_filters else [],
                         media_enabled=bool(row.media_enabled),
                         created_at=row.created_at,
                         updated_at=row.updated_at
@@ -461,12 +530,12 @@ class Database:
                         phone_number=row.phone_number,
                         is_active=bool(row.is_active),
                         health_status=row.health_status,
-                        last_verified=row.last_verified,
+                        last_verified=_parse_datetime(row.last_verified),
                         pair_count=row.pair_count,
                         worker_id=row.worker_id,
                         max_pairs=row.max_pairs,
                         priority=row.priority,
-                        metadata_info=json.loads(row.metadata_info) if row.metadata_info else {},
+                        metadata_info=_json_loads(row.metadata_info) if row.metadata_info else {},
                         created_at=row.created_at,
                         updated_at=row.updated_at
                     )
@@ -490,12 +559,12 @@ class Database:
                         phone_number=row.phone_number,
                         is_active=bool(row.is_active),
                         health_status=row.health_status,
-                        last_verified=row.last_verified,
+                        last_verified=_parse_datetime(row.last_verified),
                         pair_count=row.pair_count,
                         worker_id=row.worker_id,
                         max_pairs=row.max_pairs,
                         priority=row.priority,
-                        metadata_info=json.loads(row.metadata_info) if row.metadata_info else {},
+                        metadata_info=_json_loads(row.metadata_info) if row.metadata_info else {},
                         created_at=row.created_at,
                         updated_at=row.updated_at
                     ))
@@ -506,6 +575,17 @@ class Database:
                 logger.error(f"Failed to get all sessions: {e}")
                 return []
     
+    async def get_session_names(self) -> List[str]:
+        """Get the names of all sessions, without loading their rows."""
+        async with self.Session() as session:
+            try:
+                result = await session.execute(text("SELECT name FROM sessions"))
+                return [row.name for row in result]
+                
+            except Exception as e:
+                logger.error(f"Failed to get session names: {e}")
+                return []
+    
     async def update_session_health(self, session_name: str, health_status: str, last_verified: Optional[datetime] = None) -> bool:
         """Update session health status."""
         async with self.Session() as session:
@@ -546,6 +626,68 @@ class Database:
                 logger.error(f"Failed to update session health {session_name}: {e}")
                 return False
     
+    async def bulk_update_session_health(self, updates: List[Tuple[str, str, Optional[datetime]]]) -> bool:
+        """Update health status for many sessions in one statement; updates are (name, status, last_verified)."""
+        if not updates:
+            return True
+        
+        async with self.Session() as session:
+            try:
+                now = datetime.utcnow()
+                await session.execute(
+                    text("UPDATE sessions SET health_status = :health_status, last_verified = :last_verified, updated_at = :updated_at WHERE name = :name"),
+                    [
+                        {
+                            "health_status": health_status,
+                            "last_verified": last_verified or now,
+                            "updated_at": now,
+                            "name": session_name
+                        }
+                        for session_name, health_status, last_verified in updates
+                    ]
+                )
+                await session.commit()
+                
+                logger.info(f"Updated session health for {len(updates)} sessions")
+                return True
+                
+            except Exception as e:
+                await session.rollback()
+                logger.error(f"Failed to bulk update session health: {e}")
+                return False
+    
+    async def expire_stale_sessions(self, cutoff: datetime, statuses: List[str]) -> List[str]:
+        """Mark sessions in one of statuses and last verified before cutoff as expired; returns their names."""
+        async with self.Session() as session:
+            try:
+                params = {"cutoff": cutoff, "statuses": list(statuses)}
+                result = await session.execute(
+                    text("SELECT name FROM sessions WHERE last_verified < :cutoff AND health_status IN :statuses").bindparams(
+                        bindparam("statuses", expanding=True)
+                    ),
+                    params
+                )
+                names = [row.name for row in result]
+                if not names:
+                    return []
+                
+                now = datetime.utcnow()
+                await session.execute(
+                    text("UPDATE sessions SET health_status = 'expired', last_verified = :now, updated_at = :now WHERE last_verified < :cutoff AND health_status IN :statuses").bindparams(
+                        bindparam("statuses", expanding=True)
+                    ),
+                    {**params, "now": now}
+                )
+                await session.commit()
+                
+                logger.info(f"Expired {len(names)} stale sessions")
+                return names
+                
+            except Exception as e:
+                await session.rollback()
+                logger.error(f"Failed to expire stale sessions: {e}")
+                return []
+    
     async def get_pairs_by_session(self, session_name: str) -> List[ForwardingPair]:
         """Get all pairs assigned to a specific session."""
         async with self.Session() as session:
@@ -554,48 +696,70 @@ class Database:
                     text("SELECT * FROM forwarding_pairs WHERE session_name = :session_name AND is_active = 1"),
                     {"session_name": session_name}
                 )
-                pairs = []
+                return [_session_pair_from_row(row) for row in result]
+                
+            except Exception as e:
+                logger.error(f"Failed to get pairs for session {session_name}: {e}")
+                return []
+    
+    async def get_pairs_grouped_by_session(self) -> Dict[str, List[ForwardingPair]]:
+        """Get all active pairs in one query, grouped by session name."""
+        async with self.Session() as session:
+            try:
+                result = await session.execute(
+                    text("SELECT * FROM forwarding_pairs WHERE is_active = 1")
+                )
+                pairs_by_session: Dict[str, List[ForwardingPair]] = {}
                 
                 for row in result:
-                    pairs.append(ForwardingPair(
-                        id=row.id,
-                        name=row.name,
-                        telegram_source_chat_id=int(row.telegram_source_chat_id),
-                        discord_channel_id=int(row.discord_channel_id),
-                        telegram_dest_chat_id=int(row.telegram_dest_chat_id),
-                        session_name=row.session_name,
-                        session_id=row.session_id,
-                        is_active=bool(row.is_active),
-                        keyword_filters=json.loads(row.keyword_filters) if row.keyword_filters else [],
-                        media_enabled=bool(row.media_enabled),
-                        worker_id=row.worker_id,
-                        health_status=row.health_status,
-                        last_message_time=row.last_message_time,
-                        message_count=row.message_count,
-                        created_at=row.created_at,
-                        updated_at=row.updated_at
-                    ))
+                    pairs_by_session.setdefault(row.session_name, []).append(_session_pair_from_row(row))
                 
-                return pairs
+                return pairs_by_session
                 
             except Exception as e:
-                logger.error(f"Failed to get pairs for session {session_name}: {e}")
-                return []
+                logger.error(f"Failed to get pairs grouped by session: {e}")
+                return {}
     
     async def bulk_reassign_session(self, pair_ids: List[int], new_session_name: str, new_session_id: Optional[int] = None) -> bool:
-        """Bulk reassign pairs to a new session."""
+        """
+        Bulk reassign pairs to a new session.
+        
+        The pair update and the pair_count refresh of every affected session
+        (previous owners and the new one) run in a single transaction.
+        """
+        if not pair_ids:
+            return True
+        
         async with self.Session() as session:
             try:
-                for pair_id in pair_ids:
-                    await session.execute(
-                        text("UPDATE forwarding_pairs SET session_name = :session_name, session_id = :session_id, health_status = 'reassigning', updated_at = :updated_at WHERE id = :pair_id"),
-                        {
-                            "session_name": new_session_name,
-                            "session_id": new_session_id,
-                            "updated_at": datetime.utcnow(),
-                            "pair_id": pair_id
-                        }
-                    )
+                now = datetime.utcnow()
+                result = await session.execute(
+                    text("SELECT DISTINCT session_name FROM forwarding_pairs WHERE id IN :pair_ids").bindparams(
+                        bindparam("pair_ids", expanding=True)
+                    ),
+                    {"pair_ids": list(pair_ids)}
+                )
+                affected_sessions = {row.session_name for row in result}
+                affected_sessions.add(new_session_name)
+                
+                await session.execute(
+                    text("UPDATE forwarding_pairs SET session_name = :session_name, session_id = :session_id, health_status = 'reassigning', updated_at = :updated_at WHERE id IN :pair_ids").bindparams(
+                        bindparam("pair_ids", expanding=True)
+                    ),
+                    {
+                        "session_name": new_session_name,
+                        "session_id": new_session_id,
+                        "updated_at": now,
+                        "pair_ids": list(pair_ids)
+                    }
+                )
+                
+                await session.execute(
+                    text("UPDATE sessions SET pair_count = (SELECT COUNT(*) FROM forwarding_pairs WHERE forwarding_pairs.session_name = sessions.name AND forwarding_pairs.is_active = 1), updated_at = :updated_at WHERE name IN :names").bindparams(
+                        bindparam("names", expanding=True)
+                    ),
+                    {"updated_at": now, "names": list(affected_sessions)}
+                )
                 
                 await session.commit()
                 
@@ -607,6 +771,43 @@ class Database:
                 logger.error(f"Failed to bulk reassign pairs: {e}")
                 return False
     
+    async def bulk_update_pair_assignments(self, pairs: List[ForwardingPair]) -> bool:
+        """
+        Write the assignment fields (worker, session, health, active flag) of many pairs at once.
+        
+        Other columns are left untouched, so pairs loaded without their
+        bot token (e.g. by get_pairs_by_session) are safe to pass.
+        """
+        if not pairs:
+            return True
+        
+        async with self.Session() as session:
+            try:
+                now = datetime.utcnow()
+                await session.execute(
+                    text("UPDATE forwarding_pairs SET worker_id = :worker_id, session_name = :session_name, health_status = :health_status, is_active = :is_active, updated_at = :updated_at WHERE id = :pair_id"),
+                    [
+                        {
+                            "worker_id": pair.worker_id,
+                            "session_name": pair.session_name,
+                            "health_status": pair.health_status,
+                            "is_active": pair.is_active,
+                            "updated_at": now,
+                            "pair_id": pair.id
+                        }
+                        for pair in pairs
+                    ]
+                )
+                await session.commit()
+                
+                logger.info(f"Updated assignments for {len(pairs)} pairs")
+                return True
+                
+            except Exception as e:
+                await session.rollback()
+                logger.error(f"Failed to bulk update pair assignments: {e}")
+                return False
+    
     async def update_session_pair_count(self, session_name: str) -> bool:
         """Update the pair count for a session."""
         async with self.Session() as session:
@@ -15,6 +15,7 @@ from core.telegram_destination import TelegramDestination
 from core.discord_relay import DiscordRelay
 from core.message_filter import MessageFilter
 from core.alert_system import AlertSystem
+from core.bot_token_manager import close_http_session
 from admin_bot.admin_handler import AdminHandler
 
 # Enhanced systems
@@ -54,8 +55,7 @@ class EnhancedForwardingBot:
         
         try:
             # Load configuration
-            self.settings = Settings()
-            await self.settings.load_from_file("config.yaml")
+            self.settings = Settings.load_from_file("config.yaml")
             
             # Initialize database
             self.database = Database()
@@ -83,6 +83,7 @@ class EnhancedForwardingBot:
             
             # Initialize alert system
             self.alert_system = AlertSystem(self.database)
+            self.advanced_session_manager.on_session_down = self.alert_system.notify_session_down
             
             # Initialize communication systems
             self.telegram_source = TelegramSource(
@@ -200,6 +201,9 @@ class EnhancedForwardingBot:
             if self.discord_relay:
                 await self.discord_relay.stop()
             
+            # Close shared Bot API HTTP session
+            await close_http_session()
+            
             # Stop metrics collection
             metrics_collector = get_metrics_collector()
             if metrics_collector:
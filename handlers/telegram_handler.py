@@ -1,7 +1,7 @@
 """Telegram message handling logic."""
 
 import asyncio
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
 from loguru import logger
 
 from core.database import Database, ForwardingPair
@@ -16,6 +16,13 @@ class TelegramMessageHandler:
         self.database = database
         self.discord_relay = discord_relay
         self.telegram_destination = telegram_destination
+        # Called when a new message fails to forward (e.g. AlertSystem.notify_flow_failure)
+        self.on_forward_failure: Optional[Callable[[], None]] = None
+    
+    def _report_forward_failure(self):
+        """Tell the failure hook, if any, that a message was not forwarded."""
+        if self.on_forward_failure:
+            self.on_forward_failure()
     
     async def handle_telegram_message(self, event_type: str, message_data: Dict[str, Any]):
         """Handle incoming Telegram messages from source."""
@@ -54,6 +61,7 @@ class TelegramMessageHandler:
             
             if not discord_message_id:
                 logger.error(f"Failed to send message to Discord for pair {pair.id}")
+                self._report_forward_failure()
                 return
             
             # Then forward to Telegram destination
@@ -69,9 +77,11 @@ class TelegramMessageHandler:
                 logger.success(f"Successfully forwarded message through pair {pair.id}")
             else:
                 logger.error(f"Failed to send message to Telegram destination for pair {pair.id}")
+                self._report_forward_failure()
                 
         except Exception as e:
             logger.error(f"Error forwarding new message for pair {pair.id}: {e}", exc_info=True)
+            self._report_forward_failure()
     
     async def _handle_message_edit(self, message_data: Dict[str, Any]):
         """Handle message edit forwarding."""
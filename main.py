@@ -19,6 +19,7 @@ from core.telegram_source import TelegramSource
 from core.telegram_destination import TelegramDestination
 from core.discord_relay import DiscordRelay
 from core.message_orchestrator import MessageOrchestrator
+from core.bot_token_manager import close_http_session
 from admin_bot.admin_handler import AdminHandler
 
 
@@ -98,9 +99,14 @@ class ForwardingBot:
             self.session_manager,
             self.settings.admin_user_ids,
             self.advanced_session_manager,
-            self.settings.encryption_key
+            self.settings.encryption_key,
+            batch_replies=self.settings.batch_admin_replies
         )
         
+        # Report forwarding failures and unhealthy sessions to the admin bot's alert system
+        self.message_orchestrator.telegram_handler.on_forward_failure = self._notify_flow_failure
+        self.advanced_session_manager.on_session_down = self._notify_session_down
+        
         # Initialize image hash manager
         from utils.image_hash import image_hash_manager
         image_hash_manager.database = self.database
@@ -148,6 +154,16 @@ class ForwardingBot:
             await self.stop()
             raise
     
+    def _notify_flow_failure(self):
+        """Pass a forwarding failure on to the alert system once the admin bot has started it."""
+        if self.admin_handler and self.admin_handler.alert_system:
+            self.admin_handler.alert_system.notify_flow_failure()
+    
+    def _notify_session_down(self, session_name: str):
+        """Pass an unhealthy session on to the alert system once the admin bot has started it."""
+        if self.admin_handler and self.admin_handler.alert_system:
+            self.admin_handler.alert_system.notify_session_down(session_name)
+    
     def run_pair_worker(self, pair_id: int):
         """Run a single forwarding pair in a worker process."""
         logger.info(f"Starting worker process for pair {pair_id}")
@@ -184,6 +200,7 @@ class ForwardingBot:
             stop_tasks.append(self.advanced_session_manager.stop())
         if self.database:
             stop_tasks.append(self.database.close())
+        stop_tasks.append(close_http_session())
             
         if stop_tasks:
             await asyncio.gather(*stop_tasks, return_exceptions=True)
@@ -10,7 +10,10 @@ from utils.encryption import EncryptionManager
 
 class TestAdminCommands(unittest.TestCase):
     def setUp(self):
-        self.loop = asyncio.get_event_loop()
+        # Own loop, so tests run after IsolatedAsyncioTestCase modules (which leave none set)
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.addCleanup(self.loop.close)
         self.db = MagicMock(spec=Database)
         self.encryption_manager = MagicMock(spec=EncryptionManager)
         self.message_filter = MagicMock()
@@ -50,8 +53,7 @@ class TestAdminCommands(unittest.TestCase):
             context = MagicMock()
             context.args = ["test_session", "+1234567890"]
             self.db.get_session_info = AsyncMock(return_value=None)
-            self.advanced_session_manager.register_session = AsyncMock(return_value=True)
-            self.advanced_session_manager.authenticate_session = AsyncMock(return_value={"needs_otp": True})
+            self.advanced_session_manager.register_and_start_auth = AsyncMock(return_value={"needs_otp": True})
 
             await self.session_commands.addsession_command(update, context)
 
@@ -59,5 +61,68 @@ class TestAdminCommands(unittest.TestCase):
 
         self.loop.run_until_complete(run_test())
 
+    def test_add_session_invalidates_sessions_listing(self):
+        async def run_test():
+            update = AsyncMock()
+            context = MagicMock()
+            context.args = ["test_session", "+1234567890"]
+            self.db.get_session_names = AsyncMock(return_value=[])
+            self.advanced_session_manager.register_and_start_auth = AsyncMock(return_value={"needs_otp": True})
+            self.unified_commands._stats_cache['rendered_sessions'] = (0.0, "stale listing")
+            self.session_commands.on_sessions_changed = self.unified_commands.invalidate_sessions_cache
+
+            await self.session_commands.addsession_command(update, context)
+
+            self.assertNotIn('rendered_sessions', self.unified_commands._stats_cache)
+
+        self.loop.run_until_complete(run_test())
+
+    def test_blockword_after_newline(self):
+        async def run_test():
+            update = AsyncMock()
+            update.message.text = "/blockword\nspam"
+            context = MagicMock()
+            context.args = ["spam"]
+            self.message_filter.add_global_blocked_word = AsyncMock(return_value=True)
+
+            await self.unified_commands.blockword_command(update, context)
+
+            self.message_filter.add_global_blocked_word.assert_awaited_once_with("spam")
+
+        self.loop.run_until_complete(run_test())
+
+    def test_blockword_without_word_shows_usage(self):
+        async def run_test():
+            update = AsyncMock()
+            update.message.text = "/blockword \n "
+            context = MagicMock()
+            context.args = []
+            self.message_filter.add_global_blocked_word = AsyncMock(return_value=True)
+
+            await self.unified_commands.blockword_command(update, context)
+
+            self.message_filter.add_global_blocked_word.assert_not_called()
+            self.assertIn("Usage", update.message.reply_text.call_args[0][0])
+
+        self.loop.run_until_complete(run_test())
+
+    def test_status_reports_database_error(self):
+        async def run_test():
+            update = AsyncMock()
+            context = MagicMock()
+            self.db.get_all_pairs = AsyncMock(side_effect=RuntimeError("db down"))
+            self.db.get_all_sessions = AsyncMock(return_value=[])
+            self.message_filter.get_filter_stats = AsyncMock(return_value={})
+            self.unified_commands.bot_manager.get_available_bots = AsyncMock(return_value=[])
+
+            await self.unified_commands.status_command(update, context)
+
+            text = update.message.reply_text.call_args[0][0]
+            self.assertIn("❌ Database: Error", text)
+            self.assertIn("Forwarding Pairs: ?/? active", text)
+            self.assertNotIn("Database: Connected", text)
+
+        self.loop.run_until_complete(run_test())
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,76 @@
+"""Tests for admin bot command dispatch."""
+
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from admin_bot.admin_handler import AdminHandler
+
+ADMIN_ID = 1
+OTHER_ID = 2
+
+
+class TestCommandDispatch(unittest.IsolatedAsyncioTestCase):
+    """Test cases for routing /commands through the command table."""
+
+    def setUp(self):
+        self.handler = AdminHandler("token", MagicMock(), MagicMock(), [ADMIN_ID])
+        self.handler.application = MagicMock()
+        self.handler.unified_commands = AsyncMock()
+        self.handler._setup_handlers()
+
+        self.context = MagicMock()
+        self.context.bot.username = "ForwardBot"
+
+    def _update(self, text, user_id=ADMIN_ID):
+        update = MagicMock()
+        update.effective_user.id = user_id
+        update.message.text = text
+        update.message.reply_text = AsyncMock()
+        update.effective_message = update.message
+        return update
+
+    async def test_arguments_are_split(self):
+        update = self._update("/blockword  unwanted   phrase")
+
+        await self.handler._dispatch_command(update, self.context)
+
+        self.handler.unified_commands.blockword_command.assert_awaited_once_with(update, self.context)
+        self.assertEqual(self.context.args, ["unwanted", "phrase"])
+
+    async def test_own_bot_suffix(self):
+        update = self._update("/Status@forwardbot now")
+
+        await self.handler._dispatch_command(update, self.context)
+
+        self.handler.unified_commands.status_command.assert_awaited_once()
+        self.assertEqual(self.context.args, ["now"])
+
+    async def test_other_bot_suffix_ignored(self):
+        for user_id in (ADMIN_ID, OTHER_ID):
+            update = self._update("/status@OtherBot", user_id)
+
+            await self.handler._dispatch_command(update, self.context)
+
+            update.message.reply_text.assert_not_called()
+        self.handler.unified_commands.status_command.assert_not_called()
+
+    async def test_unknown_command_ignored(self):
+        for user_id in (ADMIN_ID, OTHER_ID):
+            update = self._update("/nosuchcommand arg", user_id)
+
+            await self.handler._dispatch_command(update, self.context)
+
+            update.message.reply_text.assert_not_called()
+
+    async def test_non_admin_denied(self):
+        update = self._update("/status", OTHER_ID)
+
+        await self.handler._dispatch_command(update, self.context)
+
+        self.handler.unified_commands.status_command.assert_not_called()
+        update.message.reply_text.assert_awaited_once()
+        self.assertIn("Access denied", update.message.reply_text.call_args[0][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,12 +7,16 @@ from core.message_orchestrator import MessageOrchestrator
 from core.telegram_source import TelegramSource
 from core.telegram_destination import TelegramDestination
 from core.discord_relay import DiscordRelay
+from core.alert_system import AlertSystem
 from handlers.telegram_handler import TelegramMessageHandler
 
 
 class TestForwarding(unittest.TestCase):
     def setUp(self):
-        self.loop = asyncio.get_event_loop()
+        # Own loop, so tests run after IsolatedAsyncioTestCase modules (which leave none set)
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.addCleanup(self.loop.close)
         self.db = MagicMock(spec=Database)
         self.ts = MagicMock(spec=TelegramSource)
         self.td = MagicMock(spec=TelegramDestination)
@@ -71,5 +75,38 @@ class TestForwarding(unittest.TestCase):
             self.dr.delete_discord_message.assert_called_once()
             self.td.delete_message.assert_called_once()
 
+    def test_failed_forward_sends_alert(self):
+        async def run_test():
+            admin_handler = MagicMock()
+            admin_handler.broadcast_message = AsyncMock()
+            self.db.get_all_pairs = AsyncMock(return_value=[])
+            alert_system = AlertSystem(self.db, admin_handler)
+            alert_system.alert_thresholds['message_failure_threshold'] = 1
+            self.mo.telegram_handler.on_forward_failure = alert_system.notify_flow_failure
+            self.dr.send_message_to_discord = AsyncMock(side_effect=RuntimeError("Discord down"))
+
+            await alert_system.start()
+            try:
+                await self.mo._handle_telegram_source_message("new", {
+                    "pair": ForwardingPair(id=1, discord_channel_id=123, telegram_dest_chat_id=456),
+                    "original_message": MagicMock(id=111),
+                    "formatted_message": {"text": "hello"},
+                })
+
+                # The monitor loop wakes on the notification and sends the alert
+                for _ in range(100):
+                    sent = [call.args[0] for call in admin_handler.broadcast_message.call_args_list]
+                    if any("Message Forwarding Failures" in text for text in sent):
+                        break
+                    await asyncio.sleep(0.01)
+            finally:
+                await alert_system.stop()
+                await alert_system._monitor_task
+
+            self.assertTrue(any("Message Forwarding Failures" in text for text in sent))
+            self.assertEqual(alert_system._flow_failures, 0)
+
+        self.loop.run_until_complete(run_test())
+
 if __name__ == "__main__":
     unittest.main()
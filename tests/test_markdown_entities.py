@@ -0,0 +1,80 @@
+"""Tests for compiling legacy Markdown into message entities."""
+
+import unittest
+
+from telegram import MessageEntity
+
+from utils.markdown_entities import compile_markdown
+
+
+def _spans(entities):
+    return [(e.type, e.offset, e.length) for e in entities]
+
+
+class TestCompileMarkdown(unittest.TestCase):
+    def test_plain_text(self):
+        text, entities = compile_markdown("no markup here")
+
+        self.assertEqual(text, "no markup here")
+        self.assertEqual(entities, [])
+
+    def test_markers(self):
+        text, entities = compile_markdown("*b* _i_ `c` ```p```")
+
+        self.assertEqual(text, "b i c p")
+        self.assertEqual(_spans(entities), [
+            (MessageEntity.BOLD, 0, 1),
+            (MessageEntity.ITALIC, 2, 1),
+            (MessageEntity.CODE, 4, 1),
+            (MessageEntity.PRE, 6, 1),
+        ])
+
+    def test_adjacent_markers(self):
+        text, entities = compile_markdown("*a*_b_`c`")
+
+        self.assertEqual(text, "abc")
+        self.assertEqual(_spans(entities), [
+            (MessageEntity.BOLD, 0, 1),
+            (MessageEntity.ITALIC, 1, 1),
+            (MessageEntity.CODE, 2, 1),
+        ])
+
+    def test_nested_markers_are_literal(self):
+        # Legacy Markdown does not nest: inner markers stay as text
+        text, entities = compile_markdown("*bold _not italic_*")
+
+        self.assertEqual(text, "bold _not italic_")
+        self.assertEqual(_spans(entities), [(MessageEntity.BOLD, 0, 17)])
+
+    def test_non_bmp_offsets(self):
+        # An emoji outside the BMP is two UTF-16 code units
+        text, entities = compile_markdown("😀 *x* *😀*_y_")
+
+        self.assertEqual(text, "😀 x 😀y")
+        self.assertEqual(_spans(entities), [
+            (MessageEntity.BOLD, 3, 1),
+            (MessageEntity.BOLD, 5, 2),
+            (MessageEntity.ITALIC, 7, 1),
+        ])
+
+    def test_escaped_markers(self):
+        text, entities = compile_markdown("\\*not bold\\* *bold*")
+
+        self.assertEqual(text, "*not bold* bold")
+        self.assertEqual(_spans(entities), [(MessageEntity.BOLD, 11, 4)])
+
+    def test_empty_entities_dropped(self):
+        text, entities = compile_markdown("a**b__c")
+
+        self.assertEqual(text, "abc")
+        self.assertEqual(entities, [])
+
+    def test_unclosed_marker(self):
+        with self.assertRaises(ValueError):
+            compile_markdown("*unclosed")
+        with self.assertRaises(ValueError):
+            compile_markdown("```unclosed pre``")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""Tests for coalescing admin replies."""
+
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from admin_bot.admin_handler import AdminHandler
+from admin_bot.outbound_batcher import OutboundBatcher
+
+
+class TestOutboundBatcher(unittest.IsolatedAsyncioTestCase):
+    """Test cases for OutboundBatcher packing and flushing."""
+
+    def setUp(self):
+        self.bot = AsyncMock()
+        # A long window, so only flush_all() sends anything
+        self.batcher = OutboundBatcher(delay=60, max_len=10)
+
+    def _sent(self):
+        return [
+            (call.args[0], call.args[1], call.kwargs.get('parse_mode'))
+            for call in self.bot.send_message.call_args_list
+        ]
+
+    async def test_split_at_limit(self):
+        for text in ("aaaa", "bbbb", "cccc"):
+            await self.batcher.send(self.bot, 1, text)
+
+        await self.batcher.flush_all()
+
+        # "aaaa\n\nbbbb" is exactly max_len; the third text starts a new message
+        self.assertEqual(self._sent(), [(1, "aaaa\n\nbbbb", None), (1, "cccc", None)])
+
+    async def test_oversize_single_message(self):
+        await self.batcher.send(self.bot, 1, "x" * 25)
+
+        await self.batcher.flush_all()
+
+        self.assertEqual([text for _, text, _ in self._sent()], ["x" * 10, "x" * 10, "x" * 5])
+
+    async def test_no_merge_across_parse_mode(self):
+        await self.batcher.send(self.bot, 1, "plain")
+        await self.batcher.send(self.bot, 1, "*md*", parse_mode="Markdown")
+        await self.batcher.send(self.bot, 2, "other")
+
+        await self.batcher.flush_all()
+
+        self.assertCountEqual(self._sent(), [
+            (1, "plain", None),
+            (1, "*md*", "Markdown"),
+            (2, "other", None),
+        ])
+
+    async def test_flush_all_sends_before_returning(self):
+        await self.batcher.send(self.bot, 1, "pending")
+        self.bot.send_message.assert_not_called()
+
+        await self.batcher.flush_all()
+
+        self.assertEqual(self._sent(), [(1, "pending", None)])
+        self.assertEqual(self.batcher._pending, {})
+
+    async def test_admin_stop_flushes_pending_replies(self):
+        handler = AdminHandler("token", MagicMock(), MagicMock(), [1])
+        handler.running = True
+        handler.unified_commands = MagicMock()
+        handler.unified_commands.flush_replies = self.batcher.flush_all
+        await self.batcher.send(self.bot, 1, "bye")
+
+        await handler.stop()
+
+        self.assertEqual(self._sent(), [(1, "bye", None)])
+
+
+if __name__ == "__main__":
+    unittest.main()
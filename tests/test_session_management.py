@@ -2,12 +2,13 @@
 
 import asyncio
 import unittest
+from array import array
 from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, patch
 
 from core.database import Database, SessionInfo, ForwardingPair
 from core.session_manager import SessionManager
-from core.advanced_session_manager import AdvancedSessionManager
+from core.advanced_session_manager import AdvancedSessionManager, WorkerGroup
 
 
 class TestAdvancedSessionManagement(unittest.IsolatedAsyncioTestCase):
@@ -234,6 +235,129 @@ class TestAdvancedSessionManagement(unittest.IsolatedAsyncioTestCase):
         session_info = await self.database.get_session_info("delete_test")
         self.assertEqual(session_info.health_status, "deleted")
 
+    async def _add_session_pairs(self, session_name, count, base=1000):
+        """Create active pairs assigned to a session and return their IDs."""
+        pair_ids = []
+        for i in range(count):
+            pair = ForwardingPair(
+                name=f"{session_name}_pair_{i}",
+                telegram_source_chat_id=base + i,
+                discord_channel_id=base + 100 + i,
+                telegram_dest_chat_id=base + 200 + i,
+                session_name=session_name
+            )
+            pair_ids.append(await self.database.add_pair(pair))
+        return pair_ids
+    
+    def _assert_index_consistent(self):
+        """Every indexed pair points at a live group that holds it, and groups are indexed by session."""
+        manager = self.advanced_session_manager
+        for pair_id, worker_id in manager._pair_to_worker.items():
+            self.assertIn(worker_id, manager.worker_groups)
+            self.assertIn(pair_id, manager.worker_groups[worker_id].pair_ids)
+        indexed = {wid for wids in manager._workers_by_session.values() for wid in wids}
+        self.assertEqual(indexed, set(manager.worker_groups))
+    
+    async def test_scheduler_retries_failed_job_after_retry_delay(self):
+        """A failing job is rescheduled after its retry delay, then resumes its interval."""
+        manager = self.advanced_session_manager
+        manager.health_check_tick = 10  # retry delay for the health job is 60
+        clock = [1000]
+        sleeps = []
+        
+        async def fake_sleep(delay):
+            sleeps.append(delay)
+            clock[0] += delay
+            if len(sleeps) == 3:
+                manager.running = False
+        
+        manager.running = True
+        health_tick = AsyncMock(side_effect=[RuntimeError("boom"), None])
+        with patch('core.advanced_session_manager.time') as mock_time, \
+                patch('core.advanced_session_manager.asyncio.sleep', fake_sleep), \
+                patch.object(manager, '_sessions_snapshot', AsyncMock(return_value=[])), \
+                patch.object(manager, '_health_monitor_tick', health_tick), \
+                patch.object(manager, '_worker_manager_tick', AsyncMock()), \
+                patch.object(manager, '_cleanup_tick', AsyncMock()):
+            mock_time.monotonic.side_effect = lambda: clock[0]
+            await manager._scheduler_loop()
+        
+        self.assertEqual(sleeps, [10, 60, 10])
+        self.assertEqual(health_tick.await_count, 2)
+    
+    async def test_worker_index_after_reorganize(self):
+        """Reorganizing replaces the session's groups and repoints every pair."""
+        manager = self.advanced_session_manager
+        manager.max_pairs_per_session = 2
+        await manager.register_session("index_test", "+1234567890")
+        pair_ids = await self._add_session_pairs("index_test", 5)
+        
+        await manager._reorganize_workers_for_session("index_test")
+        first_groups = set(manager._workers_by_session["index_test"])
+        self.assertEqual(len(first_groups), 3)
+        self.assertEqual(set(manager._pair_to_worker), set(pair_ids))
+        self._assert_index_consistent()
+        
+        await manager._reorganize_workers_for_session("index_test")
+        second_groups = set(manager._workers_by_session["index_test"])
+        self.assertFalse(first_groups & second_groups)
+        self.assertEqual(set(manager._pair_to_worker), set(pair_ids))
+        for pair_id in pair_ids:
+            self.assertIn(manager.get_worker_for_pair(pair_id), second_groups)
+        self._assert_index_consistent()
+    
+    async def test_worker_index_after_drop(self):
+        """Dropping a group unmaps only its pairs."""
+        manager = self.advanced_session_manager
+        manager.max_pairs_per_session = 2
+        await manager.register_session("drop_test", "+1234567890")
+        pair_ids = await self._add_session_pairs("drop_test", 3)
+        await manager._reorganize_workers_for_session("drop_test")
+        
+        dropped = manager.get_worker_for_pair(pair_ids[0])
+        dropped_pairs = list(manager.worker_groups[dropped].pair_ids)
+        manager._drop_worker_group(dropped)
+        
+        for pair_id in pair_ids:
+            if pair_id in dropped_pairs:
+                self.assertIsNone(manager.get_worker_for_pair(pair_id))
+            else:
+                self.assertIsNotNone(manager.get_worker_for_pair(pair_id))
+        self.assertNotIn(dropped, manager._workers_by_session["drop_test"])
+        self._assert_index_consistent()
+        
+        # Dropping the last group removes the session from the index
+        for worker_id in list(manager._workers_by_session["drop_test"]):
+            manager._drop_worker_group(worker_id)
+        self.assertNotIn("drop_test", manager._workers_by_session)
+        self.assertEqual(manager._pair_to_worker, {})
+        self.assertIsNone(manager.get_worker_for_pair(12345))
+    
+    async def test_worker_index_after_group_health_check(self):
+        """Invalid or taken-over pairs leave the group; ownership by a newer group is kept."""
+        manager = self.advanced_session_manager
+        await manager.register_session("health_index", "+1234567890")
+        pair_ids = await self._add_session_pairs("health_index", 3)
+        worker_id = await manager._ensure_worker_group_for_session("health_index")
+        worker_group = manager.worker_groups[worker_id]
+        
+        # Another group takes over the first pair
+        newer = WorkerGroup(worker_id="worker_newer", session_name="health_index", pair_ids=array('q', [pair_ids[0]]))
+        manager._add_worker_group(newer)
+        self.assertEqual(manager.get_worker_for_pair(pair_ids[0]), "worker_newer")
+        
+        # The second pair is deactivated
+        pairs_by_id = {pair.id: pair for pair in await self.database.get_pairs_by_session("health_index")}
+        pairs_by_id[pair_ids[1]].is_active = False
+        
+        await manager._check_worker_group_health(worker_group, pairs_by_id)
+        
+        self.assertEqual(list(worker_group.pair_ids), [pair_ids[2]])
+        self.assertEqual(manager.get_worker_for_pair(pair_ids[0]), "worker_newer")
+        self.assertIsNone(manager.get_worker_for_pair(pair_ids[1]))
+        self.assertEqual(manager.get_worker_for_pair(pair_ids[2]), worker_id)
+        self._assert_index_consistent()
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -3,7 +3,7 @@ Image hashing utilities for perceptual hash-based image blocking.
 """
 import hashlib
 import os
-from typing import Optional, Set, Dict, Any
+from typing import Optional, Set, Dict, Any, BinaryIO
 from loguru import logger
 
 try:
@@ -47,9 +47,16 @@ class ImageHashManager:
         if not IMAGEHASH_AVAILABLE:
             return None
             
+        from io import BytesIO
+        return self.calculate_image_hash_stream(BytesIO(image_data))
+    
+    def calculate_image_hash_stream(self, fp: BinaryIO) -> Optional[str]:
+        """Calculate perceptual hash reading the image from a file-like object."""
+        if not IMAGEHASH_AVAILABLE:
+            return None
+            
         try:
-            from io import BytesIO
-            image = Image.open(BytesIO(image_data))
+            image = Image.open(fp)
             
             # Calculate perceptual hash (pHash)
             phash = imagehash.phash(image)
@@ -0,0 +1,75 @@
+"""
+Compile Telegram legacy Markdown into plain text plus message entities.
+
+Static replies can be parsed once at import and sent with ``entities=``
+instead of ``parse_mode='Markdown'``, so nothing is re-parsed per message.
+"""
+from typing import List, Tuple
+
+from telegram import MessageEntity
+
+# Legacy Markdown markers and the entity type each one produces
+_MARKERS = {
+    '*': MessageEntity.BOLD,
+    '_': MessageEntity.ITALIC,
+    '`': MessageEntity.CODE,
+}
+_ESCAPABLE = '*_`['
+
+
+def _utf16_len(text: str) -> int:
+    """Telegram entity offsets are measured in UTF-16 code units."""
+    return len(text.encode('utf-16-le')) // 2
+
+
+def compile_markdown(text: str) -> Tuple[str, List[MessageEntity]]:
+    """
+    Convert legacy Markdown (*bold*, _italic_, `code`, ```pre```) to entities.
+
+    Mirrors Telegram's parser: entities do not nest and empty ones (e.g. the
+    "**" pairs used throughout the admin texts) are dropped.
+
+    Raises:
+        ValueError: If an entity is not closed, as Telegram would reject it
+    """
+    out: List[str] = []
+    entities: List[MessageEntity] = []
+    offset = 0
+    i = 0
+
+    while i < len(text):
+        char = text[i]
+
+        if char == '\\' and i + 1 < len(text) and text[i + 1] in _ESCAPABLE:
+            out.append(text[i + 1])
+            offset += 1
+            i += 2
+            continue
+
+        if text.startswith('```', i):
+            end = text.find('```', i + 3)
+            if end == -1:
+                raise ValueError(f"Unclosed pre block at position {i}")
+            content = text[i + 3:end]
+            entity_type = MessageEntity.PRE
+            i = end + 3
+        elif char in _MARKERS:
+            end = text.find(char, i + 1)
+            if end == -1:
+                raise ValueError(f"Unclosed '{char}' entity at position {i}")
+            content = text[i + 1:end]
+            entity_type = _MARKERS[char]
+            i = end + 1
+        else:
+            out.append(char)
+            offset += _utf16_len(char)
+            i += 1
+            continue
+
+        length = _utf16_len(content)
+        if length:
+            entities.append(MessageEntity(type=entity_type, offset=offset, length=length))
+        out.append(content)
+        offset += length
+
+    return "".join(out), entities